@@ -0,0 +1,76 @@
+# api/background.py
+
+"""
+Отложенная и фоновая работа.
+
+• OnCommitBatch — id, накопленные за транзакцию, обрабатываются одним
+  вызовом после её фиксации (поисковый индекс, журнал what_can_i_cook).
+• LazyExecutor — пул воркеров, который создаётся при первом обращении,
+  с необязательным семафором слотов (PDF, превью, хеширование паролей).
+"""
+
+# Стандартная библиотека
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Сторонние библиотеки
+from django.db import transaction
+
+
+class OnCommitBatch:
+    """
+    Множество id, которое передаётся handler(ids) после фиксации
+    транзакции.
+
+    Повторные add в одной транзакции собираются в один вызов: первый
+    сработавший flush забирает все id, остальные ничего не делают.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+        self._local = threading.local()
+
+    def add(self, item):
+        if not hasattr(self._local, "pending"):
+            self._local.pending = set()
+        self._local.pending.add(item)
+        transaction.on_commit(self.flush)
+
+    def flush(self):
+        pending = getattr(self._local, "pending", None)
+        if pending:
+            self._local.pending = set()
+            self.handler(pending)
+
+
+def pool_executor(kind, max_workers, **kwargs):
+    """
+    ProcessPoolExecutor при kind == "process", иначе ThreadPoolExecutor.
+    """
+    pool_cls = ProcessPoolExecutor if kind == "process" else ThreadPoolExecutor
+    return pool_cls(max_workers=max_workers, **kwargs)
+
+
+class LazyExecutor:
+    """
+    Пул из factory(), создаваемый при первом get().
+
+    slots() — размер BoundedSemaphore занятых слотов, который создаётся
+    вместе с пулом и доступен как .slots. Настройки читаются при первом
+    обращении, а не при импорте модуля.
+    """
+
+    def __init__(self, factory, slots=None):
+        self._factory = factory
+        self._slot_count = slots
+        self._lock = threading.Lock()
+        self._executor = None
+        self.slots = None
+
+    def get(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._factory()
+                if self._slot_count is not None:
+                    self.slots = threading.BoundedSemaphore(self._slot_count())
+            return self._executor
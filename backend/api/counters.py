@@ -0,0 +1,67 @@
+# api/counters.py
+
+"""
+Денормализованные счётчики: Recipe.favorites_count, Recipe.cart_count,
+User.recipes_count и User.subscribers_count.
+
+Счётчики меняются одним UPDATE с F()-выражением, поэтому параллельные
+запросы не теряют инкременты. Если значения всё же разошлись с данными
+(ручные правки в БД, сбой между INSERT и UPDATE), их чинит команда
+repair_counters.
+"""
+
+# Сторонние библиотеки
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+
+def adjust(model, pk, field, delta):
+    """
+    Атомарно прибавляет delta к счётчику field строки pk.
+
+    Значение не опускается ниже нуля, даже если счётчик уже разошёлся.
+    """
+    model.objects.filter(pk=pk).update(
+        **{field: Greatest(F(field) + delta, 0)}
+    )
+
+
+def adjust_many(model, pks, field, delta):
+    """
+    То же, что adjust, для нескольких строк одним UPDATE.
+    """
+    if pks:
+        model.objects.filter(pk__in=pks).update(
+            **{field: Greatest(F(field) + delta, 0)}
+        )
+
+
+def actual_count(related_model, fk_field):
+    """
+    Подзапрос «сколько строк related_model ссылаются на текущую запись».
+    """
+    return Coalesce(
+        Subquery(
+            related_model.objects.filter(**{fk_field: OuterRef("pk")})
+            .order_by()
+            .values(fk_field)
+            .annotate(total=Count("pk"))
+            .values("total"),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def repair(model, field, related_model, fk_field):
+    """
+    Пересчитывает счётчик field у записей, где он разошёлся с данными.
+
+    Возвращает число исправленных строк.
+    """
+    expected = actual_count(related_model, fk_field)
+    return (
+        model.objects.annotate(expected_value=expected)
+        .filter(~Q(**{field: F("expected_value")}))
+        .update(**{field: expected})
+    )
@@ -0,0 +1,315 @@
+# api/images.py
+
+"""
+Обработка загружаемых изображений: рецептов и аватаров.
+
+1. decode_base64_image — декодирует base64 кусками во временный файл,
+   по заголовку проверяет формат и размеры через Pillow, не раскодируя
+   пиксели целиком.
+2. schedule_thumbnails — после сохранения оригинала строит WebP-превью
+   нескольких размеров в ограниченном пуле воркеров (thread или process).
+3. thumbnail_urls — ссылки на превью для сериализаторов; пока превью
+   не готовы, вместо них отдаётся оригинал, а построение ставится
+   в очередь — так превью получают и изображения, загруженные до
+   появления конвейера.
+
+Превью лежат рядом с оригиналом: <каталог>/thumbs/<имя>_<ширина>.webp.
+"""
+
+# Стандартная библиотека
+import base64
+import binascii
+import logging
+import posixpath
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from io import BytesIO
+from tempfile import SpooledTemporaryFile
+
+# Сторонние библиотеки
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import UploadedFile
+from PIL import Image, UnidentifiedImageError
+from rest_framework.exceptions import ValidationError
+
+# Локальные импорты
+from .background import LazyExecutor, pool_executor
+
+logger = logging.getLogger(__name__)
+
+# Сколько символов base64 декодируется за раз (кратно 4)
+DECODE_CHUNK = 64 * 1024
+# До этого размера декодированный файл держится в памяти
+SPOOL_MAX_SIZE = 1024 * 1024
+
+FORMAT_EXTENSIONS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp", "GIF": "gif"}
+FORMAT_MIME_TYPES = {
+    "JPEG": "image/jpeg",
+    "PNG": "image/png",
+    "WEBP": "image/webp",
+    "GIF": "image/gif",
+}
+
+
+# ────────────────────────────────────────────────────
+#        Декодирование и проверка
+# ────────────────────────────────────────────────────
+def _iter_decoded(encoded):
+    """
+    Декодирует строку base64 кусками по DECODE_CHUNK символов.
+    """
+    tail = ""
+    for start in range(0, len(encoded), DECODE_CHUNK):
+        end = start + DECODE_CHUNK
+        piece = tail + "".join(encoded[start:end].split())
+        cut = len(piece) - len(piece) % 4
+        tail = piece[cut:]
+        if cut:
+            yield base64.b64decode(piece[:cut], validate=True)
+    if tail:
+        # клиенты иногда опускают выравнивание «=»
+        yield base64.b64decode(tail + "=" * (-len(tail) % 4), validate=True)
+
+
+def decode_base64_image(data):
+    """
+    Превращает data-URI или «голую» строку base64 в UploadedFile.
+
+    Ошибки формата, размера и содержимого — ValidationError.
+    """
+    if not isinstance(data, str):
+        raise ValidationError("Ожидается изображение в base64.")
+    _header, sep, encoded = data.partition(";base64,")
+    if not sep:
+        encoded = data
+
+    max_bytes = settings.IMAGE_MAX_BYTES
+    buffer = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    size = 0
+    try:
+        for chunk in _iter_decoded(encoded):
+            size += len(chunk)
+            if size > max_bytes:
+                raise ValidationError(
+                    f"Изображение больше {max_bytes // (1024 * 1024)} МБ."
+                )
+            buffer.write(chunk)
+    except (binascii.Error, ValueError):
+        buffer.close()
+        raise ValidationError("Некорректная строка base64.")
+    except ValidationError:
+        buffer.close()
+        raise
+
+    image_format = _inspect(buffer)
+    buffer.seek(0)
+    return UploadedFile(
+        file=buffer,
+        name=f"{uuid.uuid4()}.{FORMAT_EXTENSIONS[image_format]}",
+        content_type=FORMAT_MIME_TYPES[image_format],
+        size=size,
+    )
+
+
+def _inspect(buffer):
+    """
+    Проверяет формат и размеры по заголовку и целостность файла.
+
+    Image.open читает только заголовок, verify проходит по структуре
+    файла без декодирования пикселей, поэтому «бомбы» с огромными
+    размерами отсекаются до выделения памяти под растр.
+    """
+    buffer.seek(0)
+    try:
+        with Image.open(buffer) as image:
+            image_format = image.format
+            width, height = image.size
+            if image_format not in settings.IMAGE_ALLOWED_FORMATS:
+                raise ValidationError(
+                    f"Формат {image_format} не поддерживается."
+                )
+            max_side = settings.IMAGE_MAX_SIDE
+            if max(width, height) > max_side:
+                raise ValidationError(
+                    f"Сторона изображения больше {max_side} пикселей."
+                )
+            image.verify()
+    except ValidationError:
+        buffer.close()
+        raise
+    except (
+        UnidentifiedImageError,
+        OSError,
+        SyntaxError,
+        Image.DecompressionBombError,
+    ):
+        buffer.close()
+        raise ValidationError("Файл не является корректным изображением.")
+    return image_format
+
+
+# ────────────────────────────────────────────────────
+#        Превью: фоновый пул
+# ────────────────────────────────────────────────────
+def thumbnail_name(name, width):
+    """
+    Путь превью оригинала name шириной width.
+    """
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(directory, "thumbs", f"{stem}_{width}.webp")
+
+
+def render_thumbnails(name, widths, quality):
+    """
+    Строит недостающие превью и возвращает число созданных файлов.
+
+    Функция верхнего уровня, чтобы её можно было передать
+    в ProcessPoolExecutor.
+    """
+    missing = [
+        width
+        for width in widths
+        if not default_storage.exists(thumbnail_name(name, width))
+    ]
+    if not missing:
+        return 0
+    with default_storage.open(name, "rb") as original:
+        with Image.open(original) as image:
+            image.load()
+            source = image.convert(
+                "RGBA" if "A" in image.getbands() else "RGB"
+            )
+    for width in missing:
+        thumb = source.copy()
+        # thumbnail не увеличивает картинки меньше width
+        thumb.thumbnail((width, width * 4))
+        out = BytesIO()
+        thumb.save(out, "WEBP", quality=quality, method=4)
+        default_storage.save(
+            thumbnail_name(name, width), ContentFile(out.getvalue())
+        )
+    return len(missing)
+
+
+_lock = threading.Lock()
+_pool = LazyExecutor(
+    lambda: pool_executor(
+        settings.IMAGE_PIPELINE_EXECUTOR, settings.IMAGE_PIPELINE_WORKERS
+    )
+)
+_pending = set()
+# Оригиналы, у которых превью уже точно есть (в пределах воркера):
+# LRU на IMAGE_READY_CACHE_SIZE имён, вытесненные проверяются по хранилищу
+_ready = OrderedDict()
+# Оригиналы без превью → момент последней проверки хранилища
+_missing = OrderedDict()
+
+
+def schedule_thumbnails(name, on_ready=None):
+    """
+    Ставит построение превью оригинала name в очередь пула.
+
+    on_ready вызывается без аргументов, если были созданы новые
+    превью, — например, чтобы сбросить закешированные ответы.
+    """
+    if not name:
+        return
+    with _lock:
+        if name in _ready or name in _pending:
+            return
+        _pending.add(name)
+    future = _pool.get().submit(
+        render_thumbnails,
+        name,
+        tuple(settings.IMAGE_THUMBNAIL_SIZES.values()),
+        settings.IMAGE_THUMBNAIL_QUALITY,
+    )
+    future.add_done_callback(
+        lambda done: _on_thumbnails_done(name, done, on_ready)
+    )
+
+
+def _on_thumbnails_done(name, future, on_ready):
+    with _lock:
+        _pending.discard(name)
+    error = future.exception()
+    if error is not None:
+        logger.error("Ошибка построения превью %s: %s", name, error)
+        return
+    _mark_ready(name)
+    if future.result() and on_ready is not None:
+        on_ready()
+
+
+def _mark_ready(name):
+    with _lock:
+        _missing.pop(name, None)
+        _ready[name] = True
+        _ready.move_to_end(name)
+        if len(_ready) > settings.IMAGE_READY_CACHE_SIZE:
+            _ready.popitem(last=False)
+
+
+def _mark_missing(name):
+    with _lock:
+        _missing[name] = time.monotonic()
+        _missing.move_to_end(name)
+        if len(_missing) > settings.IMAGE_READY_CACHE_SIZE:
+            _missing.popitem(last=False)
+
+
+def thumbnails_ready(name):
+    """
+    True, если все превью оригинала name лежат в хранилище.
+
+    Недостающие превью ставятся в очередь, а ответ «нет» воркер помнит
+    IMAGE_MISSING_RECHECK секунд и всё это время не ходит в хранилище.
+    """
+    with _lock:
+        if name in _ready:
+            _ready.move_to_end(name)
+            return True
+        checked = _missing.get(name)
+        if (
+            checked is not None
+            and time.monotonic() - checked < settings.IMAGE_MISSING_RECHECK
+        ):
+            return False
+    ready = all(
+        default_storage.exists(thumbnail_name(name, width))
+        for width in settings.IMAGE_THUMBNAIL_SIZES.values()
+    )
+    if ready:
+        _mark_ready(name)
+    else:
+        _mark_missing(name)
+        schedule_thumbnails(name)
+    return ready
+
+
+def thumbnail_urls(field_file, request=None):
+    """
+    {метка размера: URL} для сериализаторов.
+
+    Пока превью строятся, все метки указывают на оригинал.
+    """
+    if not field_file:
+        return None
+    if thumbnails_ready(field_file.name):
+        urls = {
+            label: default_storage.url(thumbnail_name(field_file.name, width))
+            for label, width in settings.IMAGE_THUMBNAIL_SIZES.items()
+        }
+    else:
+        urls = dict.fromkeys(settings.IMAGE_THUMBNAIL_SIZES, field_file.url)
+    if request is not None:
+        urls = {
+            label: request.build_absolute_uri(url)
+            for label, url in urls.items()
+        }
+    return urls
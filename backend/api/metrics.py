@@ -0,0 +1,386 @@
+# api/metrics.py
+
+"""
+Метрики запросов API: число SQL-запросов, время в БД, сериализации,
+рендеринга и общее время ответа с разбивкой по действиям вьюсетов.
+
+• db — SQL, в том числе выполненный при чтении потокового ответа;
+• serialize — serializer.data сериализаторов из get_serializer без SQL;
+• render — рендерер DRF (кодирование в JSON, CSV и т. п.);
+• app — остальное: представление, права, фильтры.
+
+Гистограммы хранятся в памяти процесса и отдаются в текстовом формате
+Prometheus (см. metrics_view). Каждый воркер gunicorn ведёт свой набор.
+Заголовок Server-Timing получают только обычные ответы: у потоковых
+(StreamingHttpResponse) тело и его SQL выполняются уже после отправки
+заголовков, они попадают только в гистограммы и проверку бюджета.
+"""
+
+# Стандартная библиотека
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+from functools import wraps
+
+# Сторонние библиотеки
+from asgiref.sync import (iscoroutinefunction, markcoroutinefunction,
+                          sync_to_async)
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Действие выполнило больше SQL-запросов, чем разрешено бюджетом."""
+
+
+class Histogram:
+    """
+    Гистограмма Prometheus с метками action.
+    """
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # action → [счётчики корзин..., +Inf], сумма, количество
+        self._series = {}
+
+    def observe(self, action, value):
+        with self._lock:
+            counts, total, count = self._series.get(
+                action, ([0] * (len(self.buckets) + 1), 0, 0)
+            )
+            counts[bisect_left(self.buckets, value)] += 1
+            self._series[action] = (counts, total + value, count + 1)
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = sorted(self._series.items())
+        for action, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket in zip((*self.buckets, "+Inf"), counts):
+                cumulative += bucket
+                labels = f'action="{action}",le="{bound}"'
+                lines.append(f"{self.name}_bucket{{{labels}}} {cumulative}")
+            lines.append(f'{self.name}_sum{{action="{action}"}} {total}')
+            lines.append(f'{self.name}_count{{action="{action}"}} {count}')
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    "foodgram_request_duration_seconds",
+    "Total request latency.",
+    SECONDS_BUCKETS,
+)
+DB_SECONDS = Histogram(
+    "foodgram_db_duration_seconds",
+    "Time spent executing SQL.",
+    SECONDS_BUCKETS,
+)
+SERIALIZE_SECONDS = Histogram(
+    "foodgram_serialize_duration_seconds",
+    "Time spent building serializer.data, excluding SQL.",
+    SECONDS_BUCKETS,
+)
+RENDER_SECONDS = Histogram(
+    "foodgram_render_duration_seconds",
+    "Time spent in the DRF renderer encoding the response body.",
+    SECONDS_BUCKETS,
+)
+APP_SECONDS = Histogram(
+    "foodgram_app_duration_seconds",
+    "Time spent in Python outside SQL, serialization and rendering.",
+    SECONDS_BUCKETS,
+)
+DB_QUERIES = Histogram(
+    "foodgram_db_queries",
+    "SQL queries per request.",
+    QUERY_BUCKETS,
+)
+HISTOGRAMS = (
+    REQUEST_SECONDS,
+    DB_SECONDS,
+    SERIALIZE_SECONDS,
+    RENDER_SECONDS,
+    APP_SECONDS,
+    DB_QUERIES,
+)
+
+
+class RequestMetrics:
+    """
+    Замеры одного запроса; живёт в request.metrics.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.view_finished = None
+        self.serialize_time = 0.0
+        self.render_time = 0.0
+        self.action = None
+        self.query_budget = None
+
+    def __call__(self, execute, sql, params, many, context):
+        """Обёртка connection.execute_wrapper: считает запросы и их время."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+
+class QueryMetricsMiddleware:
+    """
+    Считает SQL-запросы и время ответа, пишет заголовок Server-Timing
+    и проверяет бюджет запросов действия.
+
+    Работает и в WSGI, и в ASGI: синхронный middleware в ASGI-цепочке
+    заставил бы Django выполнять async-представления в потоке.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        metrics = request.metrics = RequestMetrics()
+        with ExitStack() as stack:
+            self._install(stack, metrics)
+            response = self.get_response(request)
+        return self._finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        if not settings.METRICS_ENABLED:
+            return await self.get_response(request)
+
+        metrics = request.metrics = RequestMetrics()
+        # Async ORM и синхронные представления выполняют SQL в потоке
+        # thread-sensitive контекста запроса: обёртки ставятся там же
+        stack = ExitStack()
+        await sync_to_async(self._install)(stack, metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self._finish(request, response, metrics)
+
+    @staticmethod
+    def _install(stack, metrics):
+        for conn in connections.all():
+            stack.enter_context(conn.execute_wrapper(metrics))
+
+    def _finish(self, request, response, metrics):
+        if response.streaming:
+            # Замер продолжается, пока сервер читает тело ответа
+            measure = self._ameasure if response.is_async else self._measure
+            response.streaming_content = measure(
+                request, response.streaming_content, metrics
+            )
+            return response
+
+        timings = self._observe(request, metrics)
+        response["Server-Timing"] = ", ".join(
+            (
+                f"db;dur={timings['db'] * 1000:.1f};"
+                f'desc="{metrics.queries} queries"',
+                f"serialize;dur={timings['serialize'] * 1000:.1f}",
+                f"app;dur={timings['app'] * 1000:.1f}",
+                f"render;dur={timings['render'] * 1000:.1f}",
+                f"total;dur={timings['total'] * 1000:.1f}",
+            )
+        )
+        self._check_budget(
+            metrics, metrics.action or self._fallback_label(request)
+        )
+        return response
+
+    def _measure(self, request, content, metrics):
+        """
+        Тело потокового ответа с подсчётом SQL; обёртки ставятся
+        при первом чтении, поэтому непрочитанный ответ ничего не держит.
+        """
+        with ExitStack() as stack:
+            self._install(stack, metrics)
+            yield from content
+        self._observe(request, metrics)
+        self._check_budget(
+            metrics, metrics.action or self._fallback_label(request)
+        )
+
+    async def _ameasure(self, request, content, metrics):
+        stack = ExitStack()
+        await sync_to_async(self._install)(stack, metrics)
+        try:
+            async for chunk in content:
+                yield chunk
+        finally:
+            await sync_to_async(stack.close)()
+        self._observe(request, metrics)
+        self._check_budget(
+            metrics, metrics.action or self._fallback_label(request)
+        )
+
+    def _observe(self, request, metrics):
+        """
+        Пишет замеры запроса в гистограммы и возвращает их.
+        """
+        total = time.perf_counter() - metrics.started
+        timings = {
+            "total": total,
+            "db": metrics.db_time,
+            "serialize": metrics.serialize_time,
+            "render": metrics.render_time,
+            "app": max(
+                total
+                - metrics.db_time
+                - metrics.serialize_time
+                - metrics.render_time,
+                0.0,
+            ),
+        }
+        action = metrics.action or self._fallback_label(request)
+        REQUEST_SECONDS.observe(action, timings["total"])
+        DB_SECONDS.observe(action, timings["db"])
+        SERIALIZE_SECONDS.observe(action, timings["serialize"])
+        RENDER_SECONDS.observe(action, timings["render"])
+        APP_SECONDS.observe(action, timings["app"])
+        DB_QUERIES.observe(action, metrics.queries)
+        return timings
+
+    @staticmethod
+    def _fallback_label(request):
+        match = getattr(request, "resolver_match", None)
+        return match.view_name if match and match.view_name else "unresolved"
+
+    @staticmethod
+    def _check_budget(metrics, action):
+        budget = metrics.query_budget
+        if budget is None or metrics.queries <= budget:
+            return
+        message = (
+            f"{action}: {metrics.queries} SQL queries, budget is {budget}"
+        )
+        if settings.QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+def label_request(request, action, query_budget=None):
+    """
+    Подписывает метрики запроса действием и задаёт бюджет SQL-запросов.
+
+    Вьюсеты делают это в InstrumentedViewSetMixin, async-представления —
+    вызовом напрямую.
+    """
+    metrics = getattr(request, "metrics", None)
+    if metrics is not None:
+        metrics.action = action
+        metrics.query_budget = query_budget
+
+
+def timed_representation(metrics, to_representation):
+    """
+    to_representation сериализатора, время которого без SQL идёт
+    в metrics.serialize_time.
+    """
+
+    @wraps(to_representation)
+    def timed(instance):
+        started, db_time = time.perf_counter(), metrics.db_time
+        try:
+            return to_representation(instance)
+        finally:
+            elapsed = (
+                time.perf_counter() - started - (metrics.db_time - db_time)
+            )
+            metrics.serialize_time += max(elapsed, 0.0)
+
+    return timed
+
+
+class InstrumentedViewSetMixin:
+    """
+    Подписывает метрики запроса действием вьюсета и замеряет
+    сериализацию и рендеринг.
+
+    query_budgets — {действие: максимум SQL-запросов на запрос}.
+    """
+
+    query_budgets = {}
+
+    def get_serializer(self, *args, **kwargs):
+        """
+        serializer.data вызывает to_representation внешнего сериализатора
+        один раз; вложенные и дочерние сериализаторы — другие объекты,
+        поэтому время не считается дважды.
+        """
+        serializer = super().get_serializer(*args, **kwargs)
+        metrics = getattr(self.request._request, "metrics", None)
+        if metrics is not None:
+            serializer.to_representation = timed_representation(
+                metrics, serializer.to_representation
+            )
+        return serializer
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        metrics = getattr(request._request, "metrics", None)
+        if metrics is None:
+            return response
+
+        basename = getattr(self, "basename", None) or type(self).__name__
+        action = self.action or request.method.lower()
+        budget = self.query_budgets.get(self.action)
+        label_request(request._request, f"{basename}.{action}", budget)
+        metrics.view_finished = time.perf_counter()
+        if isinstance(response, Response):
+            response.add_post_render_callback(
+                lambda rendered: self._render_done(metrics, rendered)
+            )
+        return response
+
+    @staticmethod
+    def _render_done(metrics, response):
+        metrics.render_time = time.perf_counter() - metrics.view_finished
+        return response
+
+
+def metrics_view(request):
+    """
+    Текстовый формат Prometheus для внутреннего сборщика метрик.
+    """
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    return HttpResponse(
+        "\n".join(lines) + "\n",
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -0,0 +1,61 @@
+# api/tests/test_images.py
+
+"""
+Превью изображений: построение по первому запросу и кеш промахов.
+"""
+
+# Стандартная библиотека
+import time
+import uuid
+from io import BytesIO
+
+# Сторонние библиотеки
+import pytest
+from api import images
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+
+
+@pytest.fixture
+def original():
+    """Оригинал без превью, загруженный до появления конвейера."""
+    out = BytesIO()
+    Image.new("RGB", (800, 600), "orange").save(out, "PNG")
+    return default_storage.save(
+        f"recipes/images/{uuid.uuid4()}.png", ContentFile(out.getvalue())
+    )
+
+
+def _wait_rendered(name, timeout=10):
+    deadline = time.monotonic() + timeout
+    while name in images._pending:
+        assert time.monotonic() < deadline, "превью не построены"
+        time.sleep(0.01)
+
+
+def test_miss_schedules_render(settings, original):
+    assert images.thumbnails_ready(original) is False
+
+    _wait_rendered(original)
+    assert images.thumbnails_ready(original) is True
+    for width in settings.IMAGE_THUMBNAIL_SIZES.values():
+        assert default_storage.exists(images.thumbnail_name(original, width))
+
+
+def test_miss_is_remembered(settings, monkeypatch, original):
+    settings.IMAGE_MISSING_RECHECK = 60
+    monkeypatch.setattr(images, "schedule_thumbnails", lambda name: None)
+    checks = []
+    exists = default_storage.exists
+    monkeypatch.setattr(
+        default_storage,
+        "exists",
+        lambda name: checks.append(name) or exists(name),
+    )
+
+    assert images.thumbnails_ready(original) is False
+    assert images.thumbnails_ready(original) is False
+
+    # первое превью не найдено — остальные размеры и повтор не проверяются
+    assert len(checks) == 1
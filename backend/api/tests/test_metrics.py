@@ -0,0 +1,90 @@
+# api/tests/test_metrics.py
+
+"""
+Метрики запросов и бюджеты SQL-запросов действий.
+"""
+
+# Сторонние библиотеки
+import pytest
+
+# Локальные импорты
+from api.metrics import DB_QUERIES, QueryBudgetExceeded
+from recipes.models import ShoppingCart
+from recipes.views import RecipeViewSet
+
+
+def _server_timing(response):
+    return dict(
+        (part.split(";")[0].strip(), part)
+        for part in response["Server-Timing"].split(",")
+    )
+
+
+def _observed(histogram, action):
+    """(сумма, количество) наблюдений гистограммы для действия."""
+    _counts, total, count = histogram._series.get(action, (None, 0, 0))
+    return total, count
+
+
+@pytest.mark.django_db
+def test_server_timing_reports_queries_and_serialization(
+    viewer_client, make_recipe
+):
+    make_recipe()
+    response = viewer_client.get("/api/recipes/")
+    assert response.status_code == 200
+    timing = _server_timing(response)
+    assert set(timing) == {"db", "serialize", "app", "render", "total"}
+    assert 'desc="4 queries"' in timing["db"]
+
+
+@pytest.mark.django_db
+def test_budget_exceeded_fails_in_strict_mode(
+    monkeypatch, viewer_client, make_recipe
+):
+    make_recipe()
+    monkeypatch.setitem(RecipeViewSet.query_budgets, "list", 3)
+    with pytest.raises(
+        QueryBudgetExceeded, match="recipe.list: 4 SQL queries"
+    ):
+        viewer_client.get("/api/recipes/")
+
+
+@pytest.mark.django_db
+def test_budget_exceeded_only_logs_by_default(
+    settings, monkeypatch, caplog, viewer_client, make_recipe
+):
+    settings.QUERY_BUDGET_STRICT = False
+    make_recipe()
+    monkeypatch.setitem(RecipeViewSet.query_budgets, "list", 3)
+    assert viewer_client.get("/api/recipes/").status_code == 200
+    assert "recipe.list: 4 SQL queries, budget is 3" in caplog.text
+
+
+@pytest.mark.django_db
+def test_streamed_queries_are_counted(
+    monkeypatch, viewer, viewer_client, make_recipe
+):
+    """
+    Агрегат списка покупок выполняется при чтении тела ответа.
+    """
+    ShoppingCart.objects.create(user=viewer, recipe=make_recipe())
+    action = "recipe.download_shopping_cart"
+    before = _observed(DB_QUERIES, action)
+
+    response = viewer_client.get("/api/recipes/download_shopping_cart/")
+    assert response.status_code == 200
+    assert "Server-Timing" not in response
+    # до чтения тела замер не закончен
+    assert _observed(DB_QUERIES, action) == before
+    assert b"".join(response.streaming_content)
+    total, count = _observed(DB_QUERIES, action)
+    # проверка корзины и агрегат
+    assert (total - before[0], count - before[1]) == (2, 1)
+
+    monkeypatch.setitem(
+        RecipeViewSet.query_budgets, "download_shopping_cart", 1
+    )
+    response = viewer_client.get("/api/recipes/download_shopping_cart/")
+    with pytest.raises(QueryBudgetExceeded):
+        b"".join(response.streaming_content)
@@ -1,6 +1,8 @@
 # Сторонние библиотеки
+from django.conf import settings
 from django.urls import include, path
 # Локальные импорты
+from recipes import async_views
 from recipes.views import IngredientViewSet, RecipeViewSet
 from rest_framework.routers import DefaultRouter
 from users.views import AuthTokenView, LogoutView, UserViewSet
@@ -15,3 +17,25 @@ urlpatterns = [
     path("auth/token/login/", AuthTokenView.as_view(), name="token_login"),
     path("auth/token/logout/", LogoutView.as_view(), name="token_logout"),
 ]
+
+if settings.ASYNC_VIEWS:
+    # ASGI-режим: GET горячих путей обслуживают async-представления,
+    # остальные методы они передают тем же вьюсетам
+    urlpatterns = [
+        path("recipes/", async_views.recipe_list, name="recipe-list-async"),
+        path(
+            "recipes/<int:pk>/",
+            async_views.recipe_detail,
+            name="recipe-detail-async",
+        ),
+        path(
+            "recipes/download_shopping_cart/",
+            async_views.download_shopping_cart,
+            name="recipe-download-shopping-cart-async",
+        ),
+        path(
+            "ingredients/",
+            async_views.ingredient_list,
+            name="ingredient-list-async",
+        ),
+    ] + urlpatterns
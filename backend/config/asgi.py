@@ -3,4 +3,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+# Под ASGI горячие пути чтения обслуживают async-представления
+os.environ.setdefault("ASYNC_VIEWS", "1")
 application = get_asgi_application()
@@ -52,6 +52,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # первым, чтобы замерять весь запрос целиком
+    "api.metrics.QueryMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -83,7 +85,7 @@ WSGI_APPLICATION = "config.wsgi.application"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "users.authentication.CachedTokenAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
@@ -92,6 +94,186 @@ REST_FRAMEWORK = {
     "PAGE_SIZE": int(os.getenv("PAGE_SIZE", 6)),
 }
 
+# ───── Метрики запросов ─────
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") in ("1", "true", "True")
+# True — превышение бюджета запросов действия вызывает ошибку (для тестов)
+QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", "0") in ("1", "true", "True")
+
+# Async-представления горячих путей чтения (recipes/async_views.py);
+# config/asgi.py включает их по умолчанию
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "0") in ("1", "true", "True")
+
+# ───── Кеши ─────
+# RECIPE_CACHE_REDIS_URL задаёт общий Redis для нескольких узлов,
+# без него тела рецептов хранятся в LRU-кеше памяти воркера
+RECIPE_CACHE_REDIS_URL = os.getenv("RECIPE_CACHE_REDIS_URL")
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "recipes": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": RECIPE_CACHE_REDIS_URL,
+        }
+        if RECIPE_CACHE_REDIS_URL
+        else {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "recipes",
+            "OPTIONS": {
+                "MAX_ENTRIES": int(os.getenv("RECIPE_CACHE_MAX_ENTRIES", 5000)),
+            },
+        }
+    ),
+    # Сброс записи при выходе виден всем воркерам только через общий
+    # Redis, поэтому без него кеш токенов по умолчанию выключен
+    "auth": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": RECIPE_CACHE_REDIS_URL,
+            "KEY_PREFIX": "auth",
+        }
+        if RECIPE_CACHE_REDIS_URL
+        else {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "auth",
+            "OPTIONS": {
+                "MAX_ENTRIES": int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", 10000)),
+            },
+        }
+    ),
+    # Версии и журналы изменений, которые должны видеть все процессы
+    # (recipes/catalogue.py, recipes/recipe_cache.py,
+    # recipes/cook_index.py). Без Redis — файлы
+    # в SHARED_CACHE_DIR, общие для воркеров gunicorn и manage.py
+    # в одном контейнере
+    "shared": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": RECIPE_CACHE_REDIS_URL,
+            "KEY_PREFIX": "shared",
+        }
+        if RECIPE_CACHE_REDIS_URL
+        else {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.getenv("SHARED_CACHE_DIR", "/tmp/foodgram-shared"),
+            # версии рецептов и авторов и журнал what_can_i_cook;
+            # вытесненная версия создаётся заново — это лишь промах кеша
+            "OPTIONS": {
+                "MAX_ENTRIES": int(
+                    os.getenv("SHARED_CACHE_MAX_ENTRIES", 50000)
+                ),
+            },
+        }
+    ),
+}
+SHARED_CACHE_ALIAS = "shared"
+RECIPE_CACHE_ENABLED = os.getenv("RECIPE_CACHE_ENABLED", "1") in ("1", "true", "True")
+RECIPE_CACHE_ALIAS = "recipes"
+RECIPE_CACHE_TIMEOUT = int(os.getenv("RECIPE_CACHE_TIMEOUT", 24 * 60 * 60))
+# Кеш «токен → пользователь» для CachedTokenAuthentication. С LocMem
+# (TOKEN_CACHE_ENABLED=1 без Redis) выход из других воркеров виден
+# только через TOKEN_CACHE_TIMEOUT — годится для одного процесса
+TOKEN_CACHE_ENABLED = os.getenv(
+    "TOKEN_CACHE_ENABLED", "1" if RECIPE_CACHE_REDIS_URL else "0"
+) in ("1", "true", "True")
+TOKEN_CACHE_ALIAS = "auth"
+TOKEN_CACHE_TIMEOUT = int(os.getenv("TOKEN_CACHE_TIMEOUT", 5 * 60))
+
+# ───── Автодополнение ингредиентов ─────
+# False — искать в БД через триграммный индекс, минуя индекс в памяти
+INGREDIENT_AUTOCOMPLETE_IN_MEMORY = os.getenv(
+    "INGREDIENT_AUTOCOMPLETE_IN_MEMORY", "1"
+) in ("1", "true", "True")
+
+# ───── Список покупок ─────
+# Выгрузка читает материализованные суммы (recipes/shopping_totals.py).
+# После включения на работающей базе: manage.py rebuild_shopping_lists
+SHOPPING_LIST_MATERIALIZED = os.getenv("SHOPPING_LIST_MATERIALIZED", "0") in ("1", "true", "True")
+# Складывать кг с г, л с мл, ложки между собой (recipes/units.py)
+SHOPPING_LIST_NORMALIZE_UNITS = os.getenv("SHOPPING_LIST_NORMALIZE_UNITS", "1") in (
+    "1",
+    "true",
+    "True",
+)
+# PDF рендерится в отдельном ограниченном пуле (thread или process)
+SHOPPING_LIST_PDF_EXECUTOR = os.getenv("SHOPPING_LIST_PDF_EXECUTOR", "thread")
+SHOPPING_LIST_PDF_WORKERS = int(os.getenv("SHOPPING_LIST_PDF_WORKERS", 2))
+# Сколько задач (выполняемых и ожидающих) допускается одновременно
+SHOPPING_LIST_PDF_MAX_PENDING = int(os.getenv("SHOPPING_LIST_PDF_MAX_PENDING", 4))
+# Сколько секунд запрос ждёт готовый PDF, прежде чем ответить 202
+SHOPPING_LIST_PDF_WAIT = float(os.getenv("SHOPPING_LIST_PDF_WAIT", 2))
+SHOPPING_LIST_PDF_RETRY_AFTER = int(os.getenv("SHOPPING_LIST_PDF_RETRY_AFTER", 2))
+SHOPPING_LIST_PDF_CACHE_TIMEOUT = int(os.getenv("SHOPPING_LIST_PDF_CACHE_TIMEOUT", 3600))
+SHOPPING_LIST_PDF_FONT = os.getenv(
+    "SHOPPING_LIST_PDF_FONT", "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+)
+
+# ───── Изображения ─────
+IMAGE_MAX_BYTES = int(os.getenv("IMAGE_MAX_BYTES", 10 * 1024 * 1024))
+IMAGE_MAX_SIDE = int(os.getenv("IMAGE_MAX_SIDE", 6000))
+IMAGE_ALLOWED_FORMATS = ("JPEG", "PNG", "WEBP", "GIF")
+# Превью WebP: метка в ответе API → ширина в пикселях
+IMAGE_THUMBNAIL_SIZES = {"small": 320, "medium": 640}
+IMAGE_THUMBNAIL_QUALITY = int(os.getenv("IMAGE_THUMBNAIL_QUALITY", 80))
+# Превью строятся в фоновом пуле (thread или process)
+IMAGE_PIPELINE_EXECUTOR = os.getenv("IMAGE_PIPELINE_EXECUTOR", "thread")
+IMAGE_PIPELINE_WORKERS = int(os.getenv("IMAGE_PIPELINE_WORKERS", 2))
+# Сколько имён с готовыми превью воркер помнит, не проверяя хранилище
+IMAGE_READY_CACHE_SIZE = int(os.getenv("IMAGE_READY_CACHE_SIZE", 10000))
+# Через сколько секунд воркер снова проверяет превью, которых не было
+IMAGE_MISSING_RECHECK = int(os.getenv("IMAGE_MISSING_RECHECK", 30))
+
+# ───── Рейтинг трендов ─────
+# Вклад добавления в избранное/корзину затухает вдвое за этот период
+RANKING_HALF_LIFE_HOURS = float(os.getenv("RANKING_HALF_LIFE_HOURS", 72))
+RANKING_FAVORITE_WEIGHT = float(os.getenv("RANKING_FAVORITE_WEIGHT", 1.0))
+RANKING_CART_WEIGHT = float(os.getenv("RANKING_CART_WEIGHT", 0.5))
+
+# ───── Полнотекстовый поиск ─────
+# Конфигурация текстового поиска PostgreSQL для ?search=
+SEARCH_CONFIG = os.getenv("SEARCH_CONFIG", "russian")
+
+# ───── Подбор рецептов по продуктам ─────
+# Сколько лучших совпадений what_can_i_cook отдаёт постранично
+COOK_INDEX_MAX_RESULTS = int(os.getenv("COOK_INDEX_MAX_RESULTS", 500))
+# Сколько ингредиентов можно передать в одном запросе
+COOK_INDEX_MAX_INGREDIENTS = int(os.getenv("COOK_INDEX_MAX_INGREDIENTS", 100))
+
+# ───── Массовые операции с избранным и корзиной ─────
+# Сколько id рецептов принимает один запрос favorite/bulk, shopping_cart/bulk
+RELATIONS_BULK_MAX_IDS = int(os.getenv("RELATIONS_BULK_MAX_IDS", 100))
+
+# ───── Короткие ссылки ─────
+# Адрес сайта для ссылок из get-link; пусто — берётся из запроса
+BASE_URL = os.getenv("BASE_URL", "").rstrip("/")
+# Сколько кодов держит LRU-кеш переходов в каждом воркере
+SHORT_LINK_CACHE_SIZE = int(os.getenv("SHORT_LINK_CACHE_SIZE", 4096))
+
+# ───── Пароли ─────
+# Алгоритм новых хешей: pbkdf2, scrypt или argon2 (нужен argon2-cffi).
+# Хеши остальных алгоритмов проверяются и пересчитываются при входе
+PASSWORD_HASHER = os.getenv("PASSWORD_HASHER", "pbkdf2")
+_PASSWORD_HASHERS = {
+    "pbkdf2": "users.hashers.PBKDF2PasswordHasher",
+    "scrypt": "users.hashers.ScryptPasswordHasher",
+    "argon2": "users.hashers.Argon2PasswordHasher",
+}
+PASSWORD_HASHERS = [_PASSWORD_HASHERS.pop(PASSWORD_HASHER), *_PASSWORD_HASHERS.values()]
+# Стоимость; по умолчанию — значения Django 4.2
+PASSWORD_PBKDF2_ITERATIONS = int(os.getenv("PASSWORD_PBKDF2_ITERATIONS", 600000))
+PASSWORD_SCRYPT_WORK_FACTOR = int(os.getenv("PASSWORD_SCRYPT_WORK_FACTOR", 2**14))
+PASSWORD_SCRYPT_BLOCK_SIZE = int(os.getenv("PASSWORD_SCRYPT_BLOCK_SIZE", 8))
+PASSWORD_SCRYPT_PARALLELISM = int(os.getenv("PASSWORD_SCRYPT_PARALLELISM", 1))
+PASSWORD_ARGON2_TIME_COST = int(os.getenv("PASSWORD_ARGON2_TIME_COST", 2))
+PASSWORD_ARGON2_MEMORY_COST = int(os.getenv("PASSWORD_ARGON2_MEMORY_COST", 102400))
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv("PASSWORD_ARGON2_PARALLELISM", 8))
+# Потоков хеширования на воркер (0 — считать в потоке запроса) и сколько
+# секунд запрос ждёт свободный поток, прежде чем ответить 503
+PASSWORD_HASHING_WORKERS = int(os.getenv("PASSWORD_HASHING_WORKERS", 2))
+PASSWORD_HASHING_WAIT = float(os.getenv("PASSWORD_HASHING_WAIT", 5))
+PASSWORD_HASHING_RETRY_AFTER = int(os.getenv("PASSWORD_HASHING_RETRY_AFTER", 1))
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -1,11 +1,15 @@
 # urls.py
 
 # Импортируем настройки и утилиты с псевдонимами для «раскладки»
+from api.metrics import metrics_view as _metrics_view
 from django.conf import settings as _settings
 from django.conf.urls.static import static as _serve_static
 from django.contrib import admin as _admin
 from django.urls import include as _inc
 from django.urls import path as _route
+from recipes.async_views import \
+    short_link_redirect as _async_short_link_redirect
+from recipes.views import short_link_redirect as _short_link_redirect
 
 # -------------------------------
 # Основные маршруты приложения
@@ -15,6 +19,18 @@ routes = [
     _route("api/", _inc("api.urls")),
     # Административная панель
     _route("admin/", _admin.site.urls),
+    # Метрики Prometheus; nginx этот путь наружу не проксирует
+    _route("internal/metrics/", _metrics_view, name="metrics"),
+    # Короткие ссылки на рецепты: /short/<code> → /recipes/<id>
+    _route(
+        "short/<str:code>",
+        (
+            _async_short_link_redirect
+            if _settings.ASYNC_VIEWS
+            else _short_link_redirect
+        ),
+        name="short-link",
+    ),
 ]
 
 # -----------------------------------------------------
@@ -0,0 +1,111 @@
+# conftest.py
+
+"""
+Общие фикстуры тестов.
+"""
+
+# Сторонние библиотеки
+import pytest
+from django.core.cache import caches
+from rest_framework.test import APIClient
+
+# Локальные импорты
+from recipes.management.commands.seed_benchmark import IMAGE_NAME
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+from users.models import User
+
+
+@pytest.fixture(autouse=True)
+def strict_query_budgets(settings):
+    """
+    Превышение бюджета SQL-запросов действия (api/metrics.py) — ошибка.
+    """
+    settings.METRICS_ENABLED = True
+    settings.QUERY_BUDGET_STRICT = True
+
+
+@pytest.fixture(autouse=True)
+def clear_caches(settings, tmp_path):
+    """
+    Кеши живут весь процесс: версии и тела рецептов одного теста
+    не должны попадать в другой.
+    """
+    settings.MEDIA_ROOT = tmp_path
+    for alias in settings.CACHES:
+        caches[alias].clear()
+    yield
+    for alias in settings.CACHES:
+        caches[alias].clear()
+
+
+@pytest.fixture
+def make_user(db):
+    def make(username):
+        return User.objects.create_user(
+            username=username,
+            email=f"{username}@foodgram.local",
+            password="pass-Word-42",
+            first_name=username,
+            last_name=username,
+        )
+
+    return make
+
+
+@pytest.fixture
+def author(make_user):
+    return make_user("author")
+
+
+@pytest.fixture
+def viewer(make_user):
+    return make_user("viewer")
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def viewer_client(viewer):
+    client = APIClient()
+    client.force_authenticate(viewer)
+    return client
+
+
+@pytest.fixture
+def ingredients(db):
+    return [
+        Ingredient.objects.create(name=name, measurement_unit=unit)
+        for name, unit in (
+            ("мука", "г"),
+            ("сахар", "г"),
+            ("молоко", "мл"),
+            ("яйца", "шт."),
+            ("соль", "ч. л."),
+        )
+    ]
+
+
+@pytest.fixture
+def make_recipe(author, ingredients):
+    """
+    Рецепт через ORM, с сигналами; amounts — {индекс ингредиента: количество}.
+    """
+
+    def make(name="Рецепт", amounts=None, recipe_author=None):
+        recipe = Recipe.objects.create(
+            author=recipe_author or author,
+            name=name,
+            text="Описание",
+            cooking_time=10,
+            image=IMAGE_NAME,
+        )
+        for index, amount in (amounts or {0: 100, 1: 50}).items():
+            RecipeIngredient.objects.create(
+                recipe=recipe, ingredient=ingredients[index], amount=amount
+            )
+        return recipe
+
+    return make
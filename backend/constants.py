@@ -1,6 +1,7 @@
 DEFAULT_PAGE_SIZE = 6
 NAME_MAX_LENGTH = 200
 UNIT_MAX_LENGTH = 50
+SHORT_CODE_MAX_LENGTH = 16
 
 MAX_LENGTH_USERNAME = 150
 MAX_LENGTH_FIRSTNAME = 150
@@ -8,6 +9,9 @@ MAX_LENGTH_LASTNAME = 150
 
 MIN_COOKING_TIME = 1
 
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
+
 ERROR_MESSAGES = {
     "first_name_required": "Поле 'first_name' обязательно.",
     "first_name_blank": "Поле 'first_name' не может быть пустым.",
@@ -0,0 +1,24 @@
+# gunicorn.conf.py
+
+"""
+Настройки gunicorn; файл подхватывается автоматически из рабочего каталога.
+
+SERVER_MODE=wsgi (по умолчанию) — синхронные воркеры и config.wsgi.
+SERVER_MODE=asgi — воркеры uvicorn и config.asgi: один процесс держит
+много медленных соединений, горячие пути чтения обслуживаются
+async-представлениями (recipes/async_views.py).
+"""
+
+# Стандартная библиотека
+import os
+
+SERVER_MODE = os.getenv("SERVER_MODE", "wsgi")
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", 1))
+
+if SERVER_MODE == "asgi":
+    wsgi_app = "config.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+else:
+    wsgi_app = "config.wsgi:application"
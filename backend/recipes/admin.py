@@ -38,11 +38,20 @@ class IngredientAdmin(_admin_pkg.ModelAdmin):
 class RecipeAdmin(_admin_pkg.ModelAdmin):
     """
     Настройки админки Recipe:
-    • Отображает ключевые поля и счётчик избранного;
+    • Отображает ключевые поля и счётчики избранного и корзин
+      (хранятся в самом рецепте, без COUNT на каждую строку);
     • Встраивает Inline для ингредиентов.
     """
 
-    list_display = ("id", "name", "author", "cooking_time", "favorites_count")
+    list_display = (
+        "id",
+        "name",
+        "author",
+        "cooking_time",
+        "favorites_count",
+        "cart_count",
+    )
+    readonly_fields = ("favorites_count", "cart_count")
     search_fields = ("name", "author__username")
     inlines = [RecipeIngrInline]
     fieldsets = (
@@ -50,16 +59,9 @@ class RecipeAdmin(_admin_pkg.ModelAdmin):
             None,
             {"fields": ("name", "author", "image", "text", "cooking_time")},
         ),
+        ("Счётчики", {"fields": readonly_fields}),
     )
 
-    def favorites_count(self, obj):
-        """
-        Подсчитывает, сколько раз рецепт добавлен в избранное.
-        """
-        return _Favorite.objects.filter(recipe=obj).count()
-
-    favorites_count.short_description = "Добавлено в избранное"
-
 
 @_admin_pkg.register(_RecipeIngr)
 class RecipeIngrAdmin(_admin_pkg.ModelAdmin):
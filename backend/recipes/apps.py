@@ -16,3 +16,7 @@ class RecipesConfig(_AppConfig):
 
     default_auto_field = _DEFAULT_AUTO_FIELD
     name = _APP_NAME
+
+    def ready(self):
+        """Подключает обработчики сигналов моделей."""
+        from . import signals  # noqa: F401
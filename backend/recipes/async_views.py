@@ -0,0 +1,300 @@
+# recipes/async_views.py
+
+"""
+Async-представления горячих путей чтения для ASGI-режима.
+
+Подключаются в api/urls.py и config/urls.py при ASYNC_VIEWS=1
+(config/asgi.py включает его по умолчанию):
+
+• лента и карточка рецепта, поиск ингредиентов — GET;
+• выгрузка списка покупок в txt/csv/json — поток строк из async ORM;
+• переход по короткой ссылке.
+
+SQL страницы выполняется через async ORM. Остальная синхронная работа
+(аутентификация DRF, django-filter, кеш тел рецептов) уходит в
+sync_to_async и не блокирует цикл событий. Запросы и ответы строятся
+методами RecipeViewSet и IngredientViewSet, поэтому формат совпадает
+с WSGI-режимом; ответы отдаются только в JSON.
+
+Прочие методы (создание, правка, удаление, загрузка изображений)
+передаются синхронным вьюсетам: Django выполняет их в отдельном потоке,
+а тело запроса к этому моменту уже прочитано сервером асинхронно.
+"""
+
+# Стандартная библиотека
+from functools import wraps
+from http import HTTPStatus
+
+# Сторонние библиотеки
+from api.metrics import label_request
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponseRedirect, StreamingHttpResponse
+from rest_framework.exceptions import (APIException, AuthenticationFailed,
+                                       NotAuthenticated, ValidationError)
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+
+# Локальные импорты
+from .etags import catalogue_etag, not_modified, recipe_etag, set_etag
+from .filters import IngredientFilter
+from .models import Recipe, ShoppingCart, ShortLink
+from .renderers import CSVRenderer, PlainTextRenderer
+from .serializers.ingredient import IngredientSerializer
+from .shopping_list import STREAM_FORMATS, aggregate_cart
+from .shortlinks import aresolve_code
+from .views import IngredientViewSet, RecipeViewSet
+
+SAFE_METHODS = ("GET", "HEAD")
+
+
+def _render(response, renderer=None):
+    """
+    Рендерит DRF Response без цикла APIView.finalize_response.
+    """
+    renderer = renderer or JSONRenderer()
+    response.accepted_renderer = renderer
+    response.accepted_media_type = renderer.media_type
+    response.renderer_context = {"response": response}
+    return response.render()
+
+
+def _error_response(exc, request, renderer=None):
+    """
+    Ответ на исключение в том же виде, что отдаёт APIView.
+    """
+    if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+        authenticators = request.authenticators
+        if authenticators:
+            exc.auth_header = authenticators[0].authenticate_header(request)
+        else:
+            exc.status_code = HTTPStatus.FORBIDDEN
+    return _render(exception_handler(exc, {"request": request}), renderer)
+
+
+def async_read_view(
+    sync_view, action, query_budget=None, get_renderer=None, delegate=None
+):
+    """
+    Декоратор async-обработчика GET/HEAD.
+
+    Обработчик получает DRF Request с уже аутентифицированным
+    пользователем; прочие методы и запросы, для которых delegate(request)
+    истинно, уходят в синхронный sync_view до аутентификации.
+    get_renderer(request) выбирает рендерер ошибок, по умолчанию JSON.
+    """
+    sync_view = sync_to_async(sync_view)
+
+    def decorator(handler):
+        @wraps(handler)
+        async def view(request, *args, **kwargs):
+            if request.method not in SAFE_METHODS or (
+                delegate and delegate(request)
+            ):
+                return await sync_view(request, *args, **kwargs)
+            label_request(request, action, query_budget)
+            drf_request = Request(
+                request,
+                authenticators=[
+                    auth()
+                    for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+                ],
+            )
+            try:
+                # Аутентификаторы DRF синхронные и могут ходить в БД
+                await sync_to_async(lambda: drf_request.user)()
+                return await handler(drf_request, *args, **kwargs)
+            except (APIException, Http404) as exc:
+                renderer = get_renderer(drf_request) if get_renderer else None
+                return _error_response(exc, drf_request, renderer)
+
+        # как у APIView.as_view: авторизация по токену, не по сессии
+        view.csrf_exempt = True
+        return view
+
+    return decorator
+
+
+def _recipe_view(request, action, **kwargs):
+    """
+    RecipeViewSet для построения запросов и сериализации.
+    """
+    return RecipeViewSet(
+        request=request,
+        args=(),
+        kwargs=kwargs,
+        action=action,
+        format_kwarg=None,
+    )
+
+
+async def _recipe_queryset(view):
+    # django-filter проверяет ?author= запросом к БД
+    return await sync_to_async(
+        lambda: view.filter_queryset(view.get_queryset())
+    )()
+
+
+# ────────────────────────────────────────────────────
+#        Рецепты
+# ────────────────────────────────────────────────────
+@async_read_view(
+    RecipeViewSet.as_view(
+        {"get": "list", "post": "create"}, basename="recipe", detail=False
+    ),
+    "recipe.list",
+    RecipeViewSet.query_budgets["list"],
+)
+async def recipe_list(request):
+    """
+    GET /api/recipes/ — фильтры, поиск, сортировка и обе пагинации
+    как в RecipeViewSet.list.
+    """
+    view = _recipe_view(request, "list")
+    queryset = await _recipe_queryset(view)
+    page = await view.paginator.apaginate_queryset(
+        queryset, request, view=view
+    )
+    data = await sync_to_async(
+        lambda: view.get_serializer(page, many=True).data
+    )()
+    return _render(view.get_paginated_response(data))
+
+
+@async_read_view(
+    RecipeViewSet.as_view(
+        {
+            "get": "retrieve",
+            "put": "update",
+            "patch": "partial_update",
+            "delete": "destroy",
+        },
+        basename="recipe",
+        detail=True,
+    ),
+    "recipe.retrieve",
+    RecipeViewSet.query_budgets["retrieve"],
+)
+async def recipe_detail(request, pk):
+    """
+    GET /api/recipes/{id}/ с поддержкой If-None-Match.
+    """
+    view = _recipe_view(request, "retrieve", pk=pk)
+    queryset = await _recipe_queryset(view)
+    recipe = await queryset.select_related("author").filter(pk=pk).afirst()
+    if recipe is None:
+        # то же сообщение, что у get_object_or_404 в RecipeViewSet
+        raise Http404(
+            f"No {Recipe._meta.object_name} matches the given query."
+        )
+    # Версия каталога для ETag читается из кеша Django
+    etag = await sync_to_async(recipe_etag)(recipe, request.user)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    data = await sync_to_async(lambda: view.get_serializer(recipe).data)()
+    return set_etag(_render(Response(data)), etag, private=True)
+
+
+# Аргументы @action (renderer_classes и др.) as_view получает только
+# от роутера: без них DRF отклонит ?format=pdf ответом 404
+_download_shopping_cart_sync = RecipeViewSet.as_view(
+    {"get": "download_shopping_cart"},
+    basename="recipe",
+    detail=False,
+    **RecipeViewSet.download_shopping_cart.kwargs,
+)
+
+
+def _shopping_list_renderer(request):
+    """
+    Рендерер служебных ответов, который выбрал бы DRF по ?format=.
+    """
+    return {"json": JSONRenderer, "csv": CSVRenderer}.get(
+        request.query_params.get("format"), PlainTextRenderer
+    )()
+
+
+def _not_streamed(request):
+    # PDF рендерится в пуле воркеров и потоком не отдаётся
+    return request.GET.get("format", "txt") not in STREAM_FORMATS
+
+
+@async_read_view(
+    _download_shopping_cart_sync,
+    "recipe.download_shopping_cart",
+    RecipeViewSet.query_budgets["download_shopping_cart"],
+    get_renderer=_shopping_list_renderer,
+    delegate=_not_streamed,
+)
+async def download_shopping_cart(request):
+    """
+    GET /api/recipes/download_shopping_cart/ — txt, csv и json отдаются
+    потоком, строки читаются из курсора по мере отправки клиенту.
+    """
+    export_format = request.query_params.get("format", "txt")
+    user = request.user
+    if not user.is_authenticated:
+        raise NotAuthenticated
+    if not await ShoppingCart.objects.filter(user=user).aexists():
+        return _render(
+            Response(
+                {"error": "Корзина пуста — скачивать нечего."},
+                status=HTTPStatus.BAD_REQUEST,
+            ),
+            _shopping_list_renderer(request),
+        )
+
+    stream_format = STREAM_FORMATS[export_format]
+    response = StreamingHttpResponse(
+        stream_format.aiter(aggregate_cart(user)),
+        content_type=stream_format.content_type,
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="ingredients.{export_format}"'
+    )
+    return response
+
+
+# ────────────────────────────────────────────────────
+#        Ингредиенты
+# ────────────────────────────────────────────────────
+@async_read_view(
+    IngredientViewSet.as_view(
+        {"get": "list"}, basename="ingredient", detail=False
+    ),
+    "ingredient.list",
+    IngredientViewSet.query_budgets["list"],
+)
+async def ingredient_list(request):
+    """
+    GET /api/ingredients/?name= с ETag по версии каталога.
+    """
+    etag = await sync_to_async(catalogue_etag)(request)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    filterset = IngredientFilter(
+        request.query_params, queryset=IngredientViewSet.queryset.all()
+    )
+    if not filterset.is_valid():
+        raise ValidationError(filterset.errors)
+    ingredients = [ingredient async for ingredient in filterset.qs]
+    data = IngredientSerializer(ingredients, many=True).data
+    return set_etag(_render(Response(data)), etag)
+
+
+# ────────────────────────────────────────────────────
+#        Короткие ссылки
+# ────────────────────────────────────────────────────
+async def short_link_redirect(request, code):
+    """
+    Переход по короткой ссылке на страницу рецепта во фронтенде.
+    """
+    try:
+        recipe_id = await aresolve_code(code)
+    except ShortLink.DoesNotExist:
+        raise Http404("Короткая ссылка не найдена.")
+    return HttpResponseRedirect(f"/recipes/{recipe_id}")
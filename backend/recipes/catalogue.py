@@ -0,0 +1,155 @@
+# recipes/catalogue.py
+
+"""
+Каталог ингредиентов: версия каталога и автодополнение по названию.
+
+Версия хранится в общем кеше SHARED_CACHE_ALIAS (Redis или файлы
+на диске контейнера) и меняется сигналами при сохранении и удалении
+Ingredient и командой load_ingredients. Все воркеры и узлы с этим
+кешем видят одну версию: ETag совпадают, а индекс автодополнения
+перестраивается в каждом воркере после любого изменения каталога.
+"""
+
+# Стандартная библиотека
+import threading
+import uuid
+from bisect import bisect_left
+
+# Сторонние библиотеки
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Case, IntegerField, Value, When
+
+# Локальные импорты
+from .models import Ingredient
+
+CATALOGUE_VERSION_KEY = "ingredient-catalogue-version"
+
+
+def _backend():
+    return caches[settings.SHARED_CACHE_ALIAS]
+
+
+def catalogue_version():
+    """
+    Текущая версия каталога; создаётся при первом обращении.
+    """
+    version = _backend().get(CATALOGUE_VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        # add не перезапишет версию, выставленную другим воркером
+        if not _backend().add(CATALOGUE_VERSION_KEY, version, None):
+            version = _backend().get(CATALOGUE_VERSION_KEY, version)
+    return version
+
+
+def bump_catalogue_version():
+    """
+    Помечает каталог изменённым после фиксации транзакции.
+
+    Раньше нельзя: запрос между сменой версии и фиксацией построил бы
+    индекс и ETag по старым строкам под новой версией.
+    """
+    transaction.on_commit(
+        lambda: _backend().set(CATALOGUE_VERSION_KEY, uuid.uuid4().hex, None)
+    )
+
+
+class IngredientIndex:
+    """
+    Отсортированный массив названий в casefold для поиска по префиксу.
+
+    Загружается один раз на воркер и перестраивается,
+    когда меняется версия каталога.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        # (ключи, записи) заменяются одной ссылкой, чтобы читатели
+        # не увидели половину перестроенного индекса
+        self._data = ([], [])
+
+    def _ensure_fresh(self):
+        version = catalogue_version()
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            rows = sorted(
+                (
+                    (
+                        row["name"].casefold(),
+                        row["measurement_unit"],
+                        row["id"],
+                    ),
+                    row,
+                )
+                for row in Ingredient.objects.values(
+                    "id", "name", "measurement_unit"
+                )
+            )
+            self._data = (
+                [sort_key[0] for sort_key, _row in rows],
+                [row for _sort_key, row in rows],
+            )
+            self._version = version
+
+    def search(self, query, limit):
+        """
+        Сначала совпадения по префиксу (бинарный поиск),
+        затем совпадения по подстроке; не более limit элементов.
+        """
+        self._ensure_fresh()
+        keys, items = self._data
+        needle = query.casefold()
+
+        found = []
+        pos = bisect_left(keys, needle)
+        while pos < len(keys) and keys[pos].startswith(needle):
+            if len(found) == limit:
+                return found
+            found.append(items[pos])
+            pos += 1
+
+        for key, item in zip(keys, items):
+            if len(found) == limit:
+                break
+            if needle in key and not key.startswith(needle):
+                found.append(item)
+        return found
+
+
+ingredient_index = IngredientIndex()
+
+
+def search_db(query, limit):
+    """
+    Тот же порядок выдачи средствами БД.
+
+    На PostgreSQL icontains обслуживается триграммным GIN-индексом
+    ingredient_name_trgm_idx.
+    """
+    return list(
+        Ingredient.objects.filter(name__icontains=query)
+        .annotate(
+            match_rank=Case(
+                When(name__istartswith=query, then=Value(0)),
+                default=Value(1),
+                output_field=IntegerField(),
+            )
+        )
+        .order_by("match_rank", "name", "measurement_unit")
+        .values("id", "name", "measurement_unit")[:limit]
+    )
+
+
+def autocomplete(query, limit):
+    """
+    Подсказки по названию ингредиента.
+    """
+    if settings.INGREDIENT_AUTOCOMPLETE_IN_MEMORY:
+        return ingredient_index.search(query, limit)
+    return search_db(query, limit)
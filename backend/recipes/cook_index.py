@@ -0,0 +1,216 @@
+# recipes/cook_index.py
+
+"""
+Обратный индекс «ингредиент → рецепты» для подбора рецептов
+по имеющимся продуктам (GET /api/recipes/what_can_i_cook/).
+
+Индекс живёт в памяти воркера: для каждого ингредиента — отсортированный
+массив id рецептов (array('I')), для каждого рецепта — массив id его
+ингредиентов. Поиск не обращается к БД: считает, сколько ингредиентов
+каждого рецепта есть у пользователя, и сортирует по числу недостающих.
+
+Синхронизация между воркерами — журнал изменений в общем кеше
+SHARED_CACHE_ALIAS (Redis или файлы на диске контейнера): запись
+рецепта после фиксации транзакции увеличивает счётчик cook-index-seq
+и кладёт id рецепта под ключ с этим номером. Воркер перед поиском
+дочитывает журнал и перечитывает из БД только изменённые рецепты;
+при разрыве журнала индекс строится заново.
+
+Номер записи должен выдаваться атомарно. В Redis это INCR; у файлового
+кеша incr — чтение и запись, поэтому публикация и создание счётчика
+идут под flock на файле в каталоге кеша (один контейнер — один диск).
+"""
+
+# Стандартная библиотека
+import fcntl
+import heapq
+import os
+import threading
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+# Сторонние библиотеки
+from api.background import OnCommitBatch
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+
+# Локальные импорты
+from .models import RecipeIngredient
+
+SEQ_KEY = "cook-index-seq"
+CHANGE_PREFIX = "cook-index-change"
+# Сколько живёт запись журнала; отставшие дольше воркеры строят индекс заново
+CHANGE_TTL = 60 * 60
+# Больше изменений за раз дешевле перечитать целиком
+MAX_DELTA = 500
+# Файл блокировки в каталоге файлового кеша; clear() и вытеснение
+# трогают только файлы *.djcache
+LOCK_NAME = "cook-index.lock"
+
+
+def _backend():
+    return caches[settings.SHARED_CACHE_ALIAS]
+
+
+@contextmanager
+def _seq_lock():
+    """
+    Исключительная блокировка счётчика журнала между процессами;
+    для Redis не нужна.
+    """
+    if not isinstance(_backend(), FileBasedCache):
+        yield
+        return
+    location = settings.CACHES[settings.SHARED_CACHE_ALIAS]["LOCATION"]
+    os.makedirs(location, exist_ok=True)
+    with open(os.path.join(location, LOCK_NAME), "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _current_seq():
+    seq = _backend().get(SEQ_KEY)
+    if seq is None:
+        with _seq_lock():
+            _backend().add(SEQ_KEY, 0, None)
+            seq = _backend().get(SEQ_KEY, 0)
+    return seq
+
+
+def _next_seq():
+    try:
+        return _backend().incr(SEQ_KEY)
+    except ValueError:
+        _backend().add(SEQ_KEY, 0, None)
+        return _backend().incr(SEQ_KEY)
+
+
+def _publish(recipe_ids):
+    with _seq_lock():
+        for recipe_id in recipe_ids:
+            _backend().set(
+                f"{CHANGE_PREFIX}:{_next_seq()}", recipe_id, CHANGE_TTL
+            )
+
+
+_changes = OnCommitBatch(_publish)
+
+
+def record_recipe_change(recipe_id):
+    """
+    Публикует изменение состава рецепта после фиксации транзакции.
+
+    Повторные вызовы в одной транзакции дают одну запись журнала.
+    """
+    _changes.add(recipe_id)
+
+
+class CookIndex:
+    """
+    Обратный индекс ингредиентов с инкрементальным обновлением.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seq = None
+        self._postings = {}
+        self._recipes = {}
+
+    # ───── синхронизация ─────
+    def _rebuild(self, seq):
+        postings = defaultdict(lambda: array("I"))
+        recipes = defaultdict(lambda: array("I"))
+        rows = RecipeIngredient.objects.order_by("ingredient_id", "recipe_id")
+        for ingredient_id, recipe_id in rows.values_list(
+            "ingredient_id", "recipe_id"
+        ).iterator(chunk_size=5000):
+            # строки идут по (ingredient, recipe) — оба массива
+            # уже отсортированы
+            postings[ingredient_id].append(recipe_id)
+            recipes[recipe_id].append(ingredient_id)
+        self._postings = dict(postings)
+        self._recipes = dict(recipes)
+        self._seq = seq
+
+    def _patch(self, recipe_ids):
+        fresh = defaultdict(set)
+        rows = RecipeIngredient.objects.filter(recipe_id__in=recipe_ids)
+        for recipe_id, ingredient_id in rows.values_list(
+            "recipe_id", "ingredient_id"
+        ):
+            fresh[recipe_id].add(ingredient_id)
+
+        for recipe_id in recipe_ids:
+            old = set(self._recipes.get(recipe_id, ()))
+            new = fresh.get(recipe_id, set())
+            for ingredient_id in old - new:
+                posting = self._postings[ingredient_id]
+                del posting[bisect_left(posting, recipe_id)]
+                if not posting:
+                    del self._postings[ingredient_id]
+            for ingredient_id in new - old:
+                insort(
+                    self._postings.setdefault(ingredient_id, array("I")),
+                    recipe_id,
+                )
+            if new:
+                self._recipes[recipe_id] = array("I", sorted(new))
+            else:
+                self._recipes.pop(recipe_id, None)
+
+    def _ensure_fresh(self):
+        """
+        Дочитывает журнал изменений; вызывается под self._lock.
+        """
+        current = _current_seq()
+        if self._seq == current:
+            return
+        if (
+            self._seq is None
+            or current < self._seq
+            or current - self._seq > MAX_DELTA
+        ):
+            self._rebuild(current)
+            return
+        keys = [
+            f"{CHANGE_PREFIX}:{seq}"
+            for seq in range(self._seq + 1, current + 1)
+        ]
+        changes = _backend().get_many(keys)
+        if len(changes) < len(keys):
+            # запись истекла или ещё не записана — надёжнее перечитать всё
+            self._rebuild(current)
+            return
+        self._patch(set(changes.values()))
+        self._seq = current
+
+    # ───── поиск ─────
+    def rank(self, ingredient_ids, max_missing=None, limit=None):
+        """
+        [(recipe_id, недостающих ингредиентов)] по убыванию покрытия:
+        сначала рецепты, для которых есть всё, затем с наименьшим
+        числом недостающих; при равенстве — больше совпадений, новее.
+        """
+        limit = limit or settings.COOK_INDEX_MAX_RESULTS
+        with self._lock:
+            self._ensure_fresh()
+            hits = Counter()
+            for ingredient_id in set(ingredient_ids):
+                hits.update(self._postings.get(ingredient_id, ()))
+            candidates = (
+                (len(self._recipes[recipe_id]) - matched, -matched, -recipe_id)
+                for recipe_id, matched in hits.items()
+            )
+            if max_missing is not None:
+                candidates = (c for c in candidates if c[0] <= max_missing)
+            best = heapq.nsmallest(limit, candidates)
+        return [(-neg_id, missing) for missing, _neg_matched, neg_id in best]
+
+
+cook_index = CookIndex()
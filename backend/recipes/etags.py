@@ -0,0 +1,86 @@
+# recipes/etags.py
+
+"""
+ETag и условные GET-запросы для каталога ингредиентов и карточки рецепта.
+
+ETag строится из дешёвых отметок версии (версия каталога, updated_at
+рецепта, готовность превью), поэтому при совпадении If-None-Match
+ответ 304 отдаётся без сериализации.
+"""
+
+# Стандартная библиотека
+import hashlib
+
+# Сторонние библиотеки
+from api.images import thumbnails_ready
+from django.utils.cache import (get_conditional_response, patch_cache_control,
+                                patch_vary_headers, quote_etag)
+
+# Локальные импорты
+from .catalogue import catalogue_version
+
+
+def _digest(*parts):
+    raw = "|".join(str(part) for part in parts)
+    return quote_etag(hashlib.sha1(raw.encode("utf-8")).hexdigest())
+
+
+def catalogue_etag(request):
+    """
+    Версия каталога плюс query-параметры: ?name= меняет выдачу.
+    """
+    return _digest("ingredients", catalogue_version(), request.GET.urlencode())
+
+
+def recipe_etag(recipe_obj, user):
+    """
+    Версия карточки рецепта для конкретного зрителя.
+
+    Учитывает updated_at рецепта, версию каталога (названия ингредиентов),
+    готовность превью изображения и аватара (image_thumbnails указывают
+    на оригинал, пока превью строятся), данные автора и персональные
+    флаги из аннотаций RecipeViewSet.
+    """
+    author = recipe_obj.author
+    return _digest(
+        "recipe",
+        recipe_obj.id,
+        recipe_obj.updated_at.isoformat(),
+        catalogue_version(),
+        thumbnails_ready(recipe_obj.image.name),
+        thumbnails_ready(author.avatar.name) if author.avatar else "",
+        author.id,
+        author.username,
+        author.first_name,
+        author.last_name,
+        author.email,
+        author.avatar.name if author.avatar else "",
+        user.id if user.is_authenticated else "anon",
+        getattr(recipe_obj, "is_favorited", ""),
+        getattr(recipe_obj, "is_in_shopping_cart", ""),
+        getattr(recipe_obj, "author_is_subscribed", ""),
+    )
+
+
+def not_modified(request, etag):
+    """
+    304-ответ, если If-None-Match совпал с etag, иначе None.
+    """
+    response = get_conditional_response(request._request, etag=etag)
+    if response is not None:
+        response["ETag"] = etag
+    return response
+
+
+def set_etag(response, etag, private=False):
+    """
+    Проставляет ETag и заставляет клиентов переспрашивать сервер
+    при каждом использовании закешированной копии.
+    """
+    response["ETag"] = etag
+    if private:
+        patch_cache_control(response, no_cache=True, private=True)
+        patch_vary_headers(response, ("Authorization",))
+    else:
+        patch_cache_control(response, no_cache=True, public=True)
+    return response
@@ -1,4 +1,4 @@
-# users/fields.py
+# recipes/fields.py
 
 """
 Поле для сериализаторов: обработка изображений в Base64.
@@ -6,10 +6,21 @@
 """
 
 # Импорт оригинального поля с псевдонимом
+from api.images import decode_base64_image as _decode
 from drf_extra_fields.fields import Base64ImageField as _DRF_Base64ImageField
 
-# Локальный алиас для удобства использования в приложениях
-_CustomBase64Field = _DRF_Base64ImageField
+
+class _CustomBase64Field(_DRF_Base64ImageField):
+    """
+    Декодирует base64 кусками и проверяет изображение по заголовку
+    (см. api/images.py) вместо полной загрузки в память.
+    """
+
+    def to_internal_value(self, base64_data):
+        if base64_data in self.EMPTY_VALUES:
+            return None
+        return _decode(base64_data)
+
 
 # Экспортируем под привычным именем для сериализаторов
 Base64ImageField = _CustomBase64Field
@@ -0,0 +1,166 @@
+# Стандартная библиотека
+import json
+import time
+
+# Сторонние библиотеки
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+# Локальные импорты
+from recipes.management.commands.run_benchmark import percentile
+from recipes.management.commands.seed_benchmark import IMAGE_NAME
+from recipes.models import (Ingredient, Recipe, RecipeIngredient, ShoppingCart,
+                            ShoppingListItem)
+from recipes.shopping_list import STREAM_FORMATS, aggregate_cart
+from recipes.shopping_totals import rebuild_shopping_lists
+from users.models import User
+
+# Единицы синтетических ингредиентов: у каждого названия есть пара
+# строк в разных, но совместимых единицах, которые сливаются при
+# нормализации
+UNIT_PAIRS = (("г", "кг"), ("мл", "л"), ("ч. л.", "ст. л."), ("шт.", "шт"))
+PERCENTILES = (50, 95, 99)
+INGREDIENT_PREFIX = "бенч-ингредиент"
+
+
+class Command(BaseCommand):
+    help = (
+        "Time shopping list aggregation for a large synthetic cart with and "
+        "without unit normalization, print JSON. Nothing is left in the "
+        "database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lines",
+            type=int,
+            default=600,
+            help="Distinct ingredient rows (name, unit) in the cart",
+        )
+        parser.add_argument(
+            "--per-recipe", type=int, default=12, help="Ingredients per recipe"
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=50,
+            help="Timed runs per configuration",
+        )
+        parser.add_argument(
+            "--output", help="Write the JSON report here instead of stdout"
+        )
+
+    def handle(self, *args, **options):
+        # Данные создаются в транзакции и откатываются в конце
+        with transaction.atomic():
+            user = self._cart(options["lines"], options["per_recipe"])
+            results = {}
+            for materialized in (False, True):
+                for normalize in (False, True):
+                    name = (
+                        f"{'materialized' if materialized else 'aggregate'}"
+                        f"{'+normalize' if normalize else ''}"
+                    )
+                    with override_settings(
+                        SHOPPING_LIST_MATERIALIZED=materialized,
+                        SHOPPING_LIST_NORMALIZE_UNITS=normalize,
+                    ):
+                        results[name] = self._measure(user, options["repeat"])
+            transaction.set_rollback(True)
+
+        report = {
+            "lines": options["lines"],
+            "recipes": -(-options["lines"] // options["per_recipe"]),
+            "repeat": options["repeat"],
+            "configurations": results,
+        }
+        text = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+            self.stderr.write(f"Report written to {options['output']}")
+        else:
+            self.stdout.write(text)
+
+    def _cart(self, lines, per_recipe):
+        """
+        Пользователь с корзиной, в которой lines разных строк ингредиентов.
+        """
+        user = User.objects.create(
+            email="shopping-list@bench.foodgram.local",
+            username="shopping-list-bench",
+            first_name="Бенч",
+            last_name="Список",
+        )
+        # bulk_create: сигналы (счётчики, индексы) для временных данных
+        # не нужны
+        Ingredient.objects.bulk_create(
+            Ingredient(
+                name=f"{INGREDIENT_PREFIX} {number // 2}",
+                measurement_unit=UNIT_PAIRS[number // 2 % len(UNIT_PAIRS)][
+                    number % 2
+                ],
+            )
+            for number in range(lines)
+        )
+        ingredients = list(
+            Ingredient.objects.filter(
+                name__startswith=INGREDIENT_PREFIX
+            ).order_by("pk")
+        )
+        chunks = [
+            ingredients[start:start + per_recipe]
+            for start in range(0, len(ingredients), per_recipe)
+        ]
+        Recipe.objects.bulk_create(
+            Recipe(
+                author=user,
+                name=f"Бенч-рецепт {number}",
+                text="Список покупок",
+                cooking_time=10,
+                image=IMAGE_NAME,
+            )
+            for number in range(len(chunks))
+        )
+        recipes = list(Recipe.objects.filter(author=user).order_by("pk"))
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
+                recipe=recipe, ingredient=ingredient, amount=index + 1
+            )
+            for recipe, chunk in zip(recipes, chunks)
+            for index, ingredient in enumerate(chunk)
+        )
+        ShoppingCart.objects.bulk_create(
+            ShoppingCart(user=user, recipe=recipe) for recipe in recipes
+        )
+        rebuild_shopping_lists([user.pk])
+        self.stderr.write(
+            f"  cart: {len(recipes)} recipes, "
+            f"{len(ingredients)} ingredient rows, "
+            f"{ShoppingListItem.objects.filter(user=user).count()} "
+            "materialized"
+        )
+        return user
+
+    def _measure(self, user, repeat):
+        """
+        Время полного текстового списка: запрос, чтение строк и форматирование.
+        """
+        stream_format = STREAM_FORMATS["txt"]
+        timings = []
+        lines = 0
+        for _run in range(repeat + 1):
+            started = time.perf_counter()
+            body = "".join(stream_format.iter(aggregate_cart(user)))
+            timings.append((time.perf_counter() - started) * 1000)
+            lines = body.count("\n") - 1
+        # первый прогон прогревает кеш планов и страниц БД
+        timings = sorted(timings[1:])
+        return {
+            "output_lines": lines,
+            **{
+                f"p{percent}_ms": round(percentile(timings, percent), 3)
+                for percent in PERCENTILES
+            },
+            "mean_ms": round(sum(timings) / len(timings), 3),
+        }
@@ -1,26 +1,156 @@
 # Стандартная библиотека
+import csv
 import json
+import time
+from itertools import islice
+from pathlib import Path
 
 # Сторонние библиотеки
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 # Локальные импорты
+from recipes.catalogue import bump_catalogue_version
 from recipes.models import Ingredient
 
+# Размер куска файла, читаемого за раз при разборе JSON
+READ_CHUNK = 64 * 1024
+CSV_HEADER = ("name", "measurement_unit")
+
+
+def iter_json(file_obj):
+    """
+    Потоково разбирает JSON-массив объектов, не загружая файл целиком.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    started = False
+    while True:
+        chunk = file_obj.read(READ_CHUNK)
+        buffer += chunk
+        pos = 0
+        while True:
+            # пропускаем пробелы, разделители и открывающую скобку
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,[":
+                if buffer[pos] == "[":
+                    started = True
+                pos += 1
+            if pos < len(buffer) and buffer[pos] == "]":
+                return
+            try:
+                item, pos_end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # объект обрезан концом куска — дочитываем файл
+                break
+            if not started:
+                raise CommandError("Expected a JSON array of objects.")
+            try:
+                yield item["name"], item["measurement_unit"]
+            except (KeyError, TypeError):
+                raise CommandError(
+                    f"Expected an object with name and measurement_unit, "
+                    f"got {item!r}."
+                )
+            pos = pos_end
+        buffer = buffer[pos:]
+        if not chunk:
+            if buffer.strip():
+                raise CommandError("Malformed JSON at the end of the file.")
+            return
+
+
+def iter_csv(file_obj):
+    """
+    Читает строки name,measurement_unit; заголовок необязателен.
+    """
+    reader = csv.reader(file_obj)
+    for row in reader:
+        if not row or tuple(row) == CSV_HEADER:
+            continue
+        if len(row) != len(CSV_HEADER):
+            raise CommandError(
+                f"Line {reader.line_num}: expected name,measurement_unit."
+            )
+        yield row[0], row[1]
+
+
+READERS = {"json": iter_json, "csv": iter_csv}
+
 
 class Command(BaseCommand):
-    help = "Load ingredients from a JSON file"
+    help = "Load ingredients from a JSON or CSV file"
 
     def add_arguments(self, parser):
-        parser.add_argument("file", type=str, help="Path to the JSON file")
+        parser.add_argument(
+            "file", type=str, help="Path to the JSON or CSV file"
+        )
+        parser.add_argument(
+            "--format",
+            choices=sorted(READERS),
+            help="File format; detected from the extension by default",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows per INSERT statement",
+        )
 
     def handle(self, *args, **options):
-        file_path = options["file"]
-        with open(file_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        file_path = Path(options["file"])
+        file_format = options["format"] or file_path.suffix.lstrip(".").lower()
+        if file_format not in READERS:
+            raise CommandError(f"Unsupported file format: {file_format!r}")
+        batch_size = options["batch_size"]
 
-        for item in data:
-            Ingredient.objects.get_or_create(
-                name=item["name"], measurement_unit=item["measurement_unit"]
-            )
+        started = time.monotonic()
+        before = Ingredient.objects.count()
+        seen = set()
+        total = 0
 
-        self.stdout.write(self.style.SUCCESS("Ingredients loaded."))
+        # Ошибка в любой строке откатывает всю загрузку
+        with transaction.atomic(), open(
+            file_path, "r", encoding="utf-8", newline=""
+        ) as f:
+            rows = READERS[file_format](f)
+            while True:
+                chunk = list(islice(rows, batch_size))
+                if not chunk:
+                    break
+                total += len(chunk)
+                batch = []
+                for name, unit in chunk:
+                    if not isinstance(name, str) or not isinstance(unit, str):
+                        raise CommandError(
+                            f"Name and unit must be strings: {name!r}, "
+                            f"{unit!r}."
+                        )
+                    key = (name.strip(), unit.strip())
+                    if not all(key):
+                        raise CommandError(
+                            f"Empty name or unit: {name!r}, {unit!r}."
+                        )
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    batch.append(
+                        Ingredient(name=key[0], measurement_unit=key[1])
+                    )
+                # Конфликты по unique_ingredient_name_unit пропускаются БД
+                Ingredient.objects.bulk_create(batch, ignore_conflicts=True)
+                if options["verbosity"] > 1:
+                    self.stdout.write(f"  processed {total} rows")
+
+        inserted = Ingredient.objects.count() - before
+        elapsed = time.monotonic() - started
+        # bulk_create не отправляет сигналы — версию каталога меняем вручную
+        if inserted:
+            bump_catalogue_version()
+
+        rate = total / elapsed if elapsed else float(total)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Ingredients loaded: {inserted} inserted, "
+                f"{total - inserted} skipped, {total} rows "
+                f"in {elapsed:.2f}s ({rate:.0f} rows/sec)."
+            )
+        )
@@ -0,0 +1,86 @@
+# Стандартная библиотека
+import time
+
+# Сторонние библиотеки
+from django.core.management.base import BaseCommand, CommandError
+# Локальные импорты
+from recipes.shopping_totals import (diverged_users, rebuild_shopping_lists,
+                                     users_with_lists)
+from users.models import User
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare materialized shopping lists with the carts they are built "
+        "from and rebuild the ones that drifted"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            action="append",
+            dest="users",
+            metavar="ID_OR_EMAIL",
+            help=(
+                "Limit to these users (repeatable); default is everyone "
+                "with a cart"
+            ),
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report users whose lists drifted, change nothing",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Rebuild every selected user, not only the drifted ones",
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        user_ids = (
+            self._resolve(options["users"])
+            if options["users"]
+            else users_with_lists()
+        )
+        checked, drifted, rows = 0, [], 0
+        for start in range(0, len(user_ids), BATCH_SIZE):
+            batch = user_ids[start:start + BATCH_SIZE]
+            checked += len(batch)
+            stale = batch if options["force"] else diverged_users(batch)
+            drifted.extend(stale)
+            if stale and not options["check"]:
+                rows += rebuild_shopping_lists(stale)
+
+        for user_id in drifted[:20]:
+            self.stdout.write(f"  user {user_id}")
+        if len(drifted) > 20:
+            self.stdout.write(f"  ... and {len(drifted) - 20} more")
+
+        elapsed = time.monotonic() - started
+        if options["check"]:
+            message = f"{len(drifted)} of {checked} shopping lists drifted"
+            style = self.style.WARNING if drifted else self.style.SUCCESS
+        else:
+            message = (
+                f"Rebuilt {len(drifted)} of {checked} shopping lists "
+                f"({rows} rows)"
+            )
+            style = self.style.SUCCESS
+        self.stdout.write(style(f"{message} in {elapsed:.2f}s."))
+        if options["check"] and drifted:
+            raise CommandError("Shopping lists are out of sync.", returncode=1)
+
+    @staticmethod
+    def _resolve(values):
+        ids = set()
+        for value in values:
+            lookup = {"pk": value} if value.isdigit() else {"email": value}
+            try:
+                ids.add(User.objects.only("pk").get(**lookup).pk)
+            except User.DoesNotExist:
+                raise CommandError(f"User {value!r} not found.")
+        return sorted(ids)
@@ -0,0 +1,37 @@
+# Стандартная библиотека
+import time
+
+# Сторонние библиотеки
+from django.core.management.base import BaseCommand
+# Локальные импорты
+from recipes.ranking import refresh_rankings
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh the trending ranking of recipes. Run it periodically "
+        "(e.g. every few minutes from cron) and with --full once a day"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help=(
+                "Recompute from scratch instead of decaying and adding new "
+                "activity"
+            ),
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        stats = refresh_rankings(full=options["full"])
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rankings refreshed ({stats['mode']}): "
+                f"{stats['updated']} recipes with new activity, "
+                f"{stats['created']} rows created in {elapsed:.2f}s."
+                + (" Scores renormalized." if stats["renormalized"] else "")
+            )
+        )
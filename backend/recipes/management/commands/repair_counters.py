@@ -0,0 +1,39 @@
+# Стандартная библиотека
+import time
+
+# Сторонние библиотеки
+from api.counters import repair
+from django.core.management.base import BaseCommand
+from django.db import transaction
+# Локальные импорты
+from recipes.models import Favorite, Recipe, ShoppingCart
+from users.models import Subscription, User
+
+# (модель, счётчик, связанная модель, поле связи)
+COUNTERS = (
+    (Recipe, "favorites_count", Favorite, "recipe"),
+    (Recipe, "cart_count", ShoppingCart, "recipe"),
+    (User, "recipes_count", Recipe, "author"),
+    (User, "subscribers_count", Subscription, "author"),
+)
+
+
+class Command(BaseCommand):
+    help = "Recompute denormalized counters and fix rows that drifted"
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        total = 0
+        for model, field, related_model, fk_field in COUNTERS:
+            # Один UPDATE на счётчик; строки с верным значением не трогаются
+            with transaction.atomic():
+                fixed = repair(model, field, related_model, fk_field)
+            total += fixed
+            self.stdout.write(f"  {model.__name__}.{field}: {fixed} fixed")
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Counters repaired: {total} rows in {elapsed:.2f}s."
+            )
+        )
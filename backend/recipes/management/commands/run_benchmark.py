@@ -0,0 +1,299 @@
+# Стандартная библиотека
+import http.client
+import json
+import random
+import re
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import quote, urlsplit
+
+# Сторонние библиотеки
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+# Локальные импорты
+from recipes.management.commands.seed_benchmark import (EMAIL_DOMAIN,
+                                                        bench_email)
+from recipes.models import Ingredient, Recipe
+from users.models import User
+
+# Смесь запросов: (сценарий, вес). Веса повторяют долю эндпоинтов
+# в продовом трафике: чтение ленты и карточек преобладает.
+SCENARIOS = (
+    ("recipe_list", 35),
+    ("recipe_detail", 25),
+    ("ingredient_search", 15),
+    ("favorite_toggle", 12),
+    ("subscriptions", 8),
+    ("download_shopping_cart", 5),
+)
+PERCENTILES = (50, 95, 99)
+# Число SQL-запросов берётся из заголовка Server-Timing (api/metrics.py)
+QUERIES_RE = re.compile(r'desc="(\d+) queries"')
+
+
+def percentile(sorted_values, percent):
+    """
+    Перцентиль методом ближайшего ранга; sorted_values отсортирован.
+    """
+    if not sorted_values:
+        return None
+    rank = max(int(round(percent / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(samples, elapsed):
+    """
+    Сводка по замерам [(секунды, статус, SQL-запросов или None)].
+    """
+    latencies = sorted(
+        seconds * 1000 for seconds, _status, _queries in samples
+    )
+    queries = [
+        count for _seconds, _status, count in samples if count is not None
+    ]
+    errors = sum(1 for _seconds, status, _queries in samples if status >= 400)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "rps": round(len(samples) / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            **{
+                f"p{percent}": _round(percentile(latencies, percent))
+                for percent in PERCENTILES
+            },
+            "mean": (
+                _round(sum(latencies) / len(latencies)) if latencies else None
+            ),
+            "max": _round(latencies[-1]) if latencies else None,
+        },
+        "queries_per_request": {
+            "mean": _round(sum(queries) / len(queries)) if queries else None,
+            "max": max(queries) if queries else None,
+        },
+    }
+
+
+def _round(value):
+    return None if value is None else round(value, 2)
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Client:
+    """
+    Keep-alive соединение одного виртуального пользователя.
+    """
+
+    def __init__(self, base_url, token=None, timeout=30):
+        parts = urlsplit(base_url)
+        connection_cls = (
+            http.client.HTTPSConnection
+            if parts.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        self.prefix = parts.path.rstrip("/")
+        self.connect = lambda: connection_cls(parts.netloc, timeout=timeout)
+        self.connection = self.connect()
+        self.headers = {"Content-Type": "application/json"}
+        if token:
+            self.headers["Authorization"] = f"Token {token}"
+
+    def request(self, method, path, body=None):
+        """
+        Возвращает (статус, тело, секунды, SQL-запросов или None).
+        """
+        payload = json.dumps(body) if body is not None else None
+        started = time.perf_counter()
+        try:
+            self.connection.request(
+                method, self.prefix + path, payload, self.headers
+            )
+            response = self.connection.getresponse()
+            content = response.read()
+        except (OSError, http.client.HTTPException):
+            # сервер закрыл соединение — следующий запрос откроет новое
+            self.connection.close()
+            self.connection = self.connect()
+            return 599, b"", time.perf_counter() - started, None
+        elapsed = time.perf_counter() - started
+        match = QUERIES_RE.search(response.getheader("Server-Timing", ""))
+        return (
+            response.status,
+            content,
+            elapsed,
+            int(match[1]) if match else None,
+        )
+
+
+class Command(BaseCommand):
+    help = "Replay a weighted request mix against a running server, print JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument(
+            "--duration", type=float, default=60, help="Seconds"
+        )
+        parser.add_argument("--warmup", type=float, default=5, help="Seconds")
+        parser.add_argument(
+            "--concurrency", type=int, default=16, help="Virtual users"
+        )
+        parser.add_argument(
+            "--password",
+            default="benchmark",
+            help="Password passed to seed_benchmark",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--label", default="", help="Free-form run label")
+        parser.add_argument(
+            "--output", help="Write the JSON report here instead of stdout"
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.recipe_ids = list(
+            Recipe.objects.filter(
+                author__email__endswith=f"@{EMAIL_DOMAIN}"
+            ).values_list("pk", flat=True)
+        )
+        if not self.recipe_ids:
+            raise CommandError("No benchmark data; run seed_benchmark first.")
+        names = Ingredient.objects.values_list("name", flat=True)
+        # Префиксы длиной 1-3 символа, как при наборе в автокомплите
+        self.prefixes = sorted(
+            {name[:length].lower() for name in names for length in (1, 2, 3)}
+        )
+        self.page_count = max(len(self.recipe_ids) // 6, 1)
+        self.base_url = options["base_url"]
+        users = User.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}").count()
+
+        clients = [
+            self._login(number % users, options["password"])
+            for number in range(options["concurrency"])
+        ]
+        started_at = timezone.now()
+        self._run(clients, options["warmup"])
+        samples, elapsed = self._run(clients, options["duration"])
+
+        report = {
+            "label": options["label"],
+            "revision": _git_revision(),
+            "started_at": started_at.isoformat(),
+            "base_url": self.base_url,
+            "duration_s": round(elapsed, 2),
+            "concurrency": options["concurrency"],
+            "dataset": {
+                "users": users,
+                "recipes": len(self.recipe_ids),
+                "ingredients": len(names),
+            },
+            "total": summarize(
+                [sample for rows in samples.values() for sample in rows],
+                elapsed,
+            ),
+            "scenarios": {
+                name: summarize(samples[name], elapsed)
+                for name, _weight in SCENARIOS
+            },
+        }
+        text = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+            self.stderr.write(f"Report written to {options['output']}")
+        else:
+            self.stdout.write(text)
+
+    def _login(self, number, password):
+        client = Client(self.base_url)
+        status, content, _elapsed, _queries = client.request(
+            "POST",
+            "/api/auth/token/login/",
+            {"email": bench_email(number), "password": password},
+        )
+        if status != 200:
+            raise CommandError(
+                f"Login failed for {bench_email(number)}: {status}"
+            )
+        return Client(self.base_url, json.loads(content)["auth_token"])
+
+    def _run(self, clients, duration):
+        """
+        Гоняет смесь сценариев duration секунд; возвращает замеры по сценариям.
+        """
+        samples = defaultdict(list)
+        lock = threading.Lock()
+        deadline = time.monotonic() + duration
+        names = [name for name, _weight in SCENARIOS]
+        weights = [weight for _name, weight in SCENARIOS]
+
+        def worker(client, seed):
+            rng = random.Random(seed)
+            local = defaultdict(list)
+            while time.monotonic() < deadline:
+                name = rng.choices(names, weights)[0]
+                for status, _content, seconds, queries in getattr(
+                    self, f"_{name}"
+                )(client, rng):
+                    local[name].append((seconds, status, queries))
+            with lock:
+                for name, rows in local.items():
+                    samples[name].extend(rows)
+
+        threads = [
+            threading.Thread(target=worker, args=(client, self.rng.random()))
+            for client in clients
+        ]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return samples, time.monotonic() - started
+
+    # ───── сценарии: каждый возвращает список ответов ─────
+    def _recipe_list(self, client, rng):
+        # Первые страницы ленты открывают намного чаще дальних
+        page = min(int(rng.paretovariate(1.2)), self.page_count)
+        return [client.request("GET", f"/api/recipes/?page={page}")]
+
+    def _recipe_detail(self, client, rng):
+        return [
+            client.request(
+                "GET", f"/api/recipes/{rng.choice(self.recipe_ids)}/"
+            )
+        ]
+
+    def _ingredient_search(self, client, rng):
+        prefix = rng.choice(self.prefixes)
+        return [
+            client.request("GET", f"/api/ingredients/?name={quote(prefix)}")
+        ]
+
+    def _favorite_toggle(self, client, rng):
+        path = f"/api/recipes/{rng.choice(self.recipe_ids)}/favorite/"
+        added = client.request("POST", path)
+        if added[0] != 400:
+            return [added, client.request("DELETE", path)]
+        # Рецепт уже был в избранном: снимаем и возвращаем отметку,
+        # чтобы данные после прогона не отличались от исходных
+        return [client.request("DELETE", path), client.request("POST", path)]
+
+    def _subscriptions(self, client, rng):
+        return [
+            client.request("GET", "/api/users/subscriptions/?recipes_limit=3")
+        ]
+
+    def _download_shopping_cart(self, client, rng):
+        return [client.request("GET", "/api/recipes/download_shopping_cart/")]
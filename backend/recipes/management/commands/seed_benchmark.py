@@ -0,0 +1,267 @@
+# Стандартная библиотека
+import random
+import time
+from datetime import timedelta
+from io import BytesIO
+from itertools import accumulate, islice
+from pathlib import Path
+
+# Сторонние библиотеки
+from api.counters import repair
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image
+# Локальные импорты
+from recipes.catalogue import bump_catalogue_version
+from recipes.management.commands.load_ingredients import iter_json
+from recipes.management.commands.repair_counters import COUNTERS
+from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
+                            ShoppingCart)
+from recipes.ranking import refresh_rankings
+from recipes.search import refresh_search_index
+from recipes.shopping_totals import rebuild_shopping_lists
+from users.models import Subscription, User
+
+# Адреса сгенерированных пользователей: bench<n>@EMAIL_DOMAIN
+EMAIL_DOMAIN = "bench.foodgram.local"
+IMAGE_NAME = "recipes/images/benchmark.png"
+BATCH_SIZE = 2000
+
+WORDS = (
+    "домашний", "быстрый", "летний", "пряный", "сливочный", "запечённый",
+    "острый", "нежный", "сытный", "бабушкин", "овощной", "праздничный",
+)
+DISHES = (
+    "суп", "салат", "пирог", "рагу", "омлет", "плов", "соус", "гратен",
+    "суфле", "паштет", "запеканка", "каша",
+)
+
+
+def bench_email(number):
+    return f"bench{number}@{EMAIL_DOMAIN}"
+
+
+def _batched(iterable, size=BATCH_SIZE):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class Command(BaseCommand):
+    help = "Seed a synthetic dataset for run_benchmark"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=2000)
+        parser.add_argument("--recipes", type=int, default=20000)
+        parser.add_argument(
+            "--ingredients-file",
+            default=str(
+                Path(settings.BASE_DIR).parent / "data" / "ingredients.json"
+            ),
+            help="JSON file loaded when the ingredient table is empty",
+        )
+        parser.add_argument("--ingredients-per-recipe", type=int, default=8)
+        parser.add_argument("--favorites-per-user", type=int, default=15)
+        parser.add_argument("--cart-per-user", type=int, default=4)
+        parser.add_argument("--subscriptions-per-user", type=int, default=5)
+        parser.add_argument(
+            "--password",
+            default="benchmark",
+            help="Password shared by all generated users",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Delete previously generated users and their data first",
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        self.rng = random.Random(options["seed"])
+        generated = User.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}")
+        if generated.exists():
+            if not options["reset"]:
+                raise CommandError(
+                    "Benchmark data already exists; pass --reset to "
+                    "recreate it."
+                )
+            deleted, _ = generated.delete()
+            self.stdout.write(
+                f"  deleted {deleted} rows of old benchmark data"
+            )
+
+        # bulk_create не отправляет сигналы: счётчики, рейтинг и поисковый
+        # индекс пересчитываются в конце одним проходом
+        with transaction.atomic():
+            ingredient_ids = self._ingredients(options["ingredients_file"])
+            user_ids = self._users(options["users"], options["password"])
+            recipe_ids = self._recipes(
+                options["recipes"],
+                user_ids,
+                ingredient_ids,
+                options["ingredients_per_recipe"],
+            )
+            for model, per_user in (
+                (Favorite, options["favorites_per_user"]),
+                (ShoppingCart, options["cart_per_user"]),
+            ):
+                self._relations(model, user_ids, recipe_ids, per_user)
+            self._subscriptions(user_ids, options["subscriptions_per_user"])
+
+        self._finish(user_ids, recipe_ids)
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Benchmark data seeded: {len(user_ids)} users, "
+                f"{len(recipe_ids)} recipes in {elapsed:.2f}s."
+            )
+        )
+
+    def _ingredients(self, file_path):
+        if not Ingredient.objects.exists():
+            with open(file_path, "r", encoding="utf-8") as f:
+                for batch in _batched(iter_json(f)):
+                    Ingredient.objects.bulk_create(
+                        [Ingredient(name=name, measurement_unit=unit)
+                         for name, unit in batch],
+                        ignore_conflicts=True,
+                    )
+            bump_catalogue_version()
+        ids = list(Ingredient.objects.values_list("pk", flat=True))
+        if not ids:
+            raise CommandError("No ingredients to build recipes from.")
+        self.stdout.write(f"  ingredients: {len(ids)}")
+        return ids
+
+    def _users(self, count, password):
+        # Хеш считается один раз: PBKDF2 на каждого занял бы минуты
+        hashed = make_password(password)
+        users = (
+            User(
+                email=bench_email(number),
+                username=f"bench{number}",
+                first_name="Бенч",
+                last_name=f"Пользователь{number}",
+                password=hashed,
+            )
+            for number in range(count)
+        )
+        for batch in _batched(users):
+            User.objects.bulk_create(batch)
+        ids = list(
+            User.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}")
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        self.stdout.write(f"  users: {len(ids)}")
+        return ids
+
+    def _image(self):
+        if not default_storage.exists(IMAGE_NAME):
+            buffer = BytesIO()
+            Image.new("RGB", (640, 480), (230, 180, 120)).save(buffer, "PNG")
+            default_storage.save(IMAGE_NAME, ContentFile(buffer.getvalue()))
+        return IMAGE_NAME
+
+    def _recipes(self, count, user_ids, ingredient_ids, per_recipe):
+        rng = self.rng
+        image = self._image()
+        # Авторов меньше, чем пользователей: ~20% пишут рецепты
+        authors = user_ids[: max(len(user_ids) // 5, 1)]
+        recipes = (
+            Recipe(
+                author_id=rng.choice(authors),
+                name=(
+                    f"{rng.choice(WORDS).capitalize()} "
+                    f"{rng.choice(DISHES)} №{number}"
+                ),
+                text=" ".join(rng.choices(WORDS + DISHES, k=40)),
+                cooking_time=rng.randint(5, 180),
+                image=image,
+            )
+            for number in range(count)
+        )
+        for batch in _batched(recipes):
+            Recipe.objects.bulk_create(batch)
+        ids = list(
+            Recipe.objects.filter(author_id__in=authors)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+
+        per_recipe = min(per_recipe, len(ingredient_ids))
+        lines = (
+            RecipeIngredient(
+                recipe_id=recipe_id,
+                ingredient_id=ingredient_id,
+                amount=rng.randint(1, 500),
+            )
+            for recipe_id in ids
+            for ingredient_id in rng.sample(ingredient_ids, per_recipe)
+        )
+        for batch in _batched(lines):
+            RecipeIngredient.objects.bulk_create(batch)
+        self.stdout.write(f"  recipes: {len(ids)}")
+        return ids
+
+    def _relations(self, model, user_ids, recipe_ids, per_user):
+        rng = self.rng
+        now = timezone.now()
+        per_user = min(per_user, len(recipe_ids))
+        # Популярность по Ципфу: немногие рецепты собирают большую часть
+        # отметок
+        weights = list(
+            accumulate(1 / (rank + 1) for rank in range(len(recipe_ids)))
+        )
+        rows = (
+            model(
+                user_id=user_id,
+                recipe_id=recipe_id,
+                created_at=now
+                - timedelta(minutes=rng.randint(0, 60 * 24 * 30)),
+            )
+            for user_id in user_ids
+            for recipe_id in set(
+                rng.choices(recipe_ids, cum_weights=weights, k=per_user)
+            )
+        )
+        for batch in _batched(rows):
+            model.objects.bulk_create(batch, ignore_conflicts=True)
+        self.stdout.write(f"  {model.__name__}: {model.objects.count()}")
+
+    def _subscriptions(self, user_ids, per_user):
+        rng = self.rng
+        authors = user_ids[: max(len(user_ids) // 5, 1)]
+        rows = (
+            Subscription(user_id=user_id, author_id=author_id)
+            for user_id in user_ids
+            for author_id in set(
+                rng.sample(authors, min(per_user, len(authors)))
+            )
+            if author_id != user_id
+        )
+        for batch in _batched(rows):
+            Subscription.objects.bulk_create(batch, ignore_conflicts=True)
+        self.stdout.write(f"  Subscription: {Subscription.objects.count()}")
+
+    def _finish(self, user_ids, recipe_ids):
+        for model, field, related_model, fk_field in COUNTERS:
+            repair(model, field, related_model, fk_field)
+        refresh_rankings(full=True)
+        for batch in _batched(recipe_ids):
+            refresh_search_index(batch)
+        if settings.SHOPPING_LIST_MATERIALIZED:
+            for batch in _batched(user_ids):
+                rebuild_shopping_lists(batch)
+        self.stdout.write(
+            "  counters, rankings, search index and shopping lists refreshed"
+        )
@@ -0,0 +1,34 @@
+# Триграммный GIN-индекс для поиска ингредиентов по подстроке.
+# Создаётся только на PostgreSQL, на других СУБД миграция ничего не делает.
+
+from django.db import migrations
+
+INDEX_NAME = "ingredient_name_trgm_idx"
+
+
+def create_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Выражение совпадает с тем, что Django строит для icontains/istartswith
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON recipes_ingredient "
+        "USING gin (UPPER(name::text) gin_trgm_ops)"
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0003_recipe_created_id_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.17 on 2026-10-18 02:52
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill(model, field, related_model, fk_field):
+    """
+    Один UPDATE: счётчик field = число строк related_model на запись.
+
+    Копия api.counters.repair на момент миграции: историческая миграция
+    не должна зависеть от будущих правок кода приложения.
+    """
+    model.objects.update(
+        **{
+            field: Coalesce(
+                Subquery(
+                    related_model.objects.filter(**{fk_field: OuterRef("pk")})
+                    .order_by()
+                    .values(fk_field)
+                    .annotate(total=Count("pk"))
+                    .values("total"),
+                    output_field=IntegerField(),
+                ),
+                0,
+            )
+        }
+    )
+
+
+def fill_counters(apps, schema_editor):
+    Recipe = apps.get_model("recipes", "Recipe")
+    User = apps.get_model("users", "User")
+    fill(Recipe, "favorites_count", apps.get_model("recipes", "Favorite"), "recipe")
+    fill(Recipe, "cart_count", apps.get_model("recipes", "ShoppingCart"), "recipe")
+    fill(User, "recipes_count", Recipe, "author")
+    fill(User, "subscribers_count", apps.get_model("users", "Subscription"), "author")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0006_shortlink"),
+        ("users", "0002_user_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipe",
+            name="cart_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="В корзинах"
+            ),
+        ),
+        migrations.AddField(
+            model_name="recipe",
+            name="favorites_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="В избранном"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(
+                fields=["-favorites_count", "-id"], name="recipe_favorites_idx"
+            ),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
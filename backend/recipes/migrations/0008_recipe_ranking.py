@@ -0,0 +1,83 @@
+# Generated by Django 4.2.17 on 2026-10-18 02:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def create_rankings(apps, schema_editor):
+    Recipe = apps.get_model("recipes", "Recipe")
+    RecipeRanking = apps.get_model("recipes", "RecipeRanking")
+    RecipeRanking.objects.bulk_create(
+        (
+            RecipeRanking(recipe_id=pk)
+            for pk in Recipe.objects.values_list("pk", flat=True)
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0007_recipe_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="favorite",
+            name="created_at",
+            field=models.DateTimeField(
+                db_index=True,
+                default=django.utils.timezone.now,
+                verbose_name="Дата добавления",
+            ),
+        ),
+        migrations.AddField(
+            model_name="shoppingcart",
+            name="created_at",
+            field=models.DateTimeField(
+                db_index=True,
+                default=django.utils.timezone.now,
+                verbose_name="Дата добавления",
+            ),
+        ),
+        migrations.CreateModel(
+            name="RecipeRanking",
+            fields=[
+                (
+                    "recipe",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="ranking",
+                        serialize=False,
+                        to="recipes.recipe",
+                        verbose_name="Рецепт",
+                    ),
+                ),
+                (
+                    "trending_score",
+                    models.FloatField(default=0, verbose_name="Рейтинг трендов"),
+                ),
+                (
+                    "refreshed_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Пересчитан"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Рейтинг рецепта",
+                "verbose_name_plural": "Рейтинги рецептов",
+                "ordering": ["-trending_score", "-recipe"],
+                "indexes": [
+                    models.Index(
+                        fields=["-trending_score", "-recipe"],
+                        name="ranking_trending_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(create_rankings, migrations.RunPython.noop),
+    ]
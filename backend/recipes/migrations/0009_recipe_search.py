@@ -0,0 +1,71 @@
+# Generated by Django 4.2.17 on 2026-10-18 02:56
+
+# Поля полнотекстового поиска, их заполнение и GIN-индекс.
+# Индекс и tsvector строятся только на PostgreSQL.
+
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations, models
+
+INDEX_NAME = "recipe_search_vector_idx"
+
+
+def fill_search_fields(apps, schema_editor):
+    Recipe = apps.get_model("recipes", "Recipe")
+    RecipeIngredient = apps.get_model("recipes", "RecipeIngredient")
+    names = {}
+    rows = RecipeIngredient.objects.order_by("recipe_id", "ingredient__name")
+    for recipe_id, name in rows.values_list("recipe_id", "ingredient__name"):
+        names.setdefault(recipe_id, []).append(name)
+    for recipe_id, recipe_names in names.items():
+        Recipe.objects.filter(pk=recipe_id).update(
+            ingredient_names=" ".join(recipe_names)
+        )
+
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "UPDATE recipes_recipe SET search_vector = "
+        "setweight(to_tsvector(%(config)s::regconfig, coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector(%(config)s::regconfig, coalesce(ingredient_names, '')), 'B') || "
+        "setweight(to_tsvector(%(config)s::regconfig, coalesce(text, '')), 'C')",
+        {"config": settings.SEARCH_CONFIG},
+    )
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON recipes_recipe "
+        "USING gin (search_vector)"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0008_recipe_ranking"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipe",
+            name="ingredient_names",
+            field=models.TextField(
+                blank=True,
+                default="",
+                editable=False,
+                verbose_name="Названия ингредиентов",
+            ),
+        ),
+        migrations.AddField(
+            model_name="recipe",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True, verbose_name="Поисковый вектор"
+            ),
+        ),
+        migrations.RunPython(fill_search_fields, drop_search_index),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.17 on 2026-10-18 09:40
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def create_epoch(apps, schema_editor):
+    """
+    Накопленные значения затухали до последнего пересчёта —
+    это и есть их начало отсчёта.
+    """
+    RecipeRanking = apps.get_model("recipes", "RecipeRanking")
+    RankingEpoch = apps.get_model("recipes", "RankingEpoch")
+    last = RecipeRanking.objects.aggregate(last=Max("refreshed_at"))["last"]
+    if last is not None:
+        RankingEpoch.objects.create(pk=1, epoch=last, refreshed_at=last)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0010_shopping_list_item"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RankingEpoch",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "epoch",
+                    models.DateTimeField(verbose_name="Начало отсчёта"),
+                ),
+                (
+                    "refreshed_at",
+                    models.DateTimeField(verbose_name="Пересчитан"),
+                ),
+            ],
+            options={
+                "verbose_name": "Эпоха рейтинга",
+                "verbose_name_plural": "Эпохи рейтинга",
+            },
+        ),
+        migrations.RunPython(create_epoch, migrations.RunPython.noop),
+    ]
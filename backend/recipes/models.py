@@ -3,10 +3,13 @@
 # Стандартные средства Django и валидация
 # Общие константы проекта
 from constants import NAME_MAX_LENGTH as _NAME_MAX
+from constants import SHORT_CODE_MAX_LENGTH as _SHORT_CODE_MAX
 from constants import UNIT_MAX_LENGTH as _UNIT_MAX
 from django.contrib.auth import get_user_model as _get_user
+from django.contrib.postgres.search import SearchVectorField as _VectorField
 from django.core.validators import MinValueValidator as _MinVal
 from django.db import models as _models
+from django.utils import timezone as _tz
 
 # Получаем модель пользователя
 User = _get_user()
@@ -84,21 +87,81 @@ class Recipe(_models.Model):
         auto_now_add=True,
         verbose_name="Дата создания",
     )
+    updated_at = _models.DateTimeField(
+        auto_now=True,
+        verbose_name="Дата изменения",
+    )
+    # Денормализованные счётчики, см. api/counters.py
+    favorites_count = _models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="В избранном",
+    )
+    cart_count = _models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="В корзинах",
+    )
+
+    # Полнотекстовый поиск, см. recipes/search.py
+    ingredient_names = _models.TextField(
+        blank=True,
+        default="",
+        editable=False,
+        verbose_name="Названия ингредиентов",
+    )
+    search_vector = _VectorField(
+        null=True,
+        editable=False,
+        verbose_name="Поисковый вектор",
+    )
+
+    COUNTER_FIELDS = ("favorites_count", "cart_count")
+    SEARCH_FIELDS = ("ingredient_names", "search_vector")
 
     class Meta:
         """
         Мета-настройки рецепта:
         - сортировка по дате создания (по убыванию);
+        - составной индекс (created_at, id) для keyset-пагинации;
+        - индекс по числу добавлений в избранное для сортировки
+          по популярности;
         - человекочитаемые имена.
         """
 
         verbose_name = "Рецепт"
         verbose_name_plural = "Рецепты"
         ordering = ["-created_at"]
+        indexes = [
+            _models.Index(
+                fields=["-created_at", "-id"], name="recipe_created_id_idx"
+            ),
+            _models.Index(
+                fields=["-favorites_count", "-id"], name="recipe_favorites_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        """
+        Обычное сохранение не перезаписывает устаревшими значениями
+        счётчики (их меняют UPDATE с F() из api/counters.py)
+        и поисковые поля (их пересчитывает recipes/search.py).
+        """
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            deferred = self.get_deferred_fields()
+            skipped = self.COUNTER_FIELDS + self.SEARCH_FIELDS
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in skipped
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
 
 class RecipeIngredient(_models.Model):
     """
@@ -158,6 +221,12 @@ class UserRecipeRelation(_models.Model):
         on_delete=_models.CASCADE,
         verbose_name="Рецепт",
     )
+    # Время добавления: по нему считается рейтинг трендов (recipes/ranking.py)
+    created_at = _models.DateTimeField(
+        default=_tz.now,
+        db_index=True,
+        verbose_name="Дата добавления",
+    )
 
     class Meta:
         abstract = True
@@ -202,3 +271,132 @@ class ShoppingCart(UserRecipeRelation):
                 fields=["user", "recipe"], name="unique_user_recipe_in_shopping_cart"
             )
         ]
+
+
+class ShortLink(_models.Model):
+    """
+    Короткая ссылка на рецепт.
+
+    Код детерминирован (base62 от id рецепта), поэтому повторные
+    запросы возвращают ту же ссылку, а коды не пересекаются.
+    """
+
+    recipe = _models.OneToOneField(
+        Recipe,
+        on_delete=_models.CASCADE,
+        related_name="short_link",
+        verbose_name="Рецепт",
+    )
+    code = _models.CharField(
+        max_length=_SHORT_CODE_MAX,
+        unique=True,
+        verbose_name="Код",
+    )
+
+    class Meta:
+        verbose_name = "Короткая ссылка"
+        verbose_name_plural = "Короткие ссылки"
+        ordering = ["recipe"]
+
+    def __str__(self):
+        return f"{self.code} -> {self.recipe_id}"
+
+
+class RecipeRanking(_models.Model):
+    """
+    Предрасчитанный рейтинг трендов рецепта.
+
+    Строка создаётся вместе с рецептом, значение пересчитывает
+    команда refresh_rankings (см. recipes/ranking.py). Значения
+    сравнимы между собой, но масштабированы относительно
+    RankingEpoch.epoch.
+    """
+
+    recipe = _models.OneToOneField(
+        Recipe,
+        on_delete=_models.CASCADE,
+        primary_key=True,
+        related_name="ranking",
+        verbose_name="Рецепт",
+    )
+    trending_score = _models.FloatField(
+        default=0,
+        verbose_name="Рейтинг трендов",
+    )
+    refreshed_at = _models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Пересчитан",
+    )
+
+    class Meta:
+        verbose_name = "Рейтинг рецепта"
+        verbose_name_plural = "Рейтинги рецептов"
+        ordering = ["-trending_score", "-recipe"]
+        indexes = [
+            _models.Index(
+                fields=["-trending_score", "-recipe"],
+                name="ranking_trending_idx",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.recipe_id}: {self.trending_score:.3f}"
+
+
+class RankingEpoch(_models.Model):
+    """
+    Состояние рейтинга трендов — единственная строка.
+
+    trending_score рецептов хранится относительно момента epoch
+    (см. recipes/ranking.py); refreshed_at — до какого момента события
+    уже учтены.
+    """
+
+    epoch = _models.DateTimeField(verbose_name="Начало отсчёта")
+    refreshed_at = _models.DateTimeField(verbose_name="Пересчитан")
+
+    class Meta:
+        verbose_name = "Эпоха рейтинга"
+        verbose_name_plural = "Эпохи рейтинга"
+
+    def __str__(self):
+        return f"{self.epoch:%Y-%m-%d %H:%M} / {self.refreshed_at:%H:%M}"
+
+
+class ShoppingListItem(_models.Model):
+    """
+    Материализованный список покупок: сколько ингредиента набирается
+    по всей корзине пользователя.
+
+    Ведётся при SHOPPING_LIST_MATERIALIZED (см. recipes/shopping_totals.py),
+    сверяется с корзинами командой rebuild_shopping_lists.
+    """
+
+    user = _models.ForeignKey(
+        User,
+        on_delete=_models.CASCADE,
+        related_name="shopping_list_items",
+        verbose_name="Пользователь",
+    )
+    ingredient = _models.ForeignKey(
+        Ingredient,
+        on_delete=_models.CASCADE,
+        related_name="+",
+        verbose_name="Ингредиент",
+    )
+    amount = _models.PositiveBigIntegerField(verbose_name="Количество")
+
+    class Meta:
+        verbose_name = "Строка списка покупок"
+        verbose_name_plural = "Списки покупок"
+        ordering = ["user", "ingredient"]
+        constraints = [
+            # Индекс (user, ingredient) обслуживает и чтение списка целиком
+            _models.UniqueConstraint(
+                fields=["user", "ingredient"], name="unique_shopping_list_item"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.ingredient_id} [{self.amount}]"
@@ -1,6 +1,17 @@
+# Standart library
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
 # local
 from constants import DEFAULT_PAGE_SIZE
+from django.core.paginator import InvalidPage
+from django.utils.dateparse import parse_datetime
+
+# thirdy party
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class RecipePagination(PageNumberPagination):
@@ -9,7 +20,150 @@ class RecipePagination(PageNumberPagination):
 
     Возвращает по умолчанию PAGE_SIZE объектов
     Позволяет клиенту задать количество через ?limit=
+
+    Если в запросе есть ?cursor= (в том числе пустой), включается
+    keyset-режим по паре (поле сортировки, id): вместо OFFSET и COUNT(*)
+    выполняется диапазонное чтение по индексу. Поле берётся из
+    view.cursor_field (по умолчанию created_at — индекс
+    recipe_created_id_idx).
     """
 
     page_size = DEFAULT_PAGE_SIZE
     page_size_query_param = "limit"
+
+    cursor_query_param = "cursor"
+    default_cursor_field = "created_at"
+    # поле сортировки → разбор значения из курсора
+    cursor_parsers = {
+        "created_at": parse_datetime,
+        "favorites_count": int,
+        "trending_score": float,
+        "search_rank": float,
+    }
+    invalid_cursor_message = "Неверный курсор."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Выбирает режим пагинации по наличию ?cursor= в запросе.
+        """
+        if not self._use_cursor(queryset, request):
+            return super().paginate_queryset(queryset, request, view)
+
+        queryset, page_size = self._cursor_queryset(queryset, request, view)
+        # Берём на одну запись больше, чтобы понять, есть ли следующая страница
+        return self._cursor_page(list(queryset[: page_size + 1]), page_size)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        paginate_queryset для async-представлений: COUNT(*) и страница
+        читаются через async ORM, ответ — тем же get_paginated_response.
+        """
+        if self._use_cursor(queryset, request):
+            queryset, page_size = self._cursor_queryset(
+                queryset, request, view
+            )
+            rows = [row async for row in queryset[: page_size + 1]]
+            return self._cursor_page(rows, page_size)
+
+        page_size = self.get_page_size(request)
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Paginator.count — cached_property: подставляем готовое значение
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(
+                self.invalid_page_message.format(
+                    page_number=page_number, message=str(exc)
+                )
+            )
+        self.page.object_list = [row async for row in self.page.object_list]
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        self.request = request
+        return list(self.page)
+
+    def _use_cursor(self, queryset, request):
+        # Готовые списки (выдача what_can_i_cook) листаются только по страницам
+        self.cursor_mode = (
+            self.cursor_query_param in request.query_params
+            and hasattr(queryset, "order_by")
+        )
+        return self.cursor_mode
+
+    def _cursor_queryset(self, queryset, request, view):
+        """
+        Keyset-выборка после позиции из ?cursor= и размер страницы.
+        """
+        self.request = request
+        self.cursor_field = getattr(
+            view, "cursor_field", self.default_cursor_field
+        )
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(f"-{self.cursor_field}", "-id")
+
+        position = self.decode_cursor(
+            request.query_params[self.cursor_query_param]
+        )
+        if position is not None:
+            value, pk = position
+            field = self.cursor_field
+            # field <= X даёт диапазон по индексу,
+            # exclude отсекает уже выданные записи с тем же значением
+            queryset = queryset.filter(**{f"{field}__lte": value}).exclude(
+                **{field: value, "id__gte": pk}
+            )
+        return queryset, page_size
+
+    def _cursor_page(self, rows, page_size):
+        self.has_next = len(rows) > page_size
+        self.page_rows = rows[:page_size]
+        return self.page_rows
+
+    def get_paginated_response(self, data):
+        """
+        В keyset-режиме отдаёт только ссылку на следующую страницу.
+        """
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response({"next": self.get_next_cursor_link(), "results": data})
+
+    def get_next_cursor_link(self):
+        """
+        Строит ссылку на следующую страницу по последней выданной записи.
+        """
+        if not self.has_next:
+            return None
+        last = self.page_rows[-1]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(last)
+        )
+
+    def encode_cursor(self, recipe_obj):
+        """
+        Кодирует позицию (значение поля сортировки, id) в непрозрачную строку.
+        """
+        value = getattr(recipe_obj, self.cursor_field)
+        if hasattr(value, "isoformat"):
+            value = value.isoformat()
+        raw = f"{value}|{recipe_obj.id}"
+        return urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+    def decode_cursor(self, encoded):
+        """
+        Разбирает курсор; пустой курсор означает первую страницу.
+        """
+        if not encoded:
+            return None
+        try:
+            raw = urlsafe_b64decode(encoded.encode("ascii")).decode("utf-8")
+            raw_value, pk = raw.split("|")
+            value = self.cursor_parsers[self.cursor_field](raw_value)
+            pk = int(pk)
+        except (BinasciiError, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if value is None:
+            raise NotFound(self.invalid_cursor_message)
+        return value, pk
@@ -0,0 +1,152 @@
+# recipes/ranking.py
+
+"""
+Рейтинг трендов рецептов.
+
+Каждое добавление в избранное или корзину даёт вклад weight, который
+затухает экспоненциально с периодом полураспада RANKING_HALF_LIFE_HOURS:
+
+    score = Σ weight · 2^(−возраст / период)
+
+Все вклады затухают с одной скоростью, поэтому порядок рецептов
+не меняется, если хранить значения относительно фиксированного момента
+epoch (RankingEpoch):
+
+    stored = Σ weight · 2^((время события − epoch) / период)
+           = score · 2^((сейчас − epoch) / период)
+
+Так инкрементальный пересчёт трогает только строки рецептов с новыми
+событиями: к ним прибавляются вклады событий после прошлого пересчёта.
+Значения растут с возрастом epoch; когда он превышает
+RENORMALIZE_HALF_LIVES периодов, все значения одним UPDATE приводятся
+к новому epoch = сейчас. Удаления из избранного и корзины учитывает
+лишь полный пересчёт (refresh_rankings --full), который стоит
+запускать реже.
+
+Значения хранятся в RecipeRanking и читаются во вьюсете
+по индексу ranking_trending_idx.
+"""
+
+# Стандартная библиотека
+from collections import defaultdict
+from datetime import timedelta
+
+# Сторонние библиотеки
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+# Локальные импорты
+from .models import (Favorite, RankingEpoch, Recipe, RecipeRanking,
+                     ShoppingCart)
+
+# Старше этого числа периодов вклад события меньше 0.1% — его не читаем
+HORIZON_HALF_LIVES = 10
+# Значения растут вдвое за период: после 2^30 ≈ 10^9 пересчитываем
+# к новому epoch, пока точности double с запасом хватает
+RENORMALIZE_HALF_LIVES = 30
+
+
+def _half_life_seconds():
+    return settings.RANKING_HALF_LIFE_HOURS * 3600
+
+
+def decay(seconds):
+    """
+    Множитель затухания за seconds секунд.
+    """
+    return 0.5 ** (seconds / _half_life_seconds())
+
+
+def _activity_sources():
+    return (
+        (Favorite, settings.RANKING_FAVORITE_WEIGHT),
+        (ShoppingCart, settings.RANKING_CART_WEIGHT),
+    )
+
+
+def _collect(since, now, epoch):
+    """
+    Вклады событий из интервала (since, now] по рецептам,
+    приведённые к моменту epoch.
+    """
+    scores = defaultdict(float)
+    for model, weight in _activity_sources():
+        events = model.objects.filter(
+            created_at__gt=since, created_at__lte=now
+        )
+        for recipe_id, created_at in events.values_list(
+            "recipe_id", "created_at"
+        ).iterator(chunk_size=2000):
+            # событие после epoch — множитель больше единицы
+            scores[recipe_id] += weight * decay(
+                (epoch - created_at).total_seconds()
+            )
+    return scores
+
+
+def _ensure_rows():
+    """
+    Создаёт недостающие строки рейтинга (например, после загрузки данных).
+    """
+    missing = Recipe.objects.filter(ranking__isnull=True).values_list(
+        "pk", flat=True
+    )
+    return len(
+        RecipeRanking.objects.bulk_create(
+            (RecipeRanking(recipe_id=pk) for pk in missing.iterator()),
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+    )
+
+
+@transaction.atomic
+def refresh_rankings(full=False, now=None):
+    """
+    Пересчитывает рейтинг и возвращает словарь со статистикой.
+
+    full=False — события после прошлого пересчёта прибавляются к строкам
+    их рецептов; full=True — расчёт с нуля за горизонт.
+    """
+    now = now or timezone.now()
+    created = _ensure_rows()
+    # Параллельный пересчёт ждёт здесь и не учтёт события дважды
+    state = RankingEpoch.objects.select_for_update().filter(pk=1).first()
+    full = full or state is None or state.refreshed_at > now
+    renormalized = False
+
+    if full:
+        epoch = now
+        since = now - timedelta(
+            seconds=_half_life_seconds() * HORIZON_HALF_LIVES
+        )
+        RecipeRanking.objects.update(trending_score=0, refreshed_at=now)
+    else:
+        epoch, since = state.epoch, state.refreshed_at
+        age = (now - epoch).total_seconds()
+        if age > _half_life_seconds() * RENORMALIZE_HALF_LIVES:
+            RecipeRanking.objects.update(
+                trending_score=F("trending_score") * decay(age)
+            )
+            epoch, renormalized = now, True
+
+    scores = _collect(since, now, epoch)
+    rows = RecipeRanking.objects.in_bulk(list(scores))
+    for recipe_id, row in rows.items():
+        row.trending_score += scores[recipe_id]
+        row.refreshed_at = now
+    RecipeRanking.objects.bulk_update(
+        rows.values(), ["trending_score", "refreshed_at"], batch_size=1000
+    )
+    RankingEpoch.objects.update_or_create(
+        pk=1, defaults={"epoch": epoch, "refreshed_at": now}
+    )
+    return {
+        "mode": "full" if full else "incremental",
+        "since": since,
+        "created": created,
+        "updated": len(rows),
+        "renormalized": renormalized,
+    }
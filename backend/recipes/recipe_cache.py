@@ -0,0 +1,220 @@
+# recipes/recipe_cache.py
+
+"""
+Кеш сериализованных рецептов.
+
+В кеше хранится часть ответа RecipeReadSerializer, одинаковая для всех
+зрителей: всё, кроме is_favorited, is_in_shopping_cart и
+author.is_subscribed. Персональные флаги подмешиваются при каждом запросе
+из аннотаций QuerySet.
+
+Ключ записи содержит версии рецепта, автора и каталога ингредиентов
+и готовность превью изображения. Версии меняются сигналами (см.
+recipes/signals.py), поэтому устаревшие записи просто перестают
+читаться и вытесняются бэкендом.
+
+Тела лежат в кеше RECIPE_CACHE_ALIAS: LocMemCache с MAX_ENTRIES — LRU
+в памяти воркера, RedisCache — общий кеш для нескольких узлов.
+Версии — в общем кеше SHARED_CACHE_ALIAS, как и версия каталога:
+правку в одном воркере сразу видят все, и чужое тело из LRU
+по старому ключу больше не читается.
+"""
+
+# Стандартная библиотека
+import threading
+import uuid
+
+# Сторонние библиотеки
+from api.images import thumbnails_ready
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
+
+# Локальные импорты
+from .catalogue import catalogue_version
+from .models import RecipeIngredient
+
+PAYLOAD_PREFIX = "recipe-payload"
+RECIPE_VERSION_PREFIX = "recipe-version"
+AUTHOR_VERSION_PREFIX = "author-version"
+
+# Поля ответа, зависящие от зрителя
+VIEWER_FIELDS = ("is_favorited", "is_in_shopping_cart")
+AUTHOR_VIEWER_FIELDS = ("is_subscribed",)
+
+
+def payload_prefetches():
+    """
+    Связи, которые нужны для построения тела ответа.
+    """
+    return (
+        "author",
+        Prefetch(
+            "recipeingredient_set",
+            queryset=RecipeIngredient.objects.select_related("ingredient"),
+            to_attr="prefetched_ingredients",
+        ),
+    )
+
+
+class RecipePayloadCache:
+    """
+    Версионированный кеш тел рецептов со счётчиками попаданий.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return settings.RECIPE_CACHE_ENABLED
+
+    @property
+    def backend(self):
+        return caches[settings.RECIPE_CACHE_ALIAS]
+
+    @property
+    def versions(self):
+        return caches[settings.SHARED_CACHE_ALIAS]
+
+    def _versions(self, prefix, ids):
+        """
+        Версии объектов; отсутствующие создаются заново.
+        """
+        keys = {obj_id: f"{prefix}:{obj_id}" for obj_id in ids}
+        found = self.versions.get_many(keys.values())
+        versions = {}
+        for obj_id, key in keys.items():
+            version = found.get(key)
+            if version is None:
+                version = uuid.uuid4().hex
+                if not self.versions.add(key, version, None):
+                    version = self.versions.get(key, version)
+            versions[obj_id] = version
+        return versions
+
+    def _payload_keys(self, recipes):
+        catalogue = catalogue_version()
+        recipe_versions = self._versions(
+            RECIPE_VERSION_PREFIX, {recipe.id for recipe in recipes}
+        )
+        author_versions = self._versions(
+            AUTHOR_VERSION_PREFIX, {recipe.author_id for recipe in recipes}
+        )
+        # Превью могли достроиться в другом воркере: тело с ними —
+        # другая запись, как и в ETag карточки (recipes/etags.py)
+        return {
+            recipe.id: (
+                f"{PAYLOAD_PREFIX}:{recipe.id}:{recipe_versions[recipe.id]}:"
+                f"{author_versions[recipe.author_id]}:{catalogue}:"
+                f"{int(thumbnails_ready(recipe.image.name))}"
+            )
+            for recipe in recipes
+        }
+
+    def get_many(self, recipes):
+        """
+        Возвращает ({id: тело}, {id: ключ}) для найденных в кеше рецептов.
+        """
+        keys = self._payload_keys(recipes)
+        found = self.backend.get_many(keys.values())
+        payloads = {
+            recipe_id: found[key]
+            for recipe_id, key in keys.items()
+            if key in found
+        }
+        with self._lock:
+            self.hits += len(payloads)
+            self.misses += len(keys) - len(payloads)
+        return payloads, keys
+
+    def set_many(self, payloads, keys):
+        self.backend.set_many(
+            {
+                keys[recipe_id]: payload
+                for recipe_id, payload in payloads.items()
+            },
+            settings.RECIPE_CACHE_TIMEOUT,
+        )
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+    def _bump(self, prefix, obj_id):
+        self.versions.set(f"{prefix}:{obj_id}", uuid.uuid4().hex, None)
+
+    def invalidate_recipe(self, recipe_id):
+        """Сбрасывает версию рецепта после фиксации транзакции."""
+        transaction.on_commit(
+            lambda: self._bump(RECIPE_VERSION_PREFIX, recipe_id)
+        )
+
+    def invalidate_author(self, author_id):
+        """Сбрасывает версию автора после фиксации транзакции."""
+        transaction.on_commit(
+            lambda: self._bump(AUTHOR_VERSION_PREFIX, author_id)
+        )
+
+
+recipe_cache = RecipePayloadCache()
+
+
+def strip_viewer_fields(data):
+    """
+    Убирает из ответа персональные флаги.
+    """
+    payload = {
+        key: value for key, value in data.items() if key not in VIEWER_FIELDS
+    }
+    payload["author"] = {
+        key: value
+        for key, value in data["author"].items()
+        if key not in AUTHOR_VIEWER_FIELDS
+    }
+    return payload
+
+
+def represent_recipes(serializer, recipes):
+    """
+    Сериализует рецепты, беря тела из кеша и достраивая промахи.
+
+    serializer — экземпляр RecipeReadSerializer: он строит тело
+    (build_payload) и считает персональные флаги (viewer_flags).
+    """
+    if not recipes:
+        return []
+
+    payloads, keys = {}, {}
+    if recipe_cache.enabled:
+        payloads, keys = recipe_cache.get_many(recipes)
+
+    flags = {recipe.id: serializer.viewer_flags(recipe) for recipe in recipes}
+
+    misses = [recipe for recipe in recipes if recipe.id not in payloads]
+    if misses:
+        prefetch_related_objects(misses, *payload_prefetches())
+        fresh = {
+            recipe.id: strip_viewer_fields(serializer.build_payload(recipe))
+            for recipe in misses
+        }
+        if recipe_cache.enabled:
+            recipe_cache.set_many(fresh, keys)
+        payloads.update(fresh)
+
+    result = []
+    for recipe in recipes:
+        recipe_flags, author_flags = flags[recipe.id]
+        merged = dict(payloads[recipe.id], **recipe_flags)
+        merged["author"] = dict(merged["author"], **author_flags)
+        # Порядок полей — как у сериализатора без кеша
+        result.append({field: merged[field] for field in serializer.fields})
+    return result
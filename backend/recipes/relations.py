@@ -0,0 +1,103 @@
+# recipes/relations.py
+
+"""
+Массовое добавление рецептов в избранное или корзину и удаление оттуда.
+
+Число SQL-запросов не зависит от числа id. Добавление — выборка
+рецептов и уже существующих связей, один INSERT (bulk_create
+с ignore_conflicts) и одно обновление счётчиков; удаление — выборка
+существующих связей, один DELETE и одно обновление счётчиков.
+Ни bulk_create, ни _raw_delete не отправляют построчные сигналы,
+поэтому счётчики рецептов и материализованный список покупок
+правятся здесь же, как это делают сигналы в recipes/signals.py.
+
+Оба пути сначала блокируют строку пользователя: параллельные запросы
+одного пользователя видят связи друг друга и не меняют счётчики дважды.
+"""
+
+# Сторонние библиотеки
+from api.counters import adjust_many
+
+# Локальные импорты
+from .models import Recipe, ShoppingCart
+from .shopping_totals import apply_cart_change, lock_users
+from .signals import RELATION_COUNTERS
+
+# Статусы id в ответе
+ADDED = "added"
+ALREADY_ADDED = "already_added"
+REMOVED = "removed"
+NOT_ADDED = "not_added"
+NOT_FOUND = "not_found"
+
+
+def add_relations(model, user, recipe_ids):
+    """
+    Добавляет рецепты recipe_ids в избранное или корзину (model) user.
+
+    Возвращает [(id, статус, связь или None)] в порядке recipe_ids;
+    связь не сохраняется повторно и нужна для сериализации рецепта.
+    """
+    recipes = Recipe.objects.only(
+        "id", "name", "image", "cooking_time"
+    ).in_bulk(recipe_ids)
+    lock_users([user.id])
+    existing = set(
+        model.objects.filter(user=user, recipe_id__in=recipes).values_list(
+            "recipe_id", flat=True
+        )
+    )
+    new_ids = [pk for pk in recipes if pk not in existing]
+    model.objects.bulk_create(
+        [model(user=user, recipe_id=pk) for pk in new_ids],
+        ignore_conflicts=True,
+    )
+    adjust_many(Recipe, new_ids, RELATION_COUNTERS[model], 1)
+    if model is ShoppingCart and new_ids:
+        apply_cart_change(user.id, new_ids, 1)
+
+    results = []
+    for pk in recipe_ids:
+        recipe = recipes.get(pk)
+        if recipe is None:
+            results.append((pk, NOT_FOUND, None))
+        else:
+            status = ALREADY_ADDED if pk in existing else ADDED
+            results.append((pk, status, model(user=user, recipe=recipe)))
+    return results
+
+
+def remove_relations(model, user, recipe_ids):
+    """
+    Убирает рецепты recipe_ids из избранного или корзины (model) user.
+
+    Возвращает [(id, статус, None)] в порядке recipe_ids.
+    """
+    lock_users([user.id])
+    links = model.objects.filter(user=user, recipe_id__in=recipe_ids)
+    present = set(links.values_list("recipe_id", flat=True))
+    if present:
+        # Один DELETE без сбора объектов и pre/post_delete на каждую строку
+        links._raw_delete(links.db)
+        adjust_many(Recipe, present, RELATION_COUNTERS[model], -1)
+        if model is ShoppingCart:
+            apply_cart_change(user.id, present, -1)
+
+    missing = [pk for pk in recipe_ids if pk not in present]
+    known = (
+        set(Recipe.objects.filter(pk__in=missing).values_list("pk", flat=True))
+        if missing
+        else set()
+    )
+    return [
+        (
+            pk,
+            (
+                REMOVED
+                if pk in present
+                else NOT_ADDED if pk in known else NOT_FOUND
+            ),
+            None,
+        )
+        for pk in recipe_ids
+    ]
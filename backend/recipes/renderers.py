@@ -0,0 +1,47 @@
+# recipes/renderers.py
+
+"""
+Рендереры форматов списка покупок.
+
+Сам файл отдаётся из view потоком, в обход рендереров. Они нужны,
+чтобы DRF принимал ?format=txt|csv|pdf, и чтобы служебные ответы
+(ошибки, 202/503) в этих форматах отдавались как JSON.
+"""
+
+# Стандартная библиотека
+import json
+
+# Сторонние библиотеки
+from rest_framework.renderers import BaseRenderer
+
+
+class ShoppingListRenderer(BaseRenderer):
+    """
+    Базовый рендерер: сериализует служебные ответы в JSON.
+    """
+
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        response = (renderer_context or {}).get("response")
+        if response is not None:
+            response["Content-Type"] = "application/json"
+        return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+class PlainTextRenderer(ShoppingListRenderer):
+    media_type = "text/plain"
+    format = "txt"
+
+
+class CSVRenderer(ShoppingListRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+
+class PDFRenderer(ShoppingListRenderer):
+    media_type = "application/pdf"
+    format = "pdf"
+    charset = None
@@ -0,0 +1,149 @@
+# recipes/search.py
+
+"""
+Полнотекстовый поиск рецептов по названию, описанию и ингредиентам.
+
+PostgreSQL: в Recipe.search_vector хранится tsvector с весами
+A (name), B (ingredient_names) и C (text) в конфигурации
+SEARCH_CONFIG; поиск идёт по GIN-индексу recipe_search_vector_idx
+и сортируется по SearchRank.
+
+Другие СУБД (SQLite в локальной разработке): каждое слово запроса
+ищется через icontains по тем же полям, совпадения в названии выше.
+
+ingredient_names — денормализованный список названий ингредиентов.
+Вектор пересчитывается после фиксации транзакции при сохранении
+рецепта, изменении его состава и переименовании ингредиента.
+"""
+
+# Стандартная библиотека
+from collections import defaultdict
+
+# Сторонние библиотеки
+from api.background import OnCommitBatch
+from django.conf import settings
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            SearchVector)
+from django.db import connection
+from django.db.models import (Case, F, FloatField, Q, TextField, Value,
+                              When)
+from django.db.models.functions import Cast
+
+# Локальные импорты
+from .models import Recipe, RecipeIngredient
+
+
+def is_postgres():
+    return connection.vendor == "postgresql"
+
+
+def build_vector(name, ingredient_names, text):
+    """
+    Выражение tsvector для UPDATE; аргументы — выражения или поля.
+    """
+    config = settings.SEARCH_CONFIG
+    return (
+        SearchVector(name, weight="A", config=config)
+        + SearchVector(ingredient_names, weight="B", config=config)
+        + SearchVector(text, weight="C", config=config)
+    )
+
+
+# ────────────────────────────────────────────────────
+#        Поддержание индекса
+# ────────────────────────────────────────────────────
+def refresh_search_index(recipe_ids):
+    """
+    Пересобирает ingredient_names и search_vector для рецептов.
+    """
+    recipe_ids = set(recipe_ids)
+    if not recipe_ids:
+        return
+    names = defaultdict(list)
+    rows = (
+        RecipeIngredient.objects.filter(recipe_id__in=recipe_ids)
+        .order_by("recipe_id", "ingredient__name")
+        .values_list("recipe_id", "ingredient__name")
+    )
+    for recipe_id, name in rows:
+        names[recipe_id].append(name)
+
+    # Один UPDATE на пачку: новое значение каждого рецепта — ветка CASE
+    joined = Case(
+        *(
+            When(pk=recipe_id, then=Value(" ".join(names[recipe_id])))
+            for recipe_id in recipe_ids
+        ),
+        output_field=TextField(),
+    )
+    changes = {"ingredient_names": joined}
+    if is_postgres():
+        # В том же UPDATE колонка ещё старая — вектор строим из CASE
+        changes["search_vector"] = build_vector("name", joined, "text")
+    Recipe.objects.filter(pk__in=recipe_ids).update(**changes)
+
+
+_refresh = OnCommitBatch(refresh_search_index)
+
+
+def schedule_search_refresh(recipe_id):
+    """
+    Откладывает пересчёт до фиксации транзакции.
+
+    Повторные вызовы в одной транзакции собираются в один пересчёт.
+    """
+    _refresh.add(recipe_id)
+
+
+def recipes_with_ingredient(ingredient_id):
+    return RecipeIngredient.objects.filter(
+        ingredient_id=ingredient_id
+    ).values_list("recipe_id", flat=True)
+
+
+# ────────────────────────────────────────────────────
+#        Поиск
+# ────────────────────────────────────────────────────
+def search_recipes(queryset, term):
+    """
+    Фильтрует queryset по запросу и аннотирует search_rank.
+    """
+    if is_postgres():
+        query = SearchQuery(
+            term, config=settings.SEARCH_CONFIG, search_type="websearch"
+        )
+        # ts_rank возвращает real: str() от него не совпадает со значением
+        # в БД, и курсор пагинации повторял бы страницу. double precision
+        # переживает запись в курсор без потерь
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=Cast(
+                SearchRank(F("search_vector"), query), FloatField()
+            )
+        )
+
+    words = term.split()
+    for word in words:
+        queryset = queryset.filter(
+            _any_case(word, "name")
+            | _any_case(word, "ingredient_names")
+            | _any_case(word, "text")
+        )
+    return queryset.annotate(
+        search_rank=Case(
+            When(_any_case(words[0], "name"), then=Value(1.0)),
+            When(_any_case(words[0], "ingredient_names"), then=Value(0.4)),
+            default=Value(0.2),
+            output_field=FloatField(),
+        )
+    )
+
+
+def _any_case(word, field):
+    """
+    icontains с вариантами регистра: LIKE в SQLite не сравнивает
+    кириллицу без учёта регистра.
+    """
+    condition = Q()
+    for variant in {word, word.lower(), word.capitalize(), word.upper()}:
+        condition |= Q(**{f"{field}__icontains": variant})
+    return condition
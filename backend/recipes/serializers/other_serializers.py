@@ -1,3 +1,4 @@
+from django.conf import settings as _settings
 from recipes.models import Recipe as _RecipeModel
 from rest_framework import serializers as _ser
 
@@ -64,3 +65,15 @@ class ShoppingCartSerializer(_ser.ModelSerializer):
             "image": url,
             "cooking_time": rec_item.cooking_time,
         }
+
+
+class RecipeIdsSerializer(_ser.Serializer):
+    """
+    Список id рецептов для массовых операций с избранным и корзиной.
+    """
+
+    recipes = _ser.ListField(
+        child=_ser.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=_settings.RELATIONS_BULK_MAX_IDS,
+    )
@@ -1,8 +1,20 @@
+from api.images import thumbnail_urls as _thumbnail_urls
 from rest_framework import serializers as _ser
 from users.serializers import UserSerializer as _UserSer
 
 from ..fields import Base64ImageField as _ImgField
 from ..models import Recipe as _RecipeModel
+from ..recipe_cache import represent_recipes as _represent
+
+
+class RecipeListSerializer(_ser.ListSerializer):
+    """
+    Список рецептов: тела берутся из кеша одним пакетным запросом.
+    """
+
+    def to_representation(self, data):
+        items = data.all() if hasattr(data, "all") else data
+        return _represent(self.child, list(items))
 
 
 class RecipeReadSerializer(_ser.ModelSerializer):
@@ -14,6 +26,7 @@ class RecipeReadSerializer(_ser.ModelSerializer):
 
     author = _UserSer(read_only=True)
     image = _ImgField()
+    image_thumbnails = _ser.SerializerMethodField()
     is_favorited = _ser.SerializerMethodField()
     is_in_shopping_cart = _ser.SerializerMethodField()
     ingredients = _ser.SerializerMethodField()
@@ -25,6 +38,7 @@ class RecipeReadSerializer(_ser.ModelSerializer):
             "author",
             "name",
             "image",
+            "image_thumbnails",
             "text",
             "cooking_time",
             "is_favorited",
@@ -32,11 +46,55 @@ class RecipeReadSerializer(_ser.ModelSerializer):
             "ingredients",
             "created_at",
         )
+        list_serializer_class = RecipeListSerializer
+
+    def to_representation(self, instance):
+        """
+        Тело рецепта из кеша плюс персональные флаги зрителя.
+        """
+        return _represent(self, [instance])[0]
+
+    def build_payload(self, recipe_obj):
+        """
+        Полное представление рецепта без обращения к кешу.
+        Ожидает, что viewer_flags уже вызван для recipe_obj.
+        """
+        recipe_obj.author.is_subscribed = recipe_obj.author_is_subscribed
+        return super().to_representation(recipe_obj)
+
+    def viewer_flags(self, recipe_obj):
+        """
+        Персональные флаги зрителя: (флаги рецепта, флаги автора).
+
+        Значения сохраняются на объекте, чтобы при построении тела
+        они не считались повторно.
+        """
+        recipe_obj.is_favorited = self.get_is_favorited(recipe_obj)
+        recipe_obj.is_in_shopping_cart = self.get_is_in_shopping_cart(
+            recipe_obj
+        )
+        subscribed = getattr(recipe_obj, "author_is_subscribed", None)
+        if subscribed is None:
+            subscribed = self.fields["author"].get_is_subscribed(
+                recipe_obj.author
+            )
+            recipe_obj.author_is_subscribed = subscribed
+        return (
+            {
+                "is_favorited": recipe_obj.is_favorited,
+                "is_in_shopping_cart": recipe_obj.is_in_shopping_cart,
+            },
+            {"is_subscribed": subscribed},
+        )
 
     def get_is_favorited(self, recipe_obj):
         """
         Проверяет, добавлен ли рецепт в избранное текущим пользователем.
+        Использует аннотацию из RecipeViewSet, если она есть.
         """
+        annotated = getattr(recipe_obj, "is_favorited", None)
+        if annotated is not None:
+            return annotated
         req = self.context.get("request")
         return bool(
             req
@@ -47,7 +105,11 @@ class RecipeReadSerializer(_ser.ModelSerializer):
     def get_is_in_shopping_cart(self, recipe_obj):
         """
         Определяет наличие рецепта в корзине текущего пользователя.
+        Использует аннотацию из RecipeViewSet, если она есть.
         """
+        annotated = getattr(recipe_obj, "is_in_shopping_cart", None)
+        if annotated is not None:
+            return annotated
         req = self.context.get("request")
         return bool(
             req
@@ -55,12 +117,23 @@ class RecipeReadSerializer(_ser.ModelSerializer):
             and recipe_obj.shoppingcart_set.filter(user=req.user).exists()
         )
 
+    def get_image_thumbnails(self, recipe_obj):
+        """
+        WebP-превью изображения: лента может грузить их вместо оригинала.
+        """
+        return _thumbnail_urls(recipe_obj.image, self.context.get("request"))
+
     def get_ingredients(self, recipe_obj):
         """
         Возвращает список ингредиентов с полями:
         id, name, measurement_unit, amount.
+        Предпочитает связи, подгруженные через prefetch_related.
         """
-        relations = recipe_obj.recipeingredient_set.select_related("ingredient")
+        relations = getattr(recipe_obj, "prefetched_ingredients", None)
+        if relations is None:
+            relations = recipe_obj.recipeingredient_set.select_related(
+                "ingredient"
+            )
         ingredients_list = []
         for rel in relations:
             ing = rel.ingredient
@@ -7,6 +7,7 @@ from ..fields import Base64ImageField as _ImgField
 from ..models import Ingredient as _Ingredient
 from ..models import Recipe as _Recipe
 from ..models import RecipeIngredient as _RecIng
+from ..shopping_totals import apply_recipe_change as _apply_recipe_change
 
 
 class IngredientInRecipeSerializer(_serializers.Serializer):
@@ -52,7 +53,7 @@ class RecipeWriteSerializer(_serializers.ModelSerializer):
         Валидация поля ingredients:
         - не пустой список;
         - уникальность id;
-        - существование ингредиента в БД.
+        - существование ингредиентов в БД (одним запросом).
         """
         if not items:
             raise _ValErr({"ingredients": "Поле 'ingredients' не может быть пустым."})
@@ -60,13 +61,23 @@ class RecipeWriteSerializer(_serializers.ModelSerializer):
         seen_ids = set()
         for element in items:
             idx = element.get("id")
-            if not _Ingredient.objects.filter(id=idx).exists():
-                raise _ValErr({"ingredients": f"Ингредиент с id {idx} не существует."})
             if idx in seen_ids:
                 raise _ValErr(
                     {"ingredients": f"Ингредиент с id {idx} указан несколько раз."}
                 )
             seen_ids.add(idx)
+
+        found = set(
+            _Ingredient.objects.filter(id__in=seen_ids).values_list(
+                "id", flat=True
+            )
+        )
+        missing = sorted(seen_ids - found)
+        if missing:
+            listed = ", ".join(map(str, missing))
+            raise _ValErr(
+                {"ingredients": f"Ингредиенты с id {listed} не существуют."}
+            )
         return items
 
     def validate(self, attrs):
@@ -97,28 +108,77 @@ class RecipeWriteSerializer(_serializers.ModelSerializer):
     def _save_ings(self, recipe_obj, ing_list):
         """
         Вспомогательный метод для сохранения связей RecipeIngredient.
+
+        id ингредиентов уже проверены в validate_ingredients,
+        поэтому строки собираются по ingredient_id без загрузки объектов.
         """
-        relations = []
-        for data in ing_list:
-            relations.append(
-                _RecIng(
-                    recipe=recipe_obj,
-                    ingredient=_Ingredient.objects.get(id=data["id"]),
-                    amount=data["amount"],
-                )
+        _RecIng.objects.bulk_create(
+            _RecIng(
+                recipe=recipe_obj,
+                ingredient_id=data["id"],
+                amount=data["amount"],
+            )
+            for data in ing_list
+        )
+
+    def _sync_ings(self, recipe_obj, ing_list):
+        """
+        Приводит связи RecipeIngredient к ing_list по разнице с текущими:
+        новые строки вставляются, изменённые количества обновляются,
+        удалённые строки удаляются. Нетронутые строки не переписываются.
+        """
+        current = {
+            row.ingredient_id: row
+            for row in recipe_obj.recipeingredient_set.only(
+                "id", "recipe_id", "ingredient_id", "amount"
             )
-        _RecIng.objects.bulk_create(relations)
+        }
+        wanted = {data["id"]: data["amount"] for data in ing_list}
+
+        # {ingredient_id: новое − старое} для материализованных списков
+        deltas = {}
+        stale_ids = []
+        for ing_id, row in current.items():
+            if ing_id not in wanted:
+                stale_ids.append(row.id)
+                deltas[ing_id] = -row.amount
+        changed = []
+        for ing_id, amount in wanted.items():
+            row = current.get(ing_id)
+            if row is not None and row.amount != amount:
+                deltas[ing_id] = amount - row.amount
+                row.amount = amount
+                changed.append(row)
+        added = [
+            {"id": ing_id, "amount": amount}
+            for ing_id, amount in wanted.items()
+            if ing_id not in current
+        ]
+        deltas.update((data["id"], data["amount"]) for data in added)
+
+        # bulk-операции не отправляют сигналы RecipeIngredient: поиск
+        # и обратный индекс обновляет сохранение самого рецепта,
+        # списки покупок правятся здесь
+        if stale_ids:
+            stale = _RecIng.objects.filter(id__in=stale_ids)
+            stale._raw_delete(stale.db)
+        if changed:
+            _RecIng.objects.bulk_update(changed, ["amount"])
+        if added:
+            self._save_ings(recipe_obj, added)
+        _apply_recipe_change(recipe_obj.id, deltas)
 
     @_transaction.atomic
     def update(self, instance, validated_data):
         """
-        Обновление рецепта: удаление старых ингредиентов и добавление новых.
+        Обновление рецепта: ингредиенты меняются по разнице со старым составом.
         """
         ing_list = validated_data.pop("ingredients", None)
         recipe = super().update(instance, validated_data)
         if ing_list:
-            recipe.recipeingredient_set.all().delete()
-            self._save_ings(recipe, ing_list)
+            self._sync_ings(recipe, ing_list)
+            # Связи, подгруженные во вьюсете, больше не актуальны
+            recipe.__dict__.pop("prefetched_ingredients", None)
         return recipe
 
     def to_representation(self, instance):
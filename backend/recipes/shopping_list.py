@@ -0,0 +1,282 @@
+# recipes/shopping_list.py
+
+"""
+Сборка списка покупок пользователя.
+
+Агрегация выполняется одним сгруппированным запросом от RecipeIngredient
+или читается из материализованного списка (recipes/shopping_totals.py).
+Текстовые форматы (txt, csv, json) отдаются генераторами, чтобы не держать
+весь файл в памяти. PDF рендерится в ограниченном пуле воркеров
+и кешируется, пока содержимое корзины не изменится.
+"""
+
+# Стандартная библиотека
+import csv
+import hashlib
+import json
+import logging
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from io import BytesIO
+
+# Сторонние библиотеки
+from api.background import LazyExecutor, pool_executor
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Sum
+
+# Локальные импорты
+from .models import RecipeIngredient, ShoppingListItem
+from .units import canonical_amount, canonical_unit
+
+logger = logging.getLogger(__name__)
+
+# Размер пачки строк, читаемых из курсора БД за раз
+CHUNK_SIZE = 500
+
+TXT_HEADER = "Список покупок:\n"
+CSV_HEADER = ("name", "measurement_unit", "amount")
+
+PDF_FONT_NAME = "ShoppingListFont"
+PDF_CACHE_PREFIX = "shopping-list-pdf"
+
+
+class PoolSaturated(Exception):
+    """Все слоты пула рендеринга PDF заняты."""
+
+
+def aggregate_cart(user):
+    """
+    Итоговое количество каждого ингредиента по корзине пользователя.
+
+    При SHOPPING_LIST_MATERIALIZED — готовые суммы из ShoppingListItem
+    (чтение по индексу user); иначе агрегат по корзине. Связь (user,
+    recipe) в корзине уникальна, поэтому JOIN с ShoppingCart не размножает
+    строки RecipeIngredient.
+    """
+    if settings.SHOPPING_LIST_MATERIALIZED:
+        return _group_by_unit(
+            ShoppingListItem.objects.filter(user=user), "amount"
+        )
+    return _group_by_unit(
+        RecipeIngredient.objects.filter(recipe__shoppingcart__user=user),
+        "amount",
+    )
+
+
+def _group_by_unit(queryset, amount_field):
+    """
+    Сумма amount_field по (название, единица) с сортировкой по названию.
+
+    При SHOPPING_LIST_NORMALIZE_UNITS единицы приводятся к каноническим
+    в том же запросе (см. recipes/units.py): кг и г дают одну строку.
+    """
+    unit_field = "ingredient__measurement_unit"
+    if settings.SHOPPING_LIST_NORMALIZE_UNITS:
+        unit = canonical_unit(unit_field)
+        amount = canonical_amount(amount_field, unit_field)
+    else:
+        unit, amount = F(unit_field), F(amount_field)
+    return (
+        queryset.values(name=F("ingredient__name"), unit=unit)
+        .annotate(total=Sum(amount))
+        .order_by("name", "unit")
+    )
+
+
+def _row_tuple(row):
+    return row["name"], row["unit"], row["total"]
+
+
+def iter_rows(rows):
+    """
+    Читает агрегат пачками и отдаёт кортежи (name, unit, total).
+    """
+    for row in rows.iterator(chunk_size=CHUNK_SIZE):
+        yield _row_tuple(row)
+
+
+async def aiter_rows(rows):
+    """
+    iter_rows для async-представлений: строки читаются через async ORM.
+    """
+    async for row in rows.aiterator(chunk_size=CHUNK_SIZE):
+        yield _row_tuple(row)
+
+
+# ────────────────────────────────────────────────────
+#        Потоковые форматы: txt, csv, json
+# ────────────────────────────────────────────────────
+class _Echo:
+    """Псевдо-файл для csv.writer: возвращает строку вместо записи."""
+
+    def write(self, value):
+        return value
+
+
+_csv_writer = csv.writer(_Echo())
+
+
+class StreamFormat:
+    """
+    Потоковый формат: заголовок, строка на ингредиент и окончание.
+
+    Один и тот же формат отдаётся и синхронным генератором (WSGI),
+    и асинхронным (ASGI), поэтому строки формируются функцией line(index,
+    name, unit, total), а не внутри генератора.
+    """
+
+    def __init__(self, content_type, header, line, footer=""):
+        self.content_type = content_type
+        self.header = header
+        self.line = line
+        self.footer = footer
+
+    def iter(self, rows):
+        yield self.header
+        for index, item in enumerate(iter_rows(rows)):
+            yield self.line(index, *item)
+        if self.footer:
+            yield self.footer
+
+    async def aiter(self, rows):
+        yield self.header
+        index = 0
+        async for item in aiter_rows(rows):
+            yield self.line(index, *item)
+            index += 1
+        if self.footer:
+            yield self.footer
+
+
+def _txt_line(index, name, unit, total):
+    return f"\n{name} ({unit}) — {total}"
+
+
+def _csv_line(index, name, unit, total):
+    return _csv_writer.writerow((name, unit, total))
+
+
+def _json_line(index, name, unit, total):
+    item = {"name": name, "measurement_unit": unit, "amount": total}
+    return ("," if index else "") + json.dumps(item, ensure_ascii=False)
+
+
+STREAM_FORMATS = {
+    "txt": StreamFormat("text/plain; charset=utf-8", TXT_HEADER, _txt_line),
+    "csv": StreamFormat(
+        "text/csv; charset=utf-8", _csv_writer.writerow(CSV_HEADER), _csv_line
+    ),
+    "json": StreamFormat("application/json", "[", _json_line, footer="]"),
+}
+
+
+# ────────────────────────────────────────────────────
+#        PDF: ограниченный пул и кеш по содержимому
+# ────────────────────────────────────────────────────
+def render_pdf(lines, font_path):
+    """
+    Рисует список покупок в PDF (A4) и возвращает байты.
+
+    Функция верхнего уровня, чтобы её можно было передать
+    в ProcessPoolExecutor.
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    from reportlab.pdfgen import canvas
+
+    if PDF_FONT_NAME not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(TTFont(PDF_FONT_NAME, font_path))
+
+    margin, step = 50, 18
+    width, height = A4
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    pdf.setTitle("Список покупок")
+
+    pdf.setFont(PDF_FONT_NAME, 16)
+    y = height - margin
+    pdf.drawString(margin, y, TXT_HEADER.strip())
+    y -= step * 2
+
+    pdf.setFont(PDF_FONT_NAME, 12)
+    for name, unit, total in lines:
+        if y < margin:
+            pdf.showPage()
+            pdf.setFont(PDF_FONT_NAME, 12)
+            y = height - margin
+        pdf.drawString(margin, y, f"{name} ({unit}) — {total}")
+        y -= step
+
+    pdf.save()
+    return buffer.getvalue()
+
+
+# RLock: готовая задача вызывает _on_pdf_done сразу внутри add_done_callback
+_lock = threading.RLock()
+_pending = {}
+_pool = LazyExecutor(
+    lambda: pool_executor(
+        settings.SHOPPING_LIST_PDF_EXECUTOR, settings.SHOPPING_LIST_PDF_WORKERS
+    ),
+    slots=lambda: settings.SHOPPING_LIST_PDF_MAX_PENDING,
+)
+
+
+def _pdf_cache_key(user_id, lines):
+    """
+    Ключ кеша зависит от содержимого списка: любое изменение
+    корзины или ингредиентов рецептов даёт новый ключ.
+    """
+    digest = hashlib.sha1(repr(lines).encode("utf-8")).hexdigest()
+    return f"{PDF_CACHE_PREFIX}:{user_id}:{digest}"
+
+
+def _on_pdf_done(key, future):
+    """
+    Кладёт готовый PDF в кеш и освобождает слот пула.
+    """
+    try:
+        if future.exception() is None:
+            cache.set(
+                key, future.result(), settings.SHOPPING_LIST_PDF_CACHE_TIMEOUT
+            )
+        else:
+            logger.error("Ошибка рендеринга PDF: %s", future.exception())
+    finally:
+        with _lock:
+            _pending.pop(key, None)
+        _pool.slots.release()
+
+
+def request_pdf(user, rows):
+    """
+    Возвращает байты PDF или None, если рендеринг ещё идёт.
+
+    • Готовый файл берётся из кеша без обращения к пулу;
+    • Повторный запрос того же списка ждёт уже запущенную задачу;
+    • Если свободных слотов нет — PoolSaturated.
+    """
+    lines = list(iter_rows(rows))
+    key = _pdf_cache_key(user.id, lines)
+    pdf = cache.get(key)
+    if pdf is not None:
+        return pdf
+
+    with _lock:
+        future = _pending.get(key)
+        if future is None:
+            executor = _pool.get()
+            if not _pool.slots.acquire(blocking=False):
+                raise PoolSaturated
+            future = executor.submit(
+                render_pdf, lines, settings.SHOPPING_LIST_PDF_FONT
+            )
+            _pending[key] = future
+            future.add_done_callback(lambda done: _on_pdf_done(key, done))
+
+    try:
+        return future.result(timeout=settings.SHOPPING_LIST_PDF_WAIT)
+    except FutureTimeoutError:
+        return None
@@ -0,0 +1,298 @@
+# recipes/shopping_totals.py
+
+"""
+Материализованный список покупок: (пользователь, ингредиент) → сумма.
+
+При SHOPPING_LIST_MATERIALIZED выгрузка списка читает готовые строки
+ShoppingListItem пользователя вместо агрегации всей корзины.
+
+• Рецепт добавлен в корзину или убран из неё — суммы его ингредиентов
+  прибавляются или вычитаются в той же транзакции (apply_cart_change).
+• Изменился состав рецепта, который лежит в корзинах, — в той же
+  транзакции списки этих пользователей правятся на разницу
+  (пользователь, ингредиент) += новое − старое (apply_recipe_change).
+  Старое и новое количество знает тот, кто меняет состав:
+  RecipeWriteSerializer._sync_ings или сигналы RecipeIngredient.
+
+Обновления одного пользователя сериализуются блокировкой его строки
+в таблице пользователей. Расхождения (правки в обход ORM, включение
+флага на работающей базе) находит и чинит rebuild_shopping_lists —
+единственное место, где списки собираются из корзин целиком.
+"""
+
+# Стандартная библиотека
+from collections import defaultdict
+
+# Сторонние библиотеки
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (BigIntegerField, Case, F, Q, Sum, Value,
+                              When)
+
+# Локальные импорты
+from .models import RecipeIngredient, ShoppingCart, ShoppingListItem, User
+
+BATCH_SIZE = 1000
+
+
+def lock_users(user_ids):
+    """
+    Блокирует строки пользователей до конца транзакции.
+
+    FOR NO KEY UPDATE не мешает вставлять строки, ссылающиеся на
+    пользователя (избранное, подписки); порядок по pk исключает взаимные
+    блокировки.
+    """
+    list(
+        User.objects.select_for_update(no_key=True)
+        .filter(pk__in=user_ids)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+
+
+def apply_cart_change(user_id, recipe_ids, sign):
+    """
+    Прибавляет (sign=1) или вычитает (sign=-1) ингредиенты рецептов
+    recipe_ids из списка покупок пользователя.
+    """
+    if not settings.SHOPPING_LIST_MATERIALIZED:
+        return
+    deltas = dict(
+        RecipeIngredient.objects.filter(recipe_id__in=recipe_ids)
+        .order_by()
+        .values("ingredient_id")
+        .annotate(total=Sum("amount"))
+        .values_list("ingredient_id", "total")
+    )
+    if not deltas:
+        return
+
+    # Без точки сохранения: изменение идёт вместе с записью в корзину
+    with transaction.atomic(savepoint=False):
+        lock_users([user_id])
+        items = {
+            item.ingredient_id: item
+            for item in ShoppingListItem.objects.filter(
+                user_id=user_id, ingredient_id__in=deltas
+            )
+        }
+        created, updated, emptied = [], [], []
+        for ingredient_id, total in deltas.items():
+            item = items.get(ingredient_id)
+            amount = (item.amount if item else 0) + sign * total
+            if item is None:
+                if amount > 0:
+                    created.append(
+                        ShoppingListItem(
+                            user_id=user_id,
+                            ingredient_id=ingredient_id,
+                            amount=amount,
+                        )
+                    )
+            elif amount > 0:
+                item.amount = amount
+                updated.append(item)
+            else:
+                emptied.append(item.pk)
+
+        if created:
+            ShoppingListItem.objects.bulk_create(created)
+        if updated:
+            ShoppingListItem.objects.bulk_update(updated, ["amount"])
+        if emptied:
+            ShoppingListItem.objects.filter(pk__in=emptied).delete()
+
+
+def apply_recipe_change(recipe_id, deltas):
+    """
+    Правит списки пользователей, у которых рецепт recipe_id в корзине,
+    на изменение его состава deltas {ingredient_id: новое − старое}.
+
+    Число запросов не зависит ни от числа пользователей, ни от числа
+    ингредиентов: обнулённые строки удаляются одним DELETE, остальные
+    сдвигаются одним UPDATE, недостающие вставляются одним INSERT.
+    """
+    if not settings.SHOPPING_LIST_MATERIALIZED:
+        return
+    deltas = {
+        ingredient_id: delta
+        for ingredient_id, delta in deltas.items()
+        if delta
+    }
+    if not deltas:
+        return
+
+    with transaction.atomic(savepoint=False):
+        user_ids = list(
+            ShoppingCart.objects.filter(recipe_id=recipe_id).values_list(
+                "user_id", flat=True
+            )
+        )
+        if not user_ids:
+            return
+        lock_users(user_ids)
+        items = ShoppingListItem.objects.filter(
+            user_id__in=user_ids, ingredient_id__in=deltas
+        )
+
+        emptied = Q()
+        for ingredient_id, delta in deltas.items():
+            if delta < 0:
+                emptied |= Q(ingredient_id=ingredient_id, amount__lte=-delta)
+        if emptied:
+            items.filter(emptied).delete()
+
+        grown = [
+            ingredient_id
+            for ingredient_id, delta in deltas.items()
+            if delta > 0
+        ]
+        existing = (
+            set(
+                items.filter(ingredient_id__in=grown).values_list(
+                    "user_id", "ingredient_id"
+                )
+            )
+            if grown
+            else set()
+        )
+        # После DELETE у оставшихся строк amount > −delta
+        items.update(
+            amount=F("amount")
+            + Case(
+                *(
+                    When(ingredient_id=ingredient_id, then=Value(delta))
+                    for ingredient_id, delta in deltas.items()
+                ),
+                output_field=BigIntegerField(),
+            )
+        )
+        ShoppingListItem.objects.bulk_create(
+            (
+                ShoppingListItem(
+                    user_id=user_id,
+                    ingredient_id=ingredient_id,
+                    amount=deltas[ingredient_id],
+                )
+                for user_id in user_ids
+                for ingredient_id in grown
+                if (user_id, ingredient_id) not in existing
+            ),
+            batch_size=BATCH_SIZE,
+        )
+
+
+def stored_row(instance):
+    """
+    (recipe_id, ingredient_id, amount) строки RecipeIngredient в базе
+    до её сохранения; None для новой строки или без материализации.
+    """
+    if not settings.SHOPPING_LIST_MATERIALIZED or instance.pk is None:
+        return None
+    return (
+        RecipeIngredient.objects.filter(pk=instance.pk)
+        .values_list("recipe_id", "ingredient_id", "amount")
+        .first()
+    )
+
+
+def apply_row_change(old, new):
+    """
+    Правит списки на замену строки состава old на new; каждая —
+    (recipe_id, ingredient_id, amount) или None.
+    """
+    changes = defaultdict(lambda: defaultdict(int))
+    if old is not None:
+        recipe_id, ingredient_id, amount = old
+        changes[recipe_id][ingredient_id] -= amount
+    if new is not None:
+        recipe_id, ingredient_id, amount = new
+        changes[recipe_id][ingredient_id] += amount
+    for recipe_id, deltas in changes.items():
+        apply_recipe_change(recipe_id, deltas)
+
+
+def cart_totals(user_ids):
+    """
+    Суммы по корзинам из исходных данных: {(user_id, ingredient_id): сумма}.
+    """
+    rows = (
+        RecipeIngredient.objects.filter(
+            recipe__shoppingcart__user_id__in=user_ids
+        )
+        .order_by()
+        .values("recipe__shoppingcart__user_id", "ingredient_id")
+        .annotate(total=Sum("amount"))
+        .values_list("recipe__shoppingcart__user_id", "ingredient_id", "total")
+    )
+    return {
+        (user_id, ingredient_id): total
+        for user_id, ingredient_id, total in rows
+    }
+
+
+def stored_totals(user_ids):
+    """
+    Материализованные суммы в том же виде, что cart_totals.
+    """
+    rows = ShoppingListItem.objects.filter(user_id__in=user_ids).values_list(
+        "user_id", "ingredient_id", "amount"
+    )
+    return {
+        (user_id, ingredient_id): amount
+        for user_id, ingredient_id, amount in rows
+    }
+
+
+def diverged_users(user_ids):
+    """
+    Пользователи из user_ids, чей список расходится с корзиной.
+    """
+    expected, stored = cart_totals(user_ids), stored_totals(user_ids)
+    return sorted(
+        {
+            user_id
+            for user_id, ingredient_id in expected.keys() | stored.keys()
+            if expected.get((user_id, ingredient_id))
+            != stored.get((user_id, ingredient_id))
+        }
+    )
+
+
+def rebuild_shopping_lists(user_ids):
+    """
+    Пересобирает списки user_ids из корзин; возвращает число строк.
+    """
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return 0
+    with transaction.atomic():
+        lock_users(user_ids)
+        ShoppingListItem.objects.filter(user_id__in=user_ids).delete()
+        items = ShoppingListItem.objects.bulk_create(
+            (
+                ShoppingListItem(
+                    user_id=user_id, ingredient_id=ingredient_id, amount=total
+                )
+                for (user_id, ingredient_id), total in cart_totals(
+                    user_ids
+                ).items()
+            ),
+            batch_size=BATCH_SIZE,
+        )
+    return len(items)
+
+
+def users_with_lists():
+    """
+    Все пользователи, у которых есть корзина или материализованный список.
+    """
+    return sorted(
+        set(ShoppingCart.objects.values_list("user_id", flat=True).distinct())
+        | set(
+            ShoppingListItem.objects.values_list(
+                "user_id", flat=True
+            ).distinct()
+        )
+    )
@@ -0,0 +1,119 @@
+# recipes/shortlinks.py
+
+"""
+Короткие ссылки на рецепты.
+
+Код — base62 от id рецепта: он детерминирован, не пересекается с кодами
+других рецептов и сохраняется в ShortLink, так что повторный get-link
+возвращает ту же ссылку. Переходы по /short/<code> разрешаются через
+LRU-кеш в памяти воркера и идут в БД только при промахе.
+"""
+
+# Стандартная библиотека
+import string
+import threading
+from collections import OrderedDict
+
+# Сторонние библиотеки
+from django.conf import settings
+
+# Локальные импорты
+from .models import ShortLink
+
+ALPHABET = string.digits + string.ascii_letters
+BASE = len(ALPHABET)
+
+
+def encode_id(value):
+    """
+    Записывает неотрицательное целое в base62.
+    """
+    if value == 0:
+        return ALPHABET[0]
+    digits = []
+    while value:
+        value, rem = divmod(value, BASE)
+        digits.append(ALPHABET[rem])
+    return "".join(reversed(digits))
+
+
+def code_for(recipe):
+    """
+    Код рецепта; запись ShortLink создаётся при первом обращении.
+    """
+    link, _created = ShortLink.objects.get_or_create(
+        recipe=recipe, defaults={"code": encode_id(recipe.id)}
+    )
+    return link.code
+
+
+class _CodeCache:
+    """
+    LRU «код → id рецепта» на SHORT_LINK_CACHE_SIZE записей.
+
+    Общий для синхронного и асинхронного разрешения: lru_cache
+    не умеет кешировать результат корутины.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+
+    def get(self, code):
+        with self._lock:
+            recipe_id = self._items.get(code)
+            if recipe_id is not None:
+                self._items.move_to_end(code)
+            return recipe_id
+
+    def put(self, code, recipe_id):
+        with self._lock:
+            self._items[code] = recipe_id
+            self._items.move_to_end(code)
+            if len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+_resolved = _CodeCache(settings.SHORT_LINK_CACHE_SIZE)
+
+
+def _lookup(code):
+    return ShortLink.objects.values_list("recipe_id", flat=True).filter(
+        code=code
+    )
+
+
+def resolve_code(code):
+    """
+    id рецепта по коду; ShortLink.DoesNotExist, если кода нет.
+
+    Несуществующие коды не кешируются и не вытесняют рабочие.
+    """
+    recipe_id = _resolved.get(code)
+    if recipe_id is None:
+        recipe_id = _lookup(code).get()
+        _resolved.put(code, recipe_id)
+    return recipe_id
+
+
+async def aresolve_code(code):
+    """
+    resolve_code для async-представлений: промах идёт через async ORM.
+    """
+    recipe_id = _resolved.get(code)
+    if recipe_id is None:
+        recipe_id = await _lookup(code).aget()
+        _resolved.put(code, recipe_id)
+    return recipe_id
+
+
+def clear_resolved_codes():
+    """
+    Сбрасывает кеш разрешённых кодов (например, после удаления ссылки).
+    """
+    _resolved.clear()
@@ -0,0 +1,209 @@
+# recipes/signals.py
+
+"""
+Обработчики сигналов моделей приложения recipes.
+"""
+
+# Сторонние библиотеки
+from api.counters import adjust
+from api.images import schedule_thumbnails
+from django.db import transaction
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+
+# Локальные импорты
+from .catalogue import bump_catalogue_version
+from .cook_index import record_recipe_change
+from .models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    RecipeRanking,
+    ShoppingCart,
+    ShortLink,
+    User,
+)
+from .recipe_cache import recipe_cache
+from .search import recipes_with_ingredient, schedule_search_refresh
+from .shopping_totals import apply_cart_change, apply_row_change, stored_row
+from .shortlinks import clear_resolved_codes
+
+# Модель связи → счётчик рецепта
+RELATION_COUNTERS = {Favorite: "favorites_count", ShoppingCart: "cart_count"}
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def ingredient_changed(sender, **kwargs):
+    """Любое изменение ингредиента меняет версию каталога."""
+    bump_catalogue_version()
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def recipe_changed(sender, instance, **kwargs):
+    """Сбрасывает закешированное тело рецепта."""
+    recipe_cache.invalidate_recipe(instance.id)
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_saved_for_search(sender, instance, **kwargs):
+    """Название, описание или состав могли измениться — пересчёт вектора."""
+    schedule_search_refresh(instance.id)
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def recipe_ingredients_changed_for_search(sender, instance, **kwargs):
+    """Состав рецепта входит в поисковый вектор."""
+    schedule_search_refresh(instance.recipe_id)
+
+
+@receiver(post_save, sender=Ingredient)
+def ingredient_saved_for_search(sender, instance, created, **kwargs):
+    """Переименование ингредиента меняет векторы рецептов с ним."""
+    if not created:
+        for recipe_id in recipes_with_ingredient(instance.id):
+            schedule_search_refresh(recipe_id)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def recipe_changed_for_cook_index(sender, instance, **kwargs):
+    """
+    Состав рецепта пишется вместе с рецептом (bulk_create без сигналов),
+    поэтому обратный индекс обновляется по сохранению самого рецепта.
+    """
+    record_recipe_change(instance.id)
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def recipe_ingredient_changed_for_cook_index(sender, instance, **kwargs):
+    """Правка отдельной строки состава (например, в админке)."""
+    record_recipe_change(instance.recipe_id)
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_created(sender, instance, created, **kwargs):
+    """
+    Новый рецепт увеличивает счётчик рецептов автора
+    и получает строку рейтинга трендов.
+    """
+    if created:
+        adjust(User, instance.author_id, "recipes_count", 1)
+        RecipeRanking.objects.create(recipe=instance)
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    """Удалённый рецепт уменьшает счётчик рецептов автора."""
+    adjust(User, instance.author_id, "recipes_count", -1)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=ShoppingCart)
+def recipe_relation_created(sender, instance, created, **kwargs):
+    """Добавление в избранное или корзину увеличивает счётчик рецепта."""
+    if created:
+        adjust(Recipe, instance.recipe_id, RELATION_COUNTERS[sender], 1)
+
+
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=ShoppingCart)
+def recipe_relation_deleted(sender, instance, **kwargs):
+    """Удаление из избранного или корзины уменьшает счётчик рецепта."""
+    adjust(Recipe, instance.recipe_id, RELATION_COUNTERS[sender], -1)
+
+
+@receiver(post_save, sender=ShoppingCart)
+def cart_item_created(sender, instance, created, **kwargs):
+    """Ингредиенты рецепта добавляются в материализованный список покупок."""
+    if created:
+        apply_cart_change(instance.user_id, [instance.recipe_id], 1)
+
+
+@receiver(pre_delete, sender=ShoppingCart)
+def cart_item_deleting(sender, instance, **kwargs):
+    """
+    Ингредиенты рецепта вычитаются из списка покупок. pre_delete, а не
+    post_delete: при удалении рецепта каскад может стереть его состав
+    раньше строк корзины, а pre_delete отправляется до любого удаления.
+    """
+    apply_cart_change(instance.user_id, [instance.recipe_id], -1)
+
+
+@receiver(pre_save, sender=RecipeIngredient)
+def recipe_ingredient_saving(sender, instance, **kwargs):
+    """Прежние ингредиент и количество строки — для разницы в списках."""
+    instance._stored_row = stored_row(instance)
+
+
+@receiver(post_save, sender=RecipeIngredient)
+def recipe_ingredient_saved_for_shopping_lists(sender, instance, **kwargs):
+    """
+    Состав рецепта в чужих корзинах изменился (например, в админке):
+    списки покупок правятся на разницу со старой строкой.
+    """
+    apply_row_change(
+        getattr(instance, "_stored_row", None),
+        (instance.recipe_id, instance.ingredient_id, instance.amount),
+    )
+
+
+@receiver(post_delete, sender=RecipeIngredient)
+def recipe_ingredient_deleted_for_shopping_lists(
+    sender, instance, origin=None, **kwargs
+):
+    """
+    Строка состава удалена — её количество вычитается из списков.
+    При удалении самого рецепта это уже сделал cart_item_deleting.
+    """
+    if isinstance(origin, Recipe) or getattr(origin, "model", None) is Recipe:
+        return
+    apply_row_change(
+        (instance.recipe_id, instance.ingredient_id, instance.amount), None
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_image_saved(sender, instance, **kwargs):
+    """Строит превью изображения после фиксации транзакции."""
+    name, recipe_id = instance.image.name, instance.id
+    transaction.on_commit(
+        lambda: schedule_thumbnails(
+            name, on_ready=lambda: recipe_cache.invalidate_recipe(recipe_id)
+        )
+    )
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def recipe_ingredient_changed(sender, instance, **kwargs):
+    """Изменение состава меняет тело рецепта."""
+    recipe_cache.invalidate_recipe(instance.recipe_id)
+
+
+@receiver(post_save, sender=User)
+def author_changed(sender, instance, **kwargs):
+    """Имя, email или аватар автора входят в тела его рецептов."""
+    recipe_cache.invalidate_author(instance.id)
+
+
+@receiver(post_save, sender=User)
+def avatar_saved(sender, instance, **kwargs):
+    """Строит превью аватара после фиксации транзакции."""
+    name, author_id = instance.avatar.name, instance.id
+    transaction.on_commit(
+        lambda: schedule_thumbnails(
+            name, on_ready=lambda: recipe_cache.invalidate_author(author_id)
+        )
+    )
+
+
+@receiver(post_delete, sender=ShortLink)
+def short_link_deleted(sender, **kwargs):
+    """Удалённый код не должен разрешаться из LRU этого воркера."""
+    clear_resolved_codes()
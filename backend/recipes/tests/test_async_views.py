@@ -0,0 +1,82 @@
+# recipes/tests/test_async_views.py
+
+"""
+Выгрузка списка покупок в ASGI-режиме отдаёт те же форматы, что WSGI.
+"""
+
+# Стандартная библиотека
+import importlib
+
+# Сторонние библиотеки
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import clear_url_caches
+from rest_framework.authtoken.models import Token
+
+# Локальные импорты
+import api.urls
+import config.urls
+from recipes.models import ShoppingCart
+
+FORMATS = {
+    "txt": "text/plain",
+    "csv": "text/csv",
+    "json": "application/json",
+    "pdf": "application/pdf",
+}
+
+
+def _reload_urls():
+    importlib.reload(api.urls)
+    importlib.reload(config.urls)
+    clear_url_caches()
+
+
+@pytest.fixture
+def asgi_urls(settings):
+    """Маршруты, собранные с ASYNC_VIEWS=1."""
+    settings.ASYNC_VIEWS = True
+    _reload_urls()
+    yield
+    settings.ASYNC_VIEWS = False
+    _reload_urls()
+
+
+async def _download(headers, export_format):
+    response = await AsyncClient().get(
+        "/api/recipes/download_shopping_cart/",
+        {"format": export_format},
+        headers=headers,
+    )
+    if response.streaming:
+        body = b"".join([chunk async for chunk in response.streaming_content])
+    else:
+        body = response.content
+    return response, body
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("export_format", FORMATS)
+def test_download_shopping_cart_formats(
+    settings, asgi_urls, viewer, make_recipe, export_format
+):
+    # PDF рендерится в пуле: ждём готовый файл, а не 202
+    settings.SHOPPING_LIST_PDF_WAIT = 30
+    ShoppingCart.objects.create(user=viewer, recipe=make_recipe())
+    token = Token.objects.create(user=viewer)
+
+    response, body = async_to_sync(_download)(
+        {"Authorization": f"Token {token.key}"}, export_format
+    )
+
+    assert response.status_code == 200, body
+    assert response["Content-Type"].startswith(FORMATS[export_format])
+    assert (
+        f'filename="ingredients.{export_format}"'
+        in response["Content-Disposition"]
+    )
+    if export_format == "pdf":
+        assert body.startswith(b"%PDF")
+    else:
+        assert "мука" in body.decode()
@@ -0,0 +1,96 @@
+# recipes/tests/test_cook_index.py
+
+"""
+Обратный индекс what_can_i_cook и журнал изменений между воркерами.
+"""
+
+# Стандартная библиотека
+import multiprocessing
+
+# Сторонние библиотеки
+import pytest
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+
+# Локальные импорты
+from recipes.cook_index import (CHANGE_PREFIX, CookIndex, _current_seq,
+                                _publish)
+from recipes.models import RecipeIngredient
+
+PROCESSES = 4
+CHANGES_PER_PROCESS = 50
+
+
+@pytest.mark.django_db
+def test_worker_patches_index_from_journal(
+    monkeypatch, make_recipe, ingredients, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        recipe = make_recipe(amounts={0: 100})
+    worker = CookIndex()
+    assert worker.rank([ingredients[0].id]) == [(recipe.id, 0)]
+
+    # Изменение из «другого воркера» приходит через журнал в общем кеше
+    with django_capture_on_commit_callbacks(execute=True):
+        RecipeIngredient.objects.create(
+            recipe=recipe, ingredient=ingredients[1], amount=50
+        )
+    monkeypatch.setattr(worker, "_rebuild", pytest.fail)
+    assert worker.rank([ingredients[0].id]) == [(recipe.id, 1)]
+    assert worker.rank([ingredients[0].id, ingredients[1].id]) == [
+        (recipe.id, 0)
+    ]
+
+
+@pytest.mark.django_db
+def test_what_can_i_cook_orders_by_missing(
+    viewer_client, make_recipe, ingredients, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        full = make_recipe(name="Есть всё", amounts={0: 100, 1: 50})
+        partial = make_recipe(name="Не хватает", amounts={0: 100, 2: 10, 3: 1})
+    response = viewer_client.get(
+        "/api/recipes/what_can_i_cook/",
+        {"ingredients": f"{ingredients[0].id},{ingredients[1].id}"},
+    )
+    assert response.status_code == 200, response.content
+    assert [
+        (item["id"], item["missing_ingredients"])
+        for item in response.json()["results"]
+    ] == [(full.id, 0), (partial.id, 2)]
+
+
+def test_parallel_publishers_get_distinct_numbers():
+    """
+    Воркеры gunicorn публикуют изменения одновременно: в журнале
+    файлового кеша нет ни потерянных, ни повторных номеров.
+    """
+    backend = caches[settings.SHARED_CACHE_ALIAS]
+    if not isinstance(backend, FileBasedCache):
+        pytest.skip("INCR в Redis атомарен")
+    start = _current_seq()
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(
+            target=_publish,
+            args=(
+                range(
+                    number * CHANGES_PER_PROCESS,
+                    (number + 1) * CHANGES_PER_PROCESS,
+                ),
+            ),
+        )
+        for number in range(PROCESSES)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    total = PROCESSES * CHANGES_PER_PROCESS
+    assert _current_seq() == start + total
+    changes = backend.get_many(
+        f"{CHANGE_PREFIX}:{seq}" for seq in range(start + 1, start + total + 1)
+    )
+    assert sorted(changes.values()) == list(range(total))
@@ -0,0 +1,88 @@
+# recipes/tests/test_counters.py
+
+"""
+Денормализованные счётчики: правка сигналами и repair_counters.
+"""
+
+# Стандартная библиотека
+from io import StringIO
+
+# Сторонние библиотеки
+from api.counters import adjust
+from django.core.management import call_command
+
+# Локальные импорты
+from recipes.models import Favorite, Recipe, ShoppingCart
+from users.models import Subscription, User
+
+
+def _recipe_counters(recipe):
+    return tuple(
+        Recipe.objects.filter(pk=recipe.pk).values_list(
+            "favorites_count", "cart_count"
+        )[0]
+    )
+
+
+def _user_counters(user):
+    return tuple(
+        User.objects.filter(pk=user.pk).values_list(
+            "recipes_count", "subscribers_count"
+        )[0]
+    )
+
+
+def test_signals_keep_counters(author, viewer, make_user, make_recipe):
+    other = make_user("other")
+    recipe = make_recipe()
+    assert _user_counters(author) == (1, 0)
+
+    Favorite.objects.create(user=viewer, recipe=recipe)
+    Favorite.objects.create(user=other, recipe=recipe)
+    cart = ShoppingCart.objects.create(user=viewer, recipe=recipe)
+    Subscription.objects.create(user=viewer, author=author)
+    assert _recipe_counters(recipe) == (2, 1)
+    assert _user_counters(author) == (1, 1)
+
+    Favorite.objects.filter(user=other).delete()
+    cart.delete()
+    Subscription.objects.filter(user=viewer).delete()
+    assert _recipe_counters(recipe) == (1, 0)
+    assert _user_counters(author) == (1, 0)
+
+    recipe.delete()
+    assert _user_counters(author) == (0, 0)
+
+
+def test_adjust_does_not_go_below_zero(make_recipe):
+    recipe = make_recipe()
+
+    adjust(Recipe, recipe.pk, "favorites_count", -1)
+
+    assert _recipe_counters(recipe) == (0, 0)
+
+
+def test_repair_counters_fixes_only_drifted_rows(author, viewer, make_recipe):
+    drifted, intact = make_recipe("Блины"), make_recipe("Хлеб")
+    Favorite.objects.create(user=viewer, recipe=drifted)
+    ShoppingCart.objects.create(user=viewer, recipe=intact)
+    Subscription.objects.create(user=viewer, author=author)
+    # правки в обход ORM-сигналов
+    Recipe.objects.filter(pk=drifted.pk).update(
+        favorites_count=7, cart_count=3
+    )
+    User.objects.filter(pk=author.pk).update(
+        recipes_count=0, subscribers_count=5
+    )
+
+    out = StringIO()
+    call_command("repair_counters", stdout=out)
+
+    assert _recipe_counters(drifted) == (1, 0)
+    assert _recipe_counters(intact) == (0, 1)
+    assert _user_counters(author) == (2, 1)
+    assert "Counters repaired: 4 rows" in out.getvalue()
+
+    out = StringIO()
+    call_command("repair_counters", stdout=out)
+    assert "Counters repaired: 0 rows" in out.getvalue()
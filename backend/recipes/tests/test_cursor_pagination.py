@@ -0,0 +1,112 @@
+# recipes/tests/test_cursor_pagination.py
+
+"""
+Keyset-пагинация GET /api/recipes/?cursor=: обход по ссылкам next
+выдаёт каждый рецепт ровно один раз, в том числе при равных значениях
+поля сортировки.
+"""
+
+# Стандартная библиотека
+from datetime import timedelta
+
+# Сторонние библиотеки
+import pytest
+from django.utils import timezone
+
+# Локальные импорты
+from recipes.management.commands.seed_benchmark import IMAGE_NAME
+from recipes.models import Recipe, RecipeRanking
+
+RECIPES = 9
+PAGE_SIZE = 2
+
+
+@pytest.fixture
+def recipes(author):
+    Recipe.objects.bulk_create(
+        Recipe(
+            author=author,
+            name=f"Рецепт {number}",
+            text="Описание",
+            cooking_time=10,
+            image=IMAGE_NAME,
+        )
+        for number in range(RECIPES)
+    )
+    created = list(Recipe.objects.order_by("pk"))
+    now = timezone.now()
+    # значения повторяются тройками: ключ курсора неуникален
+    for number, recipe in enumerate(created):
+        Recipe.objects.filter(pk=recipe.pk).update(
+            created_at=now - timedelta(minutes=number // 3),
+            favorites_count=number // 3,
+        )
+        RecipeRanking.objects.update_or_create(
+            recipe=recipe, defaults={"trending_score": (number // 3) / 3}
+        )
+    return created
+
+
+SEARCH_FIELDS = ("name", "ingredient_names", "text")
+
+
+@pytest.fixture
+def searchable(recipes):
+    """
+    «пирог» в названии, в ингредиентах или только в описании:
+    равные search_rank внутри каждой группы.
+    """
+    for number, recipe in enumerate(recipes):
+        field = SEARCH_FIELDS[number % len(SEARCH_FIELDS)]
+        Recipe.objects.filter(pk=recipe.pk).update(**{field: "пирог"})
+    return recipes
+
+
+def walk(client, params):
+    """
+    Проходит все страницы по ссылкам next, возвращает id по порядку.
+    """
+    ids = []
+    response = client.get(
+        "/api/recipes/", {"cursor": "", "limit": PAGE_SIZE, **params}
+    )
+    while True:
+        assert response.status_code == 200
+        ids.extend(recipe["id"] for recipe in response.data["results"])
+        assert len(ids) <= RECIPES, "ссылки next зациклились"
+        if response.data["next"] is None:
+            return ids
+        response = client.get(response.data["next"])
+
+
+@pytest.mark.parametrize(
+    "params, ordering",
+    [
+        ({}, ("-created_at", "-id")),
+        ({"ordering": "popular"}, ("-favorites_count", "-id")),
+        ({"ordering": "trending"}, ("-ranking__trending_score", "-id")),
+    ],
+)
+def test_cursor_walk_returns_every_recipe_once(
+    api_client, recipes, params, ordering
+):
+    ids = walk(api_client, params)
+
+    expected = list(
+        Recipe.objects.order_by(*ordering).values_list("id", flat=True)
+    )
+    assert ids == expected
+
+
+def test_search_cursor_walk_returns_every_recipe_once(api_client, searchable):
+    ids = walk(api_client, {"search": "пирог"})
+
+    # по убыванию ранга (название, ингредиенты, описание), внутри — по id
+    expected = [
+        recipe.pk
+        for _, _, recipe in sorted(
+            (number % len(SEARCH_FIELDS), -recipe.pk, recipe)
+            for number, recipe in enumerate(searchable)
+        )
+    ]
+    assert ids == expected
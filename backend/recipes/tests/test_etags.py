@@ -0,0 +1,63 @@
+# recipes/tests/test_etags.py
+
+"""
+ETag каталога ингредиентов и карточки рецепта.
+"""
+
+# Сторонние библиотеки
+import pytest
+from api.images import thumbnail_name
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+# Локальные импорты
+from recipes.models import Ingredient
+
+
+def _etag(client, path):
+    response = client.get(path)
+    assert response.status_code == 200, response.content
+    return response["ETag"]
+
+
+@pytest.mark.django_db
+def test_catalogue_version_changes_after_commit(
+    api_client, ingredients, django_capture_on_commit_callbacks
+):
+    before = _etag(api_client, "/api/ingredients/")
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        Ingredient.objects.create(name="корица", measurement_unit="г")
+        # до фиксации транзакции клиенты видят прежнюю версию
+        assert _etag(api_client, "/api/ingredients/") == before
+    assert callbacks
+    after = api_client.get("/api/ingredients/", HTTP_IF_NONE_MATCH=before)
+    assert after.status_code == 200
+    assert "корица" in {item["name"] for item in after.json()}
+
+
+@pytest.mark.django_db
+def test_recipe_etag_changes_when_thumbnails_are_ready(
+    settings, viewer_client, make_recipe
+):
+    # превью строит другой воркер: проверять хранилище при каждом запросе
+    settings.IMAGE_MISSING_RECHECK = 0
+    recipe = make_recipe()
+    path = f"/api/recipes/{recipe.id}/"
+    first = viewer_client.get(path)
+    assert set(first.json()["image_thumbnails"].values()) == {
+        first.json()["image"]
+    }
+    assert (
+        viewer_client.get(path, HTTP_IF_NONE_MATCH=first["ETag"]).status_code
+        == 304
+    )
+
+    for width in settings.IMAGE_THUMBNAIL_SIZES.values():
+        default_storage.save(
+            thumbnail_name(recipe.image.name, width), ContentFile(b"webp")
+        )
+    second = viewer_client.get(path, HTTP_IF_NONE_MATCH=first["ETag"])
+    assert second.status_code == 200
+    assert all(
+        "/thumbs/" in url for url in second.json()["image_thumbnails"].values()
+    )
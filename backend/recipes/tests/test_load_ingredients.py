@@ -0,0 +1,105 @@
+# recipes/tests/test_load_ingredients.py
+
+"""
+Загрузка ингредиентов командой load_ingredients из JSON и CSV.
+"""
+
+# Стандартная библиотека
+import json
+from io import StringIO
+
+# Сторонние библиотеки
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+# Локальные импорты
+from recipes.models import Ingredient
+
+
+def _load(path, **options):
+    out = StringIO()
+    call_command("load_ingredients", str(path), stdout=out, **options)
+    return out.getvalue()
+
+
+def _catalogue():
+    return set(Ingredient.objects.values_list("name", "measurement_unit"))
+
+
+@pytest.fixture
+def existing(db):
+    return Ingredient.objects.create(name="мука", measurement_unit="г")
+
+
+def test_json_skips_duplicates(tmp_path, existing):
+    path = tmp_path / "ingredients.json"
+    path.write_text(
+        json.dumps(
+            [
+                {"name": "мука", "measurement_unit": "г"},
+                {"name": "сахар", "measurement_unit": "г"},
+                {"name": " сахар ", "measurement_unit": "г"},
+                {"name": "сахар", "measurement_unit": "кг"},
+            ],
+            ensure_ascii=False,
+        ),
+        encoding="utf-8",
+    )
+
+    # маленький пакет: повтор приходит в следующем INSERT
+    output = _load(path, batch_size=2)
+
+    assert _catalogue() == {("мука", "г"), ("сахар", "г"), ("сахар", "кг")}
+    assert "2 inserted, 2 skipped, 4 rows" in output
+
+
+def test_csv_with_header_and_duplicates(tmp_path, existing):
+    path = tmp_path / "ingredients.csv"
+    path.write_text(
+        "name,measurement_unit\n"
+        "мука,г\n"
+        "\n"
+        '"соль, морская",г\n'
+        "соль,г\n"
+        "соль,г\n",
+        encoding="utf-8",
+    )
+
+    output = _load(path)
+
+    assert _catalogue() == {
+        ("мука", "г"),
+        ("соль, морская", "г"),
+        ("соль", "г"),
+    }
+    assert "2 inserted, 2 skipped, 4 rows" in output
+
+
+@pytest.mark.parametrize(
+    "filename, content",
+    [
+        ("bad.csv", "сахар,г\nсоль\n"),
+        ("bad.csv", "сахар,г\n ,г\n"),
+        ("bad.json", '[{"name": "сахар", "measurement_unit": "г"}, {}]'),
+        ("bad.json", '[{"name": "сахар", "measurement_unit": "г"}, ["соль"]]'),
+        ("bad.json", '{"name": "сахар", "measurement_unit": "г"}'),
+        ("bad.json", '[{"name": "сахар", "measurement_unit": "г"'),
+    ],
+)
+def test_bad_row_rolls_back_whole_file(tmp_path, existing, filename, content):
+    path = tmp_path / filename
+    path.write_text(content, encoding="utf-8")
+
+    with pytest.raises(CommandError):
+        _load(path, batch_size=1)
+
+    assert _catalogue() == {("мука", "г")}
+
+
+def test_unknown_format(tmp_path, db):
+    path = tmp_path / "ingredients.xml"
+    path.write_text("<ingredients/>", encoding="utf-8")
+
+    with pytest.raises(CommandError, match="Unsupported file format"):
+        _load(path)
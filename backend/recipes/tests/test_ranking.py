@@ -0,0 +1,88 @@
+# recipes/tests/test_ranking.py
+
+"""
+Рейтинг трендов: инкрементальный пересчёт трогает только рецепты
+с новыми событиями и даёт тот же порядок, что и полный.
+"""
+
+# Стандартная библиотека
+from datetime import timedelta
+
+# Сторонние библиотеки
+import pytest
+from django.utils import timezone
+
+# Локальные импорты
+from recipes.models import Favorite, RankingEpoch, RecipeRanking, ShoppingCart
+from recipes.ranking import (RENORMALIZE_HALF_LIVES, _half_life_seconds,
+                             decay, refresh_rankings)
+
+
+@pytest.fixture
+def start():
+    return timezone.now()
+
+
+@pytest.fixture
+def recipes(make_recipe):
+    return [make_recipe(name=f"Рецепт {number}") for number in range(4)]
+
+
+def _event(model, user, recipe, at):
+    link = model.objects.create(user=user, recipe=recipe)
+    model.objects.filter(pk=link.pk).update(created_at=at)
+
+
+def _scores(recipes):
+    return {
+        row.recipe_id: (row.trending_score, row.refreshed_at)
+        for row in RecipeRanking.objects.filter(recipe__in=recipes)
+    }
+
+
+def test_incremental_touches_only_new_activity(make_user, recipes, start):
+    first, second, third, idle = recipes
+    users = [make_user(f"fan{number}") for number in range(3)]
+    _event(Favorite, users[0], first, start - timedelta(hours=10))
+    _event(Favorite, users[1], second, start - timedelta(hours=1))
+    refresh_rankings(full=True, now=start)
+    before = _scores(recipes)
+
+    later = start + timedelta(hours=5)
+    _event(ShoppingCart, users[2], third, later - timedelta(hours=2))
+    _event(Favorite, users[2], first, later - timedelta(hours=1))
+    stats = refresh_rankings(now=later)
+
+    assert stats["mode"] == "incremental"
+    assert stats["updated"] == 2
+    after = _scores(recipes)
+    # у рецептов без событий строки не переписывались
+    assert after[second.pk] == before[second.pk]
+    assert after[idle.pk] == before[idle.pk]
+
+    incremental = {pk: score for pk, (score, _at) in after.items()}
+    refresh_rankings(full=True, now=later)
+    full = {pk: score for pk, (score, _at) in _scores(recipes).items()}
+    # значения отличаются на общий множитель 2^(возраст epoch / период)
+    scale = 1 / decay((later - start).total_seconds())
+    assert incremental == pytest.approx(
+        {pk: score * scale for pk, score in full.items()}
+    )
+
+
+def test_renormalizes_to_new_epoch(make_user, recipes, start):
+    user = make_user("fan")
+    _event(Favorite, user, recipes[0], start - timedelta(hours=1))
+    _event(Favorite, user, recipes[1], start - timedelta(hours=3))
+    refresh_rankings(full=True, now=start)
+    before = _scores(recipes)
+
+    age = _half_life_seconds() * (RENORMALIZE_HALF_LIVES + 1)
+    later = start + timedelta(seconds=age)
+    stats = refresh_rankings(now=later)
+
+    assert stats["renormalized"] is True
+    assert RankingEpoch.objects.get().epoch == later
+    after = _scores(recipes)
+    for pk, (score, _at) in before.items():
+        assert after[pk][0] == pytest.approx(score * decay(age))
@@ -0,0 +1,61 @@
+# recipes/tests/test_recipe_cache.py
+
+"""
+Кеш тел рецептов: правка в одном воркере сбрасывает тело во всех.
+"""
+
+# Сторонние библиотеки
+import pytest
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.test import APIClient
+
+# Локальные импорты
+from recipes.models import Recipe
+from recipes.recipe_cache import RECIPE_VERSION_PREFIX
+
+
+@pytest.fixture
+def author_client(author):
+    client = APIClient()
+    client.force_authenticate(author)
+    return client
+
+
+def _name(client, recipe):
+    response = client.get(f"/api/recipes/{recipe.id}/")
+    assert response.status_code == 200
+    return response.data["name"]
+
+
+def test_edit_invalidates_cached_body(
+    author_client,
+    api_client,
+    make_recipe,
+    django_capture_on_commit_callbacks,
+):
+    recipe = make_recipe("Блины")
+    assert _name(api_client, recipe) == "Блины"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = author_client.patch(
+            f"/api/recipes/{recipe.id}/", {"name": "Оладьи"}, format="json"
+        )
+    assert response.status_code == 200
+
+    assert _name(api_client, recipe) == "Оладьи"
+
+
+def test_version_bumped_by_another_worker_is_seen(api_client, make_recipe):
+    recipe = make_recipe("Блины")
+    assert _name(api_client, recipe) == "Блины"
+    shared = caches[settings.SHARED_CACHE_ALIAS]
+    key = f"{RECIPE_VERSION_PREFIX}:{recipe.id}"
+    assert shared.get(key) is not None
+
+    # Другой воркер сохранил рецепт и сменил версию в общем кеше;
+    # тело со старым ключом осталось в LRU этого воркера
+    Recipe.objects.filter(pk=recipe.pk).update(name="Оладьи")
+    shared.set(key, "other-worker", None)
+
+    assert _name(api_client, recipe) == "Оладьи"
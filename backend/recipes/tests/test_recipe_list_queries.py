@@ -0,0 +1,103 @@
+# recipes/tests/test_recipe_list_queries.py
+
+"""
+Число SQL-запросов страницы GET /api/recipes/ не зависит от её размера.
+"""
+
+# Сторонние библиотеки
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Локальные импорты
+from recipes.management.commands.seed_benchmark import IMAGE_NAME
+from recipes.models import Favorite, Recipe, RecipeIngredient, ShoppingCart
+from users.models import Subscription
+
+RECIPES = 120
+PAGE_SIZES = (1, 6, 100)
+# COUNT(*), страница с Exists()-флагами, авторы, ингредиенты
+COLD_QUERIES = 4
+# тела рецептов из кеша: COUNT(*) и страница
+WARM_QUERIES = 2
+
+
+@pytest.fixture
+def recipes(author, make_user, viewer, ingredients):
+    other = make_user("other")
+    Recipe.objects.bulk_create(
+        Recipe(
+            author=(author, other)[number % 2],
+            name=f"Рецепт {number}",
+            text="Описание",
+            cooking_time=10,
+            image=IMAGE_NAME,
+        )
+        for number in range(RECIPES)
+    )
+    created = list(Recipe.objects.order_by("pk"))
+    RecipeIngredient.objects.bulk_create(
+        RecipeIngredient(
+            recipe=recipe,
+            ingredient=ingredients[(number + shift) % len(ingredients)],
+            amount=shift + 1,
+        )
+        for number, recipe in enumerate(created)
+        for shift in range(3)
+    )
+    Favorite.objects.bulk_create(
+        Favorite(user=viewer, recipe=recipe) for recipe in created[::2]
+    )
+    ShoppingCart.objects.bulk_create(
+        ShoppingCart(user=viewer, recipe=recipe) for recipe in created[::3]
+    )
+    Subscription.objects.create(user=viewer, author=author)
+    return created
+
+
+def _get_page(client, limit):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/api/recipes/", {"limit": limit})
+    assert response.status_code == 200, response.content
+    assert len(response.json()["results"]) == limit
+    return response.json()["results"], len(queries)
+
+
+@pytest.mark.parametrize("limit", PAGE_SIZES)
+def test_recipe_list_queries_without_cache(
+    settings, viewer_client, recipes, limit
+):
+    settings.RECIPE_CACHE_ENABLED = False
+    _results, queries = _get_page(viewer_client, limit)
+    assert queries == COLD_QUERIES
+
+
+@pytest.mark.parametrize("limit", PAGE_SIZES)
+def test_recipe_list_queries_with_cache(
+    settings, viewer_client, recipes, limit
+):
+    settings.RECIPE_CACHE_ENABLED = True
+    _results, cold = _get_page(viewer_client, limit)
+    _results, warm = _get_page(viewer_client, limit)
+    assert (cold, warm) == (COLD_QUERIES, WARM_QUERIES)
+
+
+@pytest.mark.parametrize("cache_enabled", (False, True))
+def test_recipe_list_viewer_flags(
+    settings, viewer_client, recipes, author, cache_enabled
+):
+    """
+    Флаги зрителя берутся из аннотаций и не смешиваются с кешем.
+    """
+    settings.RECIPE_CACHE_ENABLED = cache_enabled
+    favorited = set(Favorite.objects.values_list("recipe_id", flat=True))
+    in_cart = set(ShoppingCart.objects.values_list("recipe_id", flat=True))
+    for _request in range(2):
+        results, _queries = _get_page(viewer_client, 100)
+        for item in results:
+            assert item["is_favorited"] == (item["id"] in favorited)
+            assert item["is_in_shopping_cart"] == (item["id"] in in_cart)
+            assert item["author"]["is_subscribed"] == (
+                item["author"]["id"] == author.id
+            )
+            assert len(item["ingredients"]) == 3
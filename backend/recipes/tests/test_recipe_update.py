@@ -0,0 +1,123 @@
+# recipes/tests/test_recipe_update.py
+
+"""
+PATCH рецепта меняет состав по разнице: нетронутые строки
+RecipeIngredient сохраняют id и не переписываются.
+"""
+
+# Сторонние библиотеки
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+# Локальные импорты
+from recipes.models import RecipeIngredient
+
+TABLE = RecipeIngredient._meta.db_table
+
+
+@pytest.fixture
+def author_client(author):
+    client = APIClient()
+    client.force_authenticate(author)
+    return client
+
+
+@pytest.fixture
+def recipe(make_recipe):
+    return make_recipe(amounts={0: 100, 1: 50, 2: 200, 3: 2})
+
+
+def _rows(recipe):
+    """{ingredient_id: (id строки, количество)}."""
+    return {
+        ingredient_id: (pk, amount)
+        for pk, ingredient_id, amount in RecipeIngredient.objects.filter(
+            recipe=recipe
+        ).values_list("pk", "ingredient_id", "amount")
+    }
+
+
+def _patch(client, recipe, amounts):
+    """
+    PATCH состава {ingredient_id: количество}; возвращает
+    [(оператор, число)] изменений таблицы RecipeIngredient.
+    """
+    payload = {
+        "ingredients": [
+            {"id": ingredient_id, "amount": amount}
+            for ingredient_id, amount in amounts.items()
+        ]
+    }
+    with CaptureQueriesContext(connection) as queries:
+        response = client.patch(
+            f"/api/recipes/{recipe.id}/", payload, format="json"
+        )
+    assert response.status_code == 200, response.content
+    writes = [
+        query["sql"].split()[0].upper()
+        for query in queries.captured_queries
+        if TABLE in query["sql"]
+        and query["sql"].split()[0].upper() in ("INSERT", "UPDATE", "DELETE")
+    ]
+    return sorted(
+        (statement, writes.count(statement)) for statement in set(writes)
+    )
+
+
+@pytest.mark.django_db
+def test_changed_amount_updates_one_row(author_client, recipe, ingredients):
+    before = _rows(recipe)
+    amounts = {
+        ingredient_id: amount
+        for ingredient_id, (_pk, amount) in before.items()
+    }
+    amounts[ingredients[1].id] = 75
+
+    assert _patch(author_client, recipe, amounts) == [("UPDATE", 1)]
+    after = _rows(recipe)
+    assert {key: pk for key, (pk, _amount) in after.items()} == {
+        key: pk for key, (pk, _amount) in before.items()
+    }
+    assert after[ingredients[1].id][1] == 75
+    assert all(
+        after[key] == before[key] for key in before if key != ingredients[1].id
+    )
+
+
+@pytest.mark.django_db
+def test_added_and_removed_lines_keep_other_rows(
+    author_client, recipe, ingredients
+):
+    before = _rows(recipe)
+    amounts = {
+        ingredient_id: amount
+        for ingredient_id, (_pk, amount) in before.items()
+    }
+    del amounts[ingredients[3].id]
+    amounts[ingredients[4].id] = 1
+
+    assert _patch(author_client, recipe, amounts) == [
+        ("DELETE", 1),
+        ("INSERT", 1),
+    ]
+    after = _rows(recipe)
+    kept = set(before) - {ingredients[3].id}
+    assert {key: after[key] for key in kept} == {
+        key: before[key] for key in kept
+    }
+    assert ingredients[3].id not in after
+    assert after[ingredients[4].id][1] == 1
+
+
+@pytest.mark.django_db
+def test_unchanged_ingredients_are_not_written(author_client, recipe):
+    before = _rows(recipe)
+    amounts = {
+        ingredient_id: amount
+        for ingredient_id, (_pk, amount) in before.items()
+    }
+
+    assert _patch(author_client, recipe, amounts) == []
+    assert _rows(recipe) == before
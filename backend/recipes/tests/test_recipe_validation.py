@@ -0,0 +1,111 @@
+# recipes/tests/test_recipe_validation.py
+
+"""
+Проверка состава рецепта: неизвестные и повторные id ингредиентов
+отклоняются, существование проверяется одним запросом.
+"""
+
+# Сторонние библиотеки
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+# Локальные импорты
+from recipes.models import Ingredient, RecipeIngredient
+
+
+@pytest.fixture
+def author_client(author):
+    client = APIClient()
+    client.force_authenticate(author)
+    return client
+
+
+@pytest.fixture
+def recipe(make_recipe):
+    return make_recipe(amounts={0: 100, 1: 50})
+
+
+def _composition(recipe):
+    return set(
+        RecipeIngredient.objects.filter(recipe=recipe).values_list(
+            "ingredient_id", "amount"
+        )
+    )
+
+
+def _patch(client, recipe, ingredients):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.patch(
+            f"/api/recipes/{recipe.id}/",
+            {"ingredients": ingredients},
+            format="json",
+        )
+    return response, queries
+
+
+@pytest.mark.parametrize(
+    "build, message",
+    [
+        (lambda ids, unknown: [{"id": unknown, "amount": 1}], "не существуют"),
+        (
+            lambda ids, unknown: [
+                {"id": ids[0], "amount": 1},
+                {"id": unknown + 1, "amount": 1},
+                {"id": unknown, "amount": 1},
+            ],
+            "не существуют",
+        ),
+        (
+            lambda ids, unknown: [
+                {"id": ids[2], "amount": 1},
+                {"id": ids[2], "amount": 5},
+            ],
+            "несколько раз",
+        ),
+        (lambda ids, unknown: [{"id": ids[2], "amount": 0}], "amount"),
+        (lambda ids, unknown: [], "ingredients"),
+    ],
+)
+def test_invalid_ingredients_are_rejected(
+    author_client, recipe, ingredients, build, message
+):
+    before = _composition(recipe)
+    ids = [ingredient.id for ingredient in ingredients]
+    unknown = max(ids) + 100
+
+    response, _queries = _patch(author_client, recipe, build(ids, unknown))
+
+    assert response.status_code == 400
+    assert message in str(response.json())
+    assert _composition(recipe) == before
+
+
+def test_unknown_ids_are_listed_in_order(author_client, recipe, ingredients):
+    unknown = max(ingredient.id for ingredient in ingredients) + 100
+    response, _queries = _patch(
+        author_client,
+        recipe,
+        [{"id": unknown + 1, "amount": 1}, {"id": unknown, "amount": 1}],
+    )
+
+    assert f"{unknown}, {unknown + 1}" in str(response.json())
+
+
+def test_existence_is_checked_in_one_query(author_client, recipe, ingredients):
+    response, queries = _patch(
+        author_client,
+        recipe,
+        [{"id": ingredient.id, "amount": 1} for ingredient in ingredients],
+    )
+
+    assert response.status_code == 200, response.content
+    table = Ingredient._meta.db_table
+    checks = [
+        query
+        for query in queries.captured_queries
+        if query["sql"].startswith("SELECT")
+        and f'FROM "{table}"' in query["sql"]
+    ]
+    assert len(checks) == 1
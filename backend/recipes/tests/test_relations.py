@@ -0,0 +1,82 @@
+# recipes/tests/test_relations.py
+
+"""
+Массовое добавление в избранное и корзину и удаление оттуда.
+"""
+
+# Сторонние библиотеки
+import pytest
+
+# Локальные импорты
+from recipes.models import Favorite, Recipe, ShoppingCart
+from recipes.shopping_totals import diverged_users
+
+RECIPES = 5
+URLS = {
+    Favorite: "/api/recipes/favorite/bulk/",
+    ShoppingCart: "/api/recipes/shopping_cart/bulk/",
+}
+
+
+@pytest.fixture
+def recipes(make_recipe):
+    return [make_recipe(name=f"Рецепт {number}") for number in range(RECIPES)]
+
+
+def _send(client, method, model, recipe_ids):
+    response = getattr(client, method)(
+        URLS[model], {"recipes": recipe_ids}, format="json"
+    )
+    assert response.status_code == 200, response.content
+    return [
+        (item["id"], item["status"]) for item in response.json()["results"]
+    ]
+
+
+def _counters(model, recipes):
+    field = {Favorite: "favorites_count", ShoppingCart: "cart_count"}[model]
+    return list(
+        Recipe.objects.filter(pk__in=[recipe.pk for recipe in recipes])
+        .order_by("pk")
+        .values_list(field, flat=True)
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("materialized", (False, True))
+@pytest.mark.parametrize("model", (Favorite, ShoppingCart))
+def test_bulk_add_and_remove(
+    settings, viewer_client, viewer, recipes, model, materialized
+):
+    settings.SHOPPING_LIST_MATERIALIZED = materialized
+    ids = [recipe.pk for recipe in recipes]
+    missing = max(ids) + 1
+
+    assert _send(viewer_client, "post", model, ids[:2]) == [
+        (ids[0], "added"),
+        (ids[1], "added"),
+    ]
+    assert _send(viewer_client, "post", model, [ids[1], ids[2], missing]) == [
+        (ids[1], "already_added"),
+        (ids[2], "added"),
+        (missing, "not_found"),
+    ]
+    assert _counters(model, recipes) == [1, 1, 1, 0, 0]
+    if materialized:
+        assert diverged_users([viewer.pk]) == []
+
+    # удаление нескольких связей укладывается в тот же бюджет, что и одной
+    assert _send(
+        viewer_client, "delete", model, [ids[0], ids[2], ids[3], missing]
+    ) == [
+        (ids[0], "removed"),
+        (ids[2], "removed"),
+        (ids[3], "not_added"),
+        (missing, "not_found"),
+    ]
+    assert list(
+        model.objects.filter(user=viewer).values_list("recipe_id", flat=True)
+    ) == [ids[1]]
+    assert _counters(model, recipes) == [0, 1, 0, 0, 0]
+    if materialized:
+        assert diverged_users([viewer.pk]) == []
@@ -0,0 +1,33 @@
+# recipes/tests/test_search.py
+
+"""
+Пересчёт поискового индекса рецептов.
+"""
+
+# Сторонние библиотеки
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Локальные импорты
+from recipes.models import Recipe, RecipeIngredient
+from recipes.search import refresh_search_index
+
+
+def test_refresh_search_index_updates_batch_in_one_statement(make_recipe):
+    first = make_recipe("Блины", {0: 100, 2: 300})
+    second = make_recipe("Безе", {1: 50, 3: 2})
+    empty = make_recipe("Вода")
+    RecipeIngredient.objects.filter(recipe=empty).delete()
+    Recipe.objects.update(ingredient_names="старое")
+
+    with CaptureQueriesContext(connection) as queries:
+        refresh_search_index([first.pk, second.pk, empty.pk])
+
+    # названия ингредиентов и один UPDATE на все рецепты
+    assert len(queries) == 2
+    names = dict(Recipe.objects.values_list("pk", "ingredient_names"))
+    assert names == {
+        first.pk: "молоко мука",
+        second.pk: "сахар яйца",
+        empty.pk: "",
+    }
@@ -0,0 +1,109 @@
+# recipes/tests/test_shopping_list_units.py
+
+"""
+Список покупок складывает кг с г и л с мл в одну строку
+в канонической единице.
+"""
+
+# Сторонние библиотеки
+import pytest
+
+# Локальные импорты
+from recipes.management.commands.seed_benchmark import IMAGE_NAME
+from recipes.models import Ingredient, Recipe, RecipeIngredient, ShoppingCart
+from recipes.shopping_list import aggregate_cart
+from recipes.units import canonical_amount, canonical_unit
+
+
+@pytest.fixture(params=(False, True), ids=("aggregate", "materialized"))
+def materialized(request, settings):
+    settings.SHOPPING_LIST_MATERIALIZED = request.param
+
+
+@pytest.fixture
+def cart(materialized, author, viewer):
+    """
+    Два рецепта с сахаром в г и кг, молоком в мл и л и мукой
+    в стаканах, которые пересчитать нельзя.
+    """
+    units = {
+        ("сахар", "г"): 250,
+        ("сахар", "кг"): 2,
+        ("молоко", "мл"): 300,
+        ("молоко", "л"): 1,
+        ("мука", "стакан"): 3,
+    }
+    for number in range(2):
+        recipe = Recipe.objects.create(
+            author=author,
+            name=f"Рецепт {number}",
+            text="Описание",
+            cooking_time=10,
+            image=IMAGE_NAME,
+        )
+        for (name, unit), amount in units.items():
+            ingredient, _created = Ingredient.objects.get_or_create(
+                name=name, measurement_unit=unit
+            )
+            RecipeIngredient.objects.create(
+                recipe=recipe, ingredient=ingredient, amount=amount
+            )
+        ShoppingCart.objects.create(user=viewer, recipe=recipe)
+    return viewer
+
+
+def _rows(user):
+    return [
+        (row["name"], row["unit"], row["total"])
+        for row in aggregate_cart(user)
+    ]
+
+
+def test_units_are_merged(settings, cart):
+    settings.SHOPPING_LIST_NORMALIZE_UNITS = True
+
+    assert _rows(cart) == [
+        ("молоко", "мл", 2 * (300 + 1000)),
+        ("мука", "стакан", 6),
+        ("сахар", "г", 2 * (250 + 2000)),
+    ]
+
+
+def test_units_are_kept_without_normalization(settings, cart):
+    settings.SHOPPING_LIST_NORMALIZE_UNITS = False
+
+    assert _rows(cart) == [
+        ("молоко", "л", 2),
+        ("молоко", "мл", 600),
+        ("мука", "стакан", 6),
+        ("сахар", "г", 500),
+        ("сахар", "кг", 4),
+    ]
+
+
+def test_download_reports_merged_units(settings, viewer_client, cart):
+    settings.SHOPPING_LIST_NORMALIZE_UNITS = True
+
+    response = viewer_client.get(
+        "/api/recipes/download_shopping_cart/", {"format": "json"}
+    )
+
+    assert response.status_code == 200
+    body = b"".join(response.streaming_content).decode()
+    assert '"measurement_unit": "г", "amount": 4500' in body
+    assert '"measurement_unit": "мл", "amount": 2600' in body
+
+
+@pytest.mark.parametrize(
+    "unit, canonical, factor",
+    [("кг.", "г", 1000), ("л", "мл", 1000), ("ст. л.", "ч. л.", 3)],
+)
+def test_conversion_expressions(db, unit, canonical, factor):
+    ingredient = Ingredient.objects.create(name="x", measurement_unit=unit)
+
+    row = Ingredient.objects.filter(pk=ingredient.pk).values(
+        unit=canonical_unit("measurement_unit"),
+        amount=canonical_amount("id", "measurement_unit"),
+    )[0]
+
+    assert row == {"unit": canonical, "amount": ingredient.pk * factor}
@@ -0,0 +1,132 @@
+# recipes/tests/test_shopping_totals.py
+
+"""
+Материализованный список покупок при изменении состава рецепта
+правится на разницу, без пересборки из корзин.
+"""
+
+# Сторонние библиотеки
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+# Локальные импорты
+from recipes.models import RecipeIngredient, ShoppingCart, ShoppingListItem
+from recipes.shopping_totals import diverged_users
+
+USERS = 4
+
+
+@pytest.fixture(autouse=True)
+def materialized(settings):
+    settings.SHOPPING_LIST_MATERIALIZED = True
+
+
+@pytest.fixture
+def author_client(author):
+    client = APIClient()
+    client.force_authenticate(author)
+    return client
+
+
+@pytest.fixture
+def buyers(make_user):
+    return [make_user(f"buyer{number}") for number in range(USERS)]
+
+
+@pytest.fixture
+def recipe(make_recipe, buyers):
+    """
+    Рецепт в корзинах всех покупателей; у первого ещё один рецепт
+    с той же мукой.
+    """
+    recipe = make_recipe("Блины", {0: 100, 1: 50, 2: 300})
+    other = make_recipe("Хлеб", {0: 500})
+    for buyer in buyers:
+        ShoppingCart.objects.create(user=buyer, recipe=recipe)
+    ShoppingCart.objects.create(user=buyers[0], recipe=other)
+    return recipe
+
+
+def _items(buyers):
+    return {
+        (user_id, ingredient_id): (pk, amount)
+        for pk, user_id, ingredient_id, amount in (
+            ShoppingListItem.objects.filter(user__in=buyers).values_list(
+                "pk", "user_id", "ingredient_id", "amount"
+            )
+        )
+    }
+
+
+def _patch(client, recipe, amounts):
+    payload = {
+        "ingredients": [
+            {"id": ingredient.id, "amount": amount}
+            for ingredient, amount in amounts
+        ]
+    }
+    with CaptureQueriesContext(connection) as queries:
+        response = client.patch(
+            f"/api/recipes/{recipe.id}/", payload, format="json"
+        )
+    assert response.status_code == 200, response.content
+    return [
+        query["sql"]
+        for query in queries.captured_queries
+        if ShoppingListItem._meta.db_table in query["sql"]
+    ]
+
+
+def test_patch_applies_deltas(author_client, recipe, buyers, ingredients):
+    flour, sugar, milk, eggs = ingredients[:4]
+    before = _items(buyers)
+
+    # мука меньше, сахар убран, молоко не тронуто, яйца добавлены
+    statements = _patch(
+        author_client, recipe, [(flour, 40), (milk, 300), (eggs, 2)]
+    )
+
+    assert diverged_users(buyers) == []
+    after = _items(buyers)
+    first = buyers[0].pk
+    assert after[(first, flour.id)] == (before[(first, flour.id)][0], 540)
+    assert (first, sugar.id) not in after
+    # нетронутые строки не переписываются
+    assert after[(first, milk.id)] == before[(first, milk.id)]
+    assert after[(first, eggs.id)][1] == 2
+    # DELETE, выборка, UPDATE и INSERT на всех покупателей сразу
+    assert len(statements) == 4
+
+
+def test_row_edits_apply_deltas(recipe, buyers, ingredients):
+    flour, sugar, milk, eggs = ingredients[:4]
+    rows = {
+        row.ingredient_id: row
+        for row in RecipeIngredient.objects.filter(recipe=recipe)
+    }
+
+    rows[flour.id].amount = 150
+    rows[flour.id].save()
+    assert diverged_users(buyers) == []
+
+    rows[sugar.id].ingredient = eggs
+    rows[sugar.id].save()
+    assert diverged_users(buyers) == []
+
+    rows[milk.id].delete()
+    assert diverged_users(buyers) == []
+
+    RecipeIngredient.objects.create(recipe=recipe, ingredient=milk, amount=5)
+    assert diverged_users(buyers) == []
+
+
+def test_recipe_delete_subtracts_once(recipe, buyers, ingredients):
+    recipe.delete()
+
+    assert diverged_users(buyers) == []
+    # остался только хлеб первого покупателя
+    assert {
+        key: amount for key, (_pk, amount) in _items(buyers).items()
+    } == {(buyers[0].pk, ingredients[0].id): 500}
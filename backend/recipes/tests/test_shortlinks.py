@@ -0,0 +1,69 @@
+# recipes/tests/test_shortlinks.py
+
+"""
+Короткие ссылки: создание, повторное использование и переход.
+"""
+
+# Сторонние библиотеки
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Локальные импорты
+from recipes.models import ShortLink
+from recipes.shortlinks import encode_id
+
+
+@pytest.fixture
+def recipe(make_recipe):
+    return make_recipe()
+
+
+def _short_link(client, recipe):
+    response = client.get(f"/api/recipes/{recipe.id}/get-link/")
+    assert response.status_code == 200
+    return response.json()["short-link"]
+
+
+@pytest.mark.parametrize(
+    "value, code", [(0, "0"), (61, "Z"), (62, "10"), (3843, "ZZ")]
+)
+def test_encode_id(value, code):
+    assert encode_id(value) == code
+
+
+def test_get_link_is_reused(settings, api_client, recipe):
+    settings.BASE_URL = "https://foodgram.example"
+
+    first = _short_link(api_client, recipe)
+    second = _short_link(api_client, recipe)
+
+    assert first == second == (
+        f"https://foodgram.example/short/{encode_id(recipe.id)}"
+    )
+    assert ShortLink.objects.filter(recipe=recipe).count() == 1
+
+
+def test_redirect_resolves_from_cache(settings, api_client, recipe):
+    settings.BASE_URL = ""
+    path = _short_link(api_client, recipe).removeprefix("http://testserver")
+
+    response = api_client.get(path)
+    assert response.status_code == 302
+    assert response["Location"] == f"/recipes/{recipe.id}"
+
+    # повторный переход не ходит в БД
+    with CaptureQueriesContext(connection) as queries:
+        again = api_client.get(path)
+    assert again["Location"] == f"/recipes/{recipe.id}"
+    assert len(queries) == 0
+
+
+def test_unknown_and_deleted_codes(api_client, recipe):
+    assert api_client.get("/short/zzzz").status_code == 404
+
+    path = f"/short/{encode_id(recipe.id)}"
+    _short_link(api_client, recipe)
+    assert api_client.get(path).status_code == 302
+    recipe.delete()
+    assert api_client.get(path).status_code == 404
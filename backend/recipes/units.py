@@ -0,0 +1,85 @@
+# recipes/units.py
+
+"""
+Приведение единиц измерения к каноническим для списка покупок.
+
+UNIT_CONVERSIONS: единица → (каноническая единица, множитель). Множители
+целые: количества в рецептах целые, и сумма остаётся точной. Единицы,
+которые нельзя пересчитать без плотности или размера (стакан, щепотка,
+банка), остаются как есть.
+
+Пересчёт выполняется выражениями CASE в самом агрегирующем запросе,
+поэтому «сахар (г)» и «сахар (кг)» складываются в одну строку в граммах
+без дополнительной обработки строк в Python.
+"""
+
+# Стандартная библиотека
+from collections import defaultdict
+
+# Сторонние библиотеки
+from django.db.models import (Case, CharField, F, PositiveBigIntegerField,
+                              Value, When)
+
+UNIT_CONVERSIONS = {
+    # масса
+    "г": ("г", 1),
+    "гр": ("г", 1),
+    "гр.": ("г", 1),
+    "кг": ("г", 1000),
+    "кг.": ("г", 1000),
+    # объём
+    "мл": ("мл", 1),
+    "мл.": ("мл", 1),
+    "л": ("мл", 1000),
+    "л.": ("мл", 1000),
+    # ложки
+    "ч. л.": ("ч. л.", 1),
+    "ч.л.": ("ч. л.", 1),
+    "дес. л.": ("ч. л.", 2),
+    "ст. л.": ("ч. л.", 3),
+    "ст.л.": ("ч. л.", 3),
+    # штуки
+    "шт": ("шт.", 1),
+    "шт.": ("шт.", 1),
+}
+
+
+def _grouped(key):
+    """
+    {значение: [единицы]} для единиц, которые нужно пересчитать:
+    один WHEN ... IN (...) на значение вместо WHEN на каждую единицу.
+    """
+    groups = defaultdict(list)
+    for unit, conversion in UNIT_CONVERSIONS.items():
+        canonical, factor = conversion
+        if (canonical, factor) != (unit, 1):
+            groups[key(conversion)].append(unit)
+    return groups
+
+
+def canonical_unit(unit_field):
+    """
+    Каноническая единица для колонки unit_field; прочие — как есть.
+    """
+    whens = [
+        When(**{f"{unit_field}__in": units}, then=Value(canonical))
+        for canonical, units in _grouped(
+            lambda conversion: conversion[0]
+        ).items()
+    ]
+    return Case(*whens, default=F(unit_field), output_field=CharField())
+
+
+def canonical_amount(amount_field, unit_field):
+    """
+    Количество amount_field в канонической единице.
+    """
+    whens = [
+        When(**{f"{unit_field}__in": units}, then=Value(factor))
+        for factor, units in _grouped(lambda conversion: conversion[1]).items()
+        if factor != 1
+    ]
+    factor = Case(
+        *whens, default=Value(1), output_field=PositiveBigIntegerField()
+    )
+    return F(amount_field) * factor
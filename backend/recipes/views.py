@@ -1,35 +1,60 @@
 # local
 from http import HTTPStatus
-# Standart library
-from io import BytesIO
 
+from api.metrics import InstrumentedViewSetMixin
+from constants import AUTOCOMPLETE_LIMIT, AUTOCOMPLETE_MAX_LIMIT
 from django.conf import settings
 # thirdy party
-from django.db.models import Sum
-from django.http import FileResponse
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Value
+from django.http import (Http404, HttpResponse, HttpResponseRedirect,
+                         StreamingHttpResponse)
 from django.shortcuts import get_object_or_404
-from django.utils.crypto import get_random_string
 from django_filters.rest_framework import DjangoFilterBackend
 # thirdy party
 from rest_framework import viewsets
 from rest_framework.decorators import action
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
+from users.models import Subscription
 
+from .catalogue import autocomplete
+from .cook_index import cook_index
+from .etags import catalogue_etag, not_modified, recipe_etag, set_etag
 from .filters import IngredientFilter
-from .models import Favorite, Ingredient, Recipe, ShoppingCart
+from .models import Favorite, Ingredient, Recipe, ShoppingCart, ShortLink
 from .paginations import RecipePagination
+from .recipe_cache import recipe_cache
+from .renderers import CSVRenderer, PDFRenderer, PlainTextRenderer
+from .relations import add_relations, remove_relations
+from .search import search_recipes
 from .serializers.ingredient import IngredientSerializer
 from .serializers.other_serializers import (FavoriteSerializer,
+                                            RecipeIdsSerializer,
                                             ShoppingCartSerializer)
 from .serializers.recipe_read import RecipeReadSerializer
 from .serializers.recipe_write import RecipeWriteSerializer
+from .shopping_list import (STREAM_FORMATS, PoolSaturated, aggregate_cart,
+                            request_pdf)
+from .shortlinks import code_for, resolve_code
 
 
 # ---------- views.py · фрагмент 2 ----------
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(InstrumentedViewSetMixin, viewsets.ModelViewSet):
     # поля класса RecipeViewSet
     queryset = Recipe.objects.all()
+    # не больше SQL-запросов на действие (см. api/metrics.py)
+    query_budgets = {
+        "list": 6,
+        "retrieve": 5,
+        "download_shopping_cart": 3,
+        "what_can_i_cook": 5,
+        "favorite_bulk": 7,
+        # +4 при SHOPPING_LIST_MATERIALIZED (recipes/shopping_totals.py)
+        "shopping_cart_bulk": 11,
+    }
     pagination_class = RecipePagination
     serializer_class = RecipeReadSerializer
     filterset_fields = ["author"]
@@ -116,10 +141,26 @@ class RecipeViewSet(viewsets.ModelViewSet):
         # сохраняем стандартную логику DRF
         return super().destroy(request, *args, **kwargs)
 
+    def retrieve(self, request, *args, **kwargs):
+        """
+        GET /recipes/{id}/ с поддержкой If-None-Match.
+
+        ETag считается по updated_at рецепта и персональным флагам
+        из аннотаций, поэтому 304 отдаётся без сериализации.
+        """
+        recipe = self.get_object()
+        etag = recipe_etag(recipe, request.user)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+        serializer = self.get_serializer(recipe)
+        return set_etag(Response(serializer.data), etag, private=True)
+
     def get_queryset(self):
         """
         Возвращает QuerySet рецептов с учётом фильтров
-        ?is_in_shopping_cart и ?is_favorited.
+        ?is_in_shopping_cart и ?is_favorited, поиска ?search=
+        и сортировки ?ordering=.
 
         Алгоритм:
         1. Берём базовый QuerySet у родительского класса.
@@ -127,7 +168,10 @@ class RecipeViewSet(viewsets.ModelViewSet):
            • ?is_in_shopping_cart=1/0 — в/исключаем рецепты из корзины;
            • ?is_favorited=1/0        — в/исключаем рецепты из избранного.
         """
-        base_qs = super().get_queryset()
+        # Поисковые поля большие и в ответ не входят
+        base_qs = self._annotate_for_user(
+            super().get_queryset().defer(*Recipe.SEARCH_FIELDS)
+        )
         current_user = self.request.user
 
         # --- Корзина ------------------------------------------------------
@@ -146,16 +190,161 @@ class RecipeViewSet(viewsets.ModelViewSet):
                 base_qs.filter(**pred) if fav_flag == "1" else base_qs.exclude(**pred)
             )
 
-        return base_qs
+        # --- Поиск --------------------------------------------------------
+        term = self.request.query_params.get("search", "").strip()
+        if term:
+            base_qs = search_recipes(base_qs, term).order_by(
+                "-search_rank", "-id"
+            )
+            self.cursor_field = "search_rank"
+
+        # --- Сортировка ---------------------------------------------------
+        return self._apply_ordering(base_qs)
+
+    def _apply_ordering(self, queryset):
+        """
+        ?ordering=popular  — по числу добавлений в избранное
+                             (счётчик Recipe.favorites_count);
+        ?ordering=trending — по предрасчитанному рейтингу трендов
+                             (RecipeRanking, см. recipes/ranking.py).
+
+        Оба варианта читаются по индексу и работают с обеими пагинациями:
+        cursor_field сообщает RecipePagination поле keyset-курсора.
+        """
+        ordering = self.request.query_params.get("ordering")
+        if not ordering:
+            return queryset
+        if ordering == "popular":
+            self.cursor_field = "favorites_count"
+            return queryset.order_by("-favorites_count", "-id")
+        if ordering == "trending":
+            self.cursor_field = "trending_score"
+            # INNER JOIN: план может идти по индексу ranking_trending_idx
+            return (
+                queryset.filter(ranking__isnull=False)
+                .annotate(trending_score=F("ranking__trending_score"))
+                .order_by("-trending_score", "-id")
+            )
+        raise ValidationError(
+            {"ordering": "Допустимые значения: popular, trending."}
+        )
+
+    def _annotate_for_user(self, queryset):
+        """
+        Аннотирует рецепты персональными флагами зрителя.
+
+        • is_favorited / is_in_shopping_cart / author_is_subscribed —
+          подзапросы Exists() в том же запросе, что и страница;
+        • автора и ингредиенты сериализатор подгружает пакетно
+          только для рецептов, которых нет в кеше (см. recipe_cache).
+        """
+        current_user = self.request.user
+        if not current_user.is_authenticated:
+            return queryset.annotate(
+                is_favorited=Value(False),
+                is_in_shopping_cart=Value(False),
+                author_is_subscribed=Value(False),
+            )
+        return queryset.annotate(
+            is_favorited=Exists(
+                Favorite.objects.filter(
+                    user=current_user, recipe=OuterRef("pk")
+                )
+            ),
+            is_in_shopping_cart=Exists(
+                ShoppingCart.objects.filter(
+                    user=current_user, recipe=OuterRef("pk")
+                )
+            ),
+            author_is_subscribed=Exists(
+                Subscription.objects.filter(
+                    user=current_user, author=OuterRef("author_id")
+                )
+            ),
+        )
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="cache_stats",
+        permission_classes=[IsAdminUser],
+    )
+    def cache_stats(self, request):
+        """
+        Счётчики попаданий и промахов кеша рецептов в этом воркере.
+        """
+        return Response(recipe_cache.stats(), status=HTTPStatus.OK)
+
+    @action(detail=False, methods=["get"], url_path="what_can_i_cook")
+    def what_can_i_cook(self, request):
+        """
+        GET ?ingredients=1,2,3[&max_missing=n] → рецепты по имеющимся
+        продуктам.
+
+        Сначала рецепты, для которых есть все ингредиенты, затем с наименьшим
+        числом недостающих (поле missing_ingredients). Подбор идёт по
+        обратному индексу в памяти воркера (см. recipes/cook_index.py).
+        """
+        ingredient_ids = self._ingredient_ids(request)
+        max_missing = request.query_params.get("max_missing")
+        if max_missing is not None:
+            try:
+                max_missing = max(int(max_missing), 0)
+            except ValueError:
+                raise ValidationError(
+                    {"max_missing": "Ожидается целое число."}
+                )
+
+        ranked = cook_index.rank(ingredient_ids, max_missing=max_missing)
+        page = self.paginate_queryset(ranked)
+        missing = dict(page)
+        recipes = self._annotate_for_user(
+            Recipe.objects.filter(pk__in=missing).defer(*Recipe.SEARCH_FIELDS)
+        ).in_bulk()
+        # Рецепт мог быть удалён после последней синхронизации индекса
+        ordered = [recipes[pk] for pk, _missing in page if pk in recipes]
+        data = self.get_serializer(ordered, many=True).data
+        for item in data:
+            item["missing_ingredients"] = missing[item["id"]]
+        return self.get_paginated_response(data)
+
+    @staticmethod
+    def _ingredient_ids(request):
+        """
+        id ингредиентов из ?ingredients=1,2 или ?ingredients=1&ingredients=2.
+        """
+        raw = ",".join(request.query_params.getlist("ingredients"))
+        try:
+            ids = {int(part) for part in raw.split(",") if part.strip()}
+        except ValueError:
+            raise ValidationError(
+                {"ingredients": "Ожидаются id ингредиентов."}
+            )
+        if not ids:
+            raise ValidationError(
+                {"ingredients": "Укажите хотя бы один ингредиент."}
+            )
+        if len(ids) > settings.COOK_INDEX_MAX_INGREDIENTS:
+            raise ValidationError(
+                {
+                    "ingredients": "Не больше "
+                    f"{settings.COOK_INDEX_MAX_INGREDIENTS} ингредиентов."
+                }
+            )
+        return ids
 
     @action(detail=True, methods=["get"], url_path="get-link")
     def get_link(self, request, pk=None):
         """
-        Генерирует короткую ссылку вида
-        https://<BASE>/short/<code> и возвращает её клиенту.
+        Возвращает постоянную короткую ссылку вида
+        https://<BASE>/short/<code>; для рецепта она всегда одна.
         """
-        code = get_random_string(6)  # псевдослучайный токен
-        short_url = f"{settings.BASE_URL}/short/{code}"
+        recipe = get_object_or_404(Recipe.objects.only("id"), pk=pk)
+        path = f"/short/{code_for(recipe)}"
+        if settings.BASE_URL:
+            short_url = f"{settings.BASE_URL}{path}"
+        else:
+            short_url = request.build_absolute_uri(path)
         return Response({"short-link": short_url}, status=HTTPStatus.OK)
 
     # ────────────────────────────────────────────────────
@@ -167,6 +356,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
         url_path="favorite",
         permission_classes=[IsAuthenticated],
     )
+    @transaction.atomic
     def favorite(self, request, pk=None):
         """
         POST  → добавить рецепт в «избранное».
@@ -207,6 +397,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
         url_path="shopping_cart",
         permission_classes=[IsAuthenticated],
     )
+    @transaction.atomic
     def shopping_cart(self, request, pk=None):
         """
         POST  → добавить рецепт в корзину.
@@ -235,14 +426,86 @@ class RecipeViewSet(viewsets.ModelViewSet):
             status=HTTPStatus.BAD_REQUEST,
         )
 
+    # ────────────────────────────────────────────────────
+    #        Массовые операции с избранным и корзиной
+    # ────────────────────────────────────────────────────
+    @action(
+        detail=False,
+        methods=["post", "delete"],
+        url_path="favorite/bulk",
+        permission_classes=[IsAuthenticated],
+    )
+    @transaction.atomic
+    def favorite_bulk(self, request):
+        """
+        POST / DELETE {"recipes": [id, ...]} → добавить в избранное
+        или убрать оттуда сразу несколько рецептов.
+        """
+        return self._bulk_relations(request, Favorite, FavoriteSerializer)
+
+    @action(
+        detail=False,
+        methods=["post", "delete"],
+        url_path="shopping_cart/bulk",
+        permission_classes=[IsAuthenticated],
+    )
+    @transaction.atomic
+    def shopping_cart_bulk(self, request):
+        """
+        POST / DELETE {"recipes": [id, ...]} → добавить в корзину
+        или убрать из неё сразу несколько рецептов.
+        """
+        return self._bulk_relations(
+            request, ShoppingCart, ShoppingCartSerializer
+        )
+
+    def _bulk_relations(self, request, model, serializer_class):
+        """
+        Общая часть favorite_bulk и shopping_cart_bulk.
+
+        Всегда 200 с результатом по каждому id в порядке запроса:
+        {"results": [{"id", "status"[, "recipe"]}]}. Статусы — added,
+        already_added, removed, not_added, not_found (recipes/relations.py);
+        при добавлении recipe такой же, как в ответе favorite/shopping_cart.
+        """
+        ids = RecipeIdsSerializer(data=request.data)
+        ids.is_valid(raise_exception=True)
+        recipe_ids = list(dict.fromkeys(ids.validated_data["recipes"]))
+        if request.method == "POST":
+            results = add_relations(model, request.user, recipe_ids)
+        else:
+            results = remove_relations(model, request.user, recipe_ids)
+
+        link_serializer = serializer_class(context={"request": request})
+        data = []
+        for pk, status, link in results:
+            item = {"id": pk, "status": status}
+            if link is not None:
+                item["recipe"] = link_serializer.to_representation(link)
+            data.append(item)
+        return Response({"results": data}, status=HTTPStatus.OK)
+
     # ────────────────────────────────────────────────────
     #        📄  Скачивание списка покупок  📄
     # ────────────────────────────────────────────────────
-    @action(detail=False, methods=["get"], url_path="download_shopping_cart")
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="download_shopping_cart",
+        renderer_classes=[
+            PlainTextRenderer,
+            JSONRenderer,
+            CSVRenderer,
+            PDFRenderer,
+        ],
+    )
     def download_shopping_cart(self, request):
         """
-        GET → сформировать и отдать .txt-файл со сгруппированными
+        GET → сформировать и отдать файл со сгруппированными
         ингредиентами из корзины текущего пользователя.
+
+        ?format=txt (по умолчанию), csv, json — потоковая выдача;
+        ?format=pdf — рендеринг в пуле воркеров, см. _shopping_list_pdf.
         """
         current_user = request.user
         if not current_user.is_authenticated:
@@ -258,34 +521,61 @@ class RecipeViewSet(viewsets.ModelViewSet):
                 status=HTTPStatus.BAD_REQUEST,
             )
 
-        # Агрегируем количество каждого ингредиента по всем рецептам
-        combined = cart_items.values(
-            "recipe__ingredients__name",
-            "recipe__ingredients__measurement_unit",
-        ).annotate(total=Sum("recipe__recipeingredient__amount"))
-
-        lines = ["Список покупок:\n"]
-        for row in combined:
-            lines.append(
-                f"{row['recipe__ingredients__name']} "
-                f"({row['recipe__ingredients__measurement_unit']}) — "
-                f"{row['total']}"
+        export_format = request.query_params.get("format", "txt")
+        rows = aggregate_cart(current_user)
+        if export_format == "pdf":
+            return self._shopping_list_pdf(current_user, rows)
+
+        # Один сгруппированный запрос, строки отдаются клиенту по мере чтения
+        stream_format = STREAM_FORMATS[export_format]
+        response = StreamingHttpResponse(
+            stream_format.iter(rows), content_type=stream_format.content_type
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="ingredients.{export_format}"'
+        )
+        return response
+
+    def _shopping_list_pdf(self, user, rows):
+        """
+        Отдаёт PDF из кеша или из пула рендеринга.
+
+        • 200 — файл готов;
+        • 202 + Retry-After — файл рендерится, повторите запрос;
+        • 503 + Retry-After — пул занят, задача не принята.
+        """
+        retry_after = {
+            "Retry-After": str(settings.SHOPPING_LIST_PDF_RETRY_AFTER)
+        }
+        try:
+            pdf = request_pdf(user, rows)
+        except PoolSaturated:
+            return Response(
+                {"detail": "Сервер занят формированием PDF, повторите позже."},
+                status=HTTPStatus.SERVICE_UNAVAILABLE,
+                headers=retry_after,
             )
-        txt_content = "\n".join(lines)
-
-        # Заворачиваем текст в FileResponse
-        buffer = BytesIO(txt_content.encode("utf-8"))
-        return FileResponse(
-            buffer,
-            as_attachment=True,
-            filename="ingredients.txt",
-            content_type="text/plain; charset=utf-8",
+        if pdf is None:
+            return Response(
+                {"detail": "PDF формируется, повторите запрос позже."},
+                status=HTTPStatus.ACCEPTED,
+                headers=retry_after,
+            )
+
+        response = HttpResponse(pdf, content_type="application/pdf")
+        response["Content-Disposition"] = (
+            'attachment; filename="ingredients.pdf"'
         )
+        return response
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(
+    InstrumentedViewSetMixin, viewsets.ReadOnlyModelViewSet
+):
     """Эндпойнт «Ингредиенты» (только чтение, сортировка по имени)."""
 
+    query_budgets = {"list": 2, "retrieve": 2, "autocomplete": 2}
+
     # сериализация
     serializer_class = IngredientSerializer
 
@@ -298,3 +588,53 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
 
     # пагинация здесь не нужна
     pagination_class = None
+
+    def list(self, request, *args, **kwargs):
+        """
+        Список ингредиентов с ETag по версии каталога.
+        """
+        etag = catalogue_etag(request)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+        return set_etag(super().list(request, *args, **kwargs), etag)
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Карточка ингредиента с ETag по версии каталога.
+        """
+        etag = catalogue_etag(request)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+        return set_etag(super().retrieve(request, *args, **kwargs), etag)
+
+    @action(detail=False, methods=["get"], url_path="autocomplete")
+    def autocomplete(self, request):
+        """
+        GET ?name=<строка>&limit=<n> → подсказки для редактора рецепта.
+
+        Сначала ингредиенты, начинающиеся с name, затем содержащие name;
+        поиск идёт по индексу в памяти воркера (см. recipes/catalogue.py).
+        """
+        query = request.query_params.get("name", "").strip()
+        try:
+            limit = int(request.query_params.get("limit", AUTOCOMPLETE_LIMIT))
+        except ValueError:
+            limit = AUTOCOMPLETE_LIMIT
+        limit = min(max(limit, 1), AUTOCOMPLETE_MAX_LIMIT)
+
+        if not query:
+            return Response([], status=HTTPStatus.OK)
+        return Response(autocomplete(query, limit), status=HTTPStatus.OK)
+
+
+def short_link_redirect(request, code):
+    """
+    Переход по короткой ссылке на страницу рецепта во фронтенде.
+    """
+    try:
+        recipe_id = resolve_code(code)
+    except ShortLink.DoesNotExist:
+        raise Http404("Короткая ссылка не найдена.")
+    return HttpResponseRedirect(f"/recipes/{recipe_id}")
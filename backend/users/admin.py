@@ -10,7 +10,14 @@ class UserAdmin(_BaseUserAdmin):
     Админка модели User: отображает ключевые поля и поддерживает поиск.
     """
     # Колонки, отображаемые в списке пользователей
-    _cols = ("username", "email", "is_active", "is_staff")
+    _cols = (
+        "username",
+        "email",
+        "is_active",
+        "is_staff",
+        "recipes_count",
+        "subscribers_count",
+    )
     list_display = _cols
 
     # Поля для поиска
@@ -32,8 +39,10 @@ class UserAdmin(_BaseUserAdmin):
             )},
         ),
         ("Important dates", {"fields": ("last_login", "date_joined")}),
+        ("Counters", {"fields": ("recipes_count", "subscribers_count")}),
     )
     fieldsets = _fieldset_groups
+    readonly_fields = ("recipes_count", "subscribers_count")
 
     # Поля при создании нового пользователя в админке
     _add_groups = (
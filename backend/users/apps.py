@@ -10,4 +10,8 @@ class UsersConfig(_AppConfig):
     - name: ярлык приложения для регистрации в INSTALLED_APPS.
     """
     name = _APP_LABEL
-    default_auto_field = _DEFAULT_AUTO_FIELD
\ No newline at end of file
+    default_auto_field = _DEFAULT_AUTO_FIELD
+
+    def ready(self):
+        """Подключает обработчики сигналов моделей."""
+        from . import signals  # noqa: F401
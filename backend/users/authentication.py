@@ -0,0 +1,120 @@
+# users/authentication.py
+
+"""
+Аутентификация по токену с кешем «токен → пользователь».
+
+TokenAuthentication из DRF на каждый запрос выполняет
+Token.objects.select_related("user").get(key=...). Здесь результат
+хранится в кеше Django (алиас TOKEN_CACHE_ALIAS) не дольше
+TOKEN_CACHE_TIMEOUT секунд; ключ — SHA-256 токена, чтобы сам токен
+не попадал в имена ключей Redis.
+
+В кеш попадают только поля пользователя без хеша пароля и дата
+создания токена; из них собираются объекты как после запроса к БД,
+а password остаётся отложенным полем и читается из БД при обращении.
+По умолчанию кеш включён только с общим Redis: запись в LocMem
+сбрасывается лишь в том воркере, где пользователь вышел.
+
+Записи сбрасываются сигналами (см. users/signals.py): при удалении
+токена (выход, админка, удаление пользователя) и при любом сохранении
+пользователя — смене пароля, деактивации, правке профиля. Изменения
+в обход сигналов (QuerySet.update) видны не позже чем через
+TOKEN_CACHE_TIMEOUT.
+"""
+
+# Стандартная библиотека
+import hashlib
+
+# Сторонние библиотеки
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+TOKEN_PREFIX = "auth-token"
+# Поля пользователя, которые не кладутся в кеш
+UNCACHED_FIELDS = ("password",)
+
+
+def _backend():
+    return caches[settings.TOKEN_CACHE_ALIAS]
+
+
+def _cache_key(token_key):
+    digest = hashlib.sha256(token_key.encode("utf-8")).hexdigest()
+    return f"{TOKEN_PREFIX}:{digest}"
+
+
+def _cached_fields():
+    return [
+        field
+        for field in get_user_model()._meta.concrete_fields
+        if field.attname not in UNCACHED_FIELDS
+    ]
+
+
+def _dump(user, token):
+    """
+    Запись кеша: значения полей пользователя и дата создания токена.
+
+    get_prep_value превращает FieldFile аватара в имя файла: сам
+    FieldFile тянет за собой весь объект пользователя.
+    """
+    values = [
+        field.get_prep_value(field.value_from_object(user))
+        for field in _cached_fields()
+    ]
+    return values, token.created
+
+
+def _load(token_key, cached):
+    """
+    Пользователь и токен из записи _dump.
+    """
+    values, created = cached
+    user = get_user_model().from_db(
+        DEFAULT_DB_ALIAS, [field.attname for field in _cached_fields()], values
+    )
+    token = Token.from_db(
+        DEFAULT_DB_ALIAS,
+        ["key", "user_id", "created"],
+        [token_key, user.pk, created],
+    )
+    token.user = user
+    return user, token
+
+
+def forget_tokens(token_keys):
+    """
+    Сбрасывает закешированных пользователей для токенов token_keys.
+    """
+    _backend().delete_many([_cache_key(key) for key in token_keys])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication, который ходит в БД только при промахе кеша.
+    """
+
+    def authenticate_credentials(self, key):
+        if not settings.TOKEN_CACHE_ENABLED:
+            return super().authenticate_credentials(key)
+
+        cache_key = _cache_key(key)
+        cached = _backend().get(cache_key)
+        if cached is None:
+            user, token = super().authenticate_credentials(key)
+            _backend().set(
+                cache_key, _dump(user, token), settings.TOKEN_CACHE_TIMEOUT
+            )
+            return user, token
+
+        user, token = _load(key, cached)
+        # Деактивация сбрасывает запись, но проверка дешёвая — оставляем
+        if not user.is_active:
+            raise AuthenticationFailed(_("User inactive or deleted."))
+        return user, token
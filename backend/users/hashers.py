@@ -0,0 +1,122 @@
+# users/hashers.py
+
+"""
+Хешеры паролей с настраиваемой стоимостью и ограниченным пулом.
+
+PASSWORD_HASHER выбирает алгоритм новых хешей (pbkdf2, scrypt, argon2),
+стоимость задают PASSWORD_PBKDF2_ITERATIONS, PASSWORD_SCRYPT_* и
+PASSWORD_ARGON2_*. Имена алгоритмов совпадают со стандартными
+хешерами Django, поэтому существующие хеши остаются действительными.
+Хеш другого алгоритма или с прежней стоимостью пересчитывается при
+входе: User.check_password спрашивает must_update и сохраняет новый.
+
+Хеш вычисляется в пуле из PASSWORD_HASHING_WORKERS потоков: hashlib
+и argon2-cffi отпускают GIL, а всплеск входов и регистраций занимает
+не больше потоков воркера, чем отведено. Если слот не освободился за
+PASSWORD_HASHING_WAIT секунд — HashingPoolSaturated (503).
+"""
+
+# Стандартная библиотека
+import threading
+
+# Сторонние библиотеки
+from api.background import LazyExecutor, pool_executor
+from django.conf import settings
+from django.contrib.auth import hashers
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class HashingPoolSaturated(APIException):
+    """Все слоты пула хеширования паролей заняты."""
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Сервер занят проверкой паролей, повторите позже."
+    default_code = "hashing_pool_saturated"
+
+    def __init__(self, detail=None, code=None):
+        super().__init__(detail, code)
+        # exception_handler DRF превращает wait в заголовок Retry-After
+        self.wait = settings.PASSWORD_HASHING_RETRY_AFTER
+
+
+_local = threading.local()
+
+
+def _mark_pool_thread():
+    _local.in_pool = True
+
+
+# По слоту на поток пула
+_pool = LazyExecutor(
+    lambda: pool_executor(
+        "thread",
+        settings.PASSWORD_HASHING_WORKERS,
+        thread_name_prefix="password-hashing",
+        initializer=_mark_pool_thread,
+    ),
+    slots=lambda: settings.PASSWORD_HASHING_WORKERS,
+)
+
+
+def offload(func, *args, **kwargs):
+    """
+    Выполняет func в пуле хеширования и ждёт результат.
+
+    Внутри пула (verify вызывает encode) и при
+    PASSWORD_HASHING_WORKERS=0 функция выполняется сразу.
+    """
+    if not settings.PASSWORD_HASHING_WORKERS or getattr(
+        _local, "in_pool", False
+    ):
+        return func(*args, **kwargs)
+    executor = _pool.get()
+    if not _pool.slots.acquire(timeout=settings.PASSWORD_HASHING_WAIT):
+        raise HashingPoolSaturated
+    try:
+        return executor.submit(func, *args, **kwargs).result()
+    finally:
+        _pool.slots.release()
+
+
+class OffloadedHasherMixin:
+    """
+    Переносит encode и verify хешера в пул хеширования.
+    """
+
+    def encode(self, password, salt, *args, **kwargs):
+        return offload(super().encode, password, salt, *args, **kwargs)
+
+    def verify(self, password, encoded):
+        return offload(super().verify, password, encoded)
+
+
+class PBKDF2PasswordHasher(OffloadedHasherMixin, hashers.PBKDF2PasswordHasher):
+    def __init__(self, iterations=None):
+        self.iterations = iterations or settings.PASSWORD_PBKDF2_ITERATIONS
+
+
+class ScryptPasswordHasher(OffloadedHasherMixin, hashers.ScryptPasswordHasher):
+    def __init__(self, work_factor=None, block_size=None, parallelism=None):
+        self.work_factor = work_factor or settings.PASSWORD_SCRYPT_WORK_FACTOR
+        self.block_size = block_size or settings.PASSWORD_SCRYPT_BLOCK_SIZE
+        self.parallelism = parallelism or settings.PASSWORD_SCRYPT_PARALLELISM
+        # OpenSSL по умолчанию отказывает scrypt дороже 32 МиБ
+        self.maxmem = 2 * 128 * self.work_factor * self.block_size
+
+
+class Argon2PasswordHasher(OffloadedHasherMixin, hashers.Argon2PasswordHasher):
+    """Требует argon2-cffi."""
+
+    def __init__(self, time_cost=None, memory_cost=None, parallelism=None):
+        self.time_cost = time_cost or settings.PASSWORD_ARGON2_TIME_COST
+        self.memory_cost = memory_cost or settings.PASSWORD_ARGON2_MEMORY_COST
+        self.parallelism = parallelism or settings.PASSWORD_ARGON2_PARALLELISM
+
+
+# Имена алгоритмов, как в PASSWORD_HASHER (см. benchmark_hashers)
+HASHERS = {
+    "pbkdf2": PBKDF2PasswordHasher,
+    "scrypt": ScryptPasswordHasher,
+    "argon2": Argon2PasswordHasher,
+}
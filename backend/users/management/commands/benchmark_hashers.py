@@ -0,0 +1,148 @@
+# Стандартная библиотека
+import json
+import os
+import threading
+import time
+
+# Сторонние библиотеки
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+# Локальные импорты
+from users.hashers import HASHERS
+
+PASSWORD = "correct horse battery staple"
+
+
+def parse_config(spec):
+    """
+    "pbkdf2" или "argon2:time_cost=3,memory_cost=65536" → (имя, параметры).
+    """
+    name, _sep, params = spec.partition(":")
+    if name not in HASHERS:
+        raise CommandError(
+            f"Unknown hasher {name!r}; choose from {', '.join(HASHERS)}."
+        )
+    try:
+        options = {
+            key.strip(): int(value)
+            for key, value in (
+                item.split("=") for item in params.split(",") if item
+            )
+        }
+    except ValueError:
+        raise CommandError(f"Bad parameters in {spec!r}; expected key=int,...")
+    return name, options
+
+
+def measure(hasher, encoded, duration, threads):
+    """
+    Проверок пароля в секунду: threads потоков вызывают hasher.verify
+    не меньше duration секунд, как параллельные запросы на вход.
+    """
+    counts = [0] * threads
+    deadline = time.monotonic() + duration
+
+    def worker(index):
+        while True:
+            if not hasher.verify(PASSWORD, encoded):
+                raise AssertionError("verify() rejected the correct password")
+            counts[index] += 1
+            if time.monotonic() >= deadline:
+                return
+
+    workers = [
+        threading.Thread(target=worker, args=(i,)) for i in range(threads)
+    ]
+    started = time.monotonic()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return sum(counts) / (time.monotonic() - started)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure password checks per second (the CPU cost of a login) "
+        "for each hasher configuration, print JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--config",
+            action="append",
+            dest="configs",
+            metavar="NAME[:key=value,...]",
+            help=(
+                "Hasher configuration, repeatable; e.g. "
+                "pbkdf2:iterations=300000, scrypt:work_factor=32768, "
+                "argon2:time_cost=3,memory_cost=65536. "
+                "Defaults to every algorithm with the current settings"
+            ),
+        )
+        parser.add_argument(
+            "--duration", type=float, default=3, help="Seconds per measurement"
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Concurrent logins for the throughput measurement",
+        )
+        parser.add_argument(
+            "--output", help="Write the JSON report here instead of stdout"
+        )
+
+    def handle(self, *args, **options):
+        configs = [
+            parse_config(spec) for spec in options["configs"] or HASHERS
+        ]
+        results = []
+        for name, params in configs:
+            self.stderr.write(f"  {name} {params or ''}")
+            results.append(self._benchmark(name, params, options))
+
+        report = {
+            "cpu_count": os.cpu_count(),
+            "threads": options["threads"],
+            "hashing_workers": settings.PASSWORD_HASHING_WORKERS,
+            "preferred": settings.PASSWORD_HASHER,
+            "configurations": results,
+        }
+        text = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+            self.stderr.write(f"Report written to {options['output']}")
+        else:
+            self.stdout.write(text)
+
+    def _benchmark(self, name, params, options):
+        try:
+            hasher = HASHERS[name](**params)
+            encoded = hasher.encode(PASSWORD, hasher.salt())
+        except TypeError as error:
+            raise CommandError(f"{name}: {error}")
+        except ValueError as error:
+            # argon2-cffi не установлен
+            return {"name": name, "params": params, "error": str(error)}
+
+        # Один поток — стоимость входа на одно ядро; несколько потоков
+        # упираются ещё и в PASSWORD_HASHING_WORKERS
+        per_core = measure(hasher, encoded, options["duration"], 1)
+        total = measure(
+            hasher, encoded, options["duration"], options["threads"]
+        )
+        summary = hasher.safe_summary(encoded)
+        return {
+            "name": name,
+            # действующая стоимость, с учётом значений из настроек
+            "params": {
+                key: value
+                for key, value in summary.items()
+                if key not in ("salt", "hash")
+            },
+            "verify_ms": round(1000 / per_core, 2),
+            "logins_per_s_per_core": round(per_core, 2),
+            "logins_per_s": round(total, 2),
+        }
@@ -25,6 +25,20 @@ class User(_AuthUser):
         verbose_name="Аватар",
     )
 
+    # Денормализованные счётчики, см. api/counters.py
+    recipes_count = _models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Рецептов",
+    )
+    subscribers_count = _models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Подписчиков",
+    )
+
+    COUNTER_FIELDS = ("recipes_count", "subscribers_count")
+
     # Группы и права с переопределённым related_name
     groups = _models.ManyToManyField(
         "auth.Group",
@@ -54,6 +68,22 @@ class User(_AuthUser):
         """Возвращает email пользователя как строковое представление."""
         return self.email
 
+    def save(self, *args, **kwargs):
+        """
+        Обычное сохранение не перезаписывает счётчики устаревшими значениями:
+        их меняют только UPDATE с F() из api/counters.py.
+        """
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.COUNTER_FIELDS
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
 
 class Subscription(_models.Model):
     """
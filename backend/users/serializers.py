@@ -1,5 +1,6 @@
 import re as _re
 
+from api.images import thumbnail_urls as _thumbnail_urls
 from constants import ERROR_MESSAGES as _ERR
 from constants import MAX_LENGTH_FIRSTNAME as _MAX_FN
 from constants import MAX_LENGTH_LASTNAME as _MAX_LN
@@ -56,6 +57,7 @@ class UserSerializer(_serializers.ModelSerializer):
     Отдаёт данные пользователя и флаг is_subscribed.
     """
     avatar = _B64Field(required=False, allow_null=True)
+    avatar_thumbnails = _serializers.SerializerMethodField()
     is_subscribed = _serializers.SerializerMethodField()
 
     class Meta:
@@ -67,13 +69,24 @@ class UserSerializer(_serializers.ModelSerializer):
             "last_name",
             "email",
             "avatar",
+            "avatar_thumbnails",
             "is_subscribed",
         )
 
+    def get_avatar_thumbnails(self, obj):
+        """
+        WebP-превью аватара по размерам из IMAGE_THUMBNAIL_SIZES.
+        """
+        return _thumbnail_urls(obj.avatar, self.context.get("request"))
+
     def get_is_subscribed(self, obj):
         """
         True, если текущий пользователь (из context) подписан на obj.
+        Если флаг уже посчитан аннотацией QuerySet — берём его.
         """
+        annotated = getattr(obj, "is_subscribed", None)
+        if annotated is not None:
+            return annotated
         req = self.context.get("request")
         return bool(
             req
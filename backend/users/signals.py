@@ -0,0 +1,51 @@
+# users/signals.py
+
+"""
+Обработчики сигналов моделей приложения users.
+"""
+
+# Сторонние библиотеки
+from api.counters import adjust
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+# Локальные импорты
+from .authentication import forget_tokens
+from .models import Subscription, User
+
+
+@receiver(post_save, sender=Subscription)
+def subscription_created(sender, instance, created, **kwargs):
+    """Новый подписчик увеличивает счётчик автора."""
+    if created:
+        adjust(User, instance.author_id, "subscribers_count", 1)
+
+
+@receiver(post_delete, sender=Subscription)
+def subscription_deleted(sender, instance, **kwargs):
+    """Отписка уменьшает счётчик автора."""
+    adjust(User, instance.author_id, "subscribers_count", -1)
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    """Удалённый токен (выход, админка) сразу перестаёт приниматься."""
+    key = instance.key
+    transaction.on_commit(lambda: forget_tokens([key]))
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, created, **kwargs):
+    """
+    Смена пароля, деактивация или правка профиля: закешированный
+    пользователь токена устарел.
+    """
+    if created:
+        return
+    keys = list(
+        Token.objects.filter(user_id=instance.pk).values_list("key", flat=True)
+    )
+    if keys:
+        transaction.on_commit(lambda: forget_tokens(keys))
@@ -0,0 +1,89 @@
+# users/tests/test_authentication.py
+
+"""
+Кеш «токен → пользователь» CachedTokenAuthentication.
+"""
+
+# Стандартная библиотека
+import pickle
+
+# Сторонние библиотеки
+import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+# Локальные импорты
+from recipes.management.commands.seed_benchmark import IMAGE_NAME
+from users.authentication import _cache_key
+
+ME = "/api/users/me/"
+
+
+@pytest.fixture
+def token_cache(settings):
+    settings.TOKEN_CACHE_ENABLED = True
+    return caches[settings.TOKEN_CACHE_ALIAS]
+
+
+@pytest.fixture
+def token(viewer):
+    return Token.objects.create(user=viewer)
+
+
+@pytest.fixture
+def token_client(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    return client
+
+
+@pytest.mark.django_db
+def test_cached_token_skips_database(token_cache, token_client, viewer):
+    viewer.avatar = IMAGE_NAME
+    viewer.save()
+    cold = token_client.get(ME)
+    assert cold.status_code == 200
+    with CaptureQueriesContext(connection) as queries:
+        response = token_client.get(ME)
+    assert response.status_code == 200
+    assert response.json() == cold.json()
+    assert response.json()["avatar"].endswith(IMAGE_NAME)
+    assert not any("authtoken_token" in query["sql"] for query in queries)
+
+
+@pytest.mark.django_db
+def test_cache_entry_has_no_password_hash(
+    token_cache, token, token_client, viewer
+):
+    assert token_client.get(ME).status_code == 200
+    cached = token_cache.get(_cache_key(token.key))
+    assert cached is not None
+    assert viewer.password.encode() not in pickle.dumps(cached)
+
+
+@pytest.mark.django_db
+def test_cached_user_reads_password_from_database(token_cache, token_client):
+    assert token_client.get(ME).status_code == 200
+    response = token_client.post(
+        "/api/users/set_password/",
+        {
+            "current_password": "pass-Word-42",
+            "new_password": "new-Pass-Word-43",
+        },
+        format="json",
+    )
+    assert response.status_code == 204, response.content
+
+
+@pytest.mark.django_db
+def test_logout_invalidates_cached_token(
+    token_cache, token_client, django_capture_on_commit_callbacks
+):
+    assert token_client.get(ME).status_code == 200
+    # запись сбрасывается после фиксации транзакции
+    with django_capture_on_commit_callbacks(execute=True):
+        assert token_client.post("/api/auth/token/logout/").status_code == 204
+    assert token_client.get(ME).status_code == 401
@@ -0,0 +1,84 @@
+# users/tests/test_subscriptions.py
+
+"""
+Лента подписок GET /api/users/subscriptions/: число SQL-запросов
+не зависит от числа авторов на странице и от recipes_limit.
+"""
+
+# Сторонние библиотеки
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Локальные импорты
+from recipes.management.commands.seed_benchmark import IMAGE_NAME
+from recipes.models import Recipe
+from users.models import Subscription
+
+AUTHORS = 6
+RECIPES_PER_AUTHOR = 4
+URL = "/api/users/subscriptions/"
+
+
+@pytest.fixture
+def authors(make_user, viewer):
+    authors = [make_user(f"author{number}") for number in range(AUTHORS)]
+    Recipe.objects.bulk_create(
+        Recipe(
+            author=author,
+            name=f"{author.username} {number}",
+            text="Описание",
+            cooking_time=10,
+            image=IMAGE_NAME,
+        )
+        for author in authors
+        for number in range(RECIPES_PER_AUTHOR)
+    )
+    Subscription.objects.bulk_create(
+        Subscription(user=viewer, author=author) for author in authors
+    )
+    return authors
+
+
+def _get(client, **params):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(URL, params)
+    assert response.status_code == 200, response.content
+    return response.json()["results"], len(queries)
+
+
+def _newest(author, limit):
+    return list(
+        Recipe.objects.filter(author=author)
+        .order_by("-created_at", "-id")
+        .values_list("id", flat=True)[:limit]
+    )
+
+
+@pytest.mark.parametrize("recipes_limit", (1, 3))
+def test_query_count_does_not_depend_on_page_size(
+    viewer_client, authors, recipes_limit
+):
+    small, small_queries = _get(
+        viewer_client, limit=2, recipes_limit=recipes_limit
+    )
+    full, full_queries = _get(
+        viewer_client, limit=AUTHORS, recipes_limit=recipes_limit
+    )
+
+    assert len(small) == 2
+    assert len(full) == AUTHORS
+    assert small_queries == full_queries
+    by_username = {author.username: author for author in authors}
+    for item in full:
+        assert [recipe["id"] for recipe in item["recipes"]] == _newest(
+            by_username[item["username"]], recipes_limit
+        )
+
+
+def test_without_limit_returns_all_recipes(viewer_client, authors):
+    limited, limited_queries = _get(viewer_client, recipes_limit=2)
+    results, queries = _get(viewer_client)
+
+    assert queries == limited_queries
+    assert {len(item["recipes"]) for item in results} == {RECIPES_PER_AUTHOR}
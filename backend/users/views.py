@@ -1,12 +1,18 @@
-import base64 as _b64
 import logging as _logging
-import uuid as _uuid
 from http import HTTPStatus as _HTTPStatus
 
 # Django utilities
+from api.images import decode_base64_image as _decode_image
+from api.images import thumbnail_urls as _thumbnail_urls
+from api.metrics import InstrumentedViewSetMixin as _Instrumented
 from django.contrib.auth.hashers import check_password as _check_password
-from django.core.files.base import ContentFile as _ContentFile
-from django.db.models import Count as _Count
+from django.db import transaction as _transaction
+from django.db.models import Exists as _Exists
+from django.db.models import F as _F
+from django.db.models import OuterRef as _OuterRef
+from django.db.models import Value as _Value
+from django.db.models import Window as _Window
+from django.db.models.functions import RowNumber as _RowNumber
 from django.shortcuts import get_object_or_404 as _gof
 # Local imports
 from recipes.models import Recipe as _Recipe
@@ -16,6 +22,7 @@ from rest_framework import viewsets as _viewsets
 from rest_framework.authtoken.models import Token as _Token
 from rest_framework.authtoken.views import ObtainAuthToken as _ObtainAuth
 from rest_framework.decorators import action as _action
+from rest_framework.exceptions import ValidationError as _ValidationError
 from rest_framework.permissions import AllowAny as _AllowAny
 from rest_framework.permissions import IsAuthenticated as _IsAuth
 from rest_framework.response import Response as _Resp
@@ -32,14 +39,31 @@ from .serializers import UserSerializer as _UserSer
 _logger = _logging.getLogger(__name__)
 
 
-class UserViewSet(_viewsets.ModelViewSet):
+class UserViewSet(_Instrumented, _viewsets.ModelViewSet):
     """
     ViewSet для работы с пользователями: CRUD, авторизация и подписки.
     """
     queryset = _User.objects.order_by("email")
+    # не больше SQL-запросов на действие (см. api/metrics.py)
+    query_budgets = {'list': 4, 'retrieve': 4, 'me': 3, 'subscriptions': 5}
     serializer_class = _UserSer
     pagination_class = _UserPage
 
+    def get_queryset(self):
+        """
+        Аннотирует пользователей флагом is_subscribed одним подзапросом,
+        чтобы UserSerializer не делал запрос на каждого пользователя.
+        """
+        users_qs = super().get_queryset()
+        viewer = self.request.user
+        if not viewer.is_authenticated:
+            return users_qs.annotate(is_subscribed=_Value(False))
+        return users_qs.annotate(
+            is_subscribed=_Exists(
+                _Sub.objects.filter(user=viewer, author=_OuterRef('pk'))
+            )
+        )
+
     def get_permissions(self):
         """
         Выбирает права доступа: для создания AllowAny, иначе стандартные.
@@ -93,10 +117,13 @@ class UserViewSet(_viewsets.ModelViewSet):
             if not avatar_data:
                 return _Resp({'error': "Поле 'avatar' обязательно."}, status=_status.HTTP_400_BAD_REQUEST)
             try:
-                prefix, b64str = avatar_data.split(';base64,')
-                ext = prefix.split('/')[-1]
-                fname = f"{_uuid.uuid4()}.{ext}"
-                user_obj.avatar.save(fname, _ContentFile(_b64.b64decode(b64str)), save=True)
+                image = _decode_image(avatar_data)
+            except _ValidationError as err:
+                return _Resp(
+                    {'avatar': err.detail}, status=_status.HTTP_400_BAD_REQUEST
+                )
+            try:
+                user_obj.avatar.save(image.name, image, save=True)
                 url = request.build_absolute_uri(user_obj.avatar.url)
                 return _Resp({'avatar': url}, status=_status.HTTP_200_OK)
             except Exception as e:
@@ -111,6 +138,7 @@ class UserViewSet(_viewsets.ModelViewSet):
         return _Resp(status=_status.HTTP_204_NO_CONTENT)
 
     @_action(detail=True, methods=['post', 'delete'], permission_classes=[_IsAuth])
+    @_transaction.atomic
     def subscribe(self, request, pk=None):
         """
         POST: подписаться на автора; DELETE: отписаться.
@@ -131,20 +159,10 @@ class UserViewSet(_viewsets.ModelViewSet):
         if not created:
             return _Resp({'error': 'Уже подписаны на этого пользователя.'}, status=_HTTPStatus.BAD_REQUEST)
 
-        limit = request.query_params.get('recipes_limit')
-        try:
-            limit = int(limit) if limit else None
-        except ValueError:
-            limit = None
-
-        author_data = _UserSer(author_obj, context={'request': request}).data
-        count = _Recipe.objects.filter(author=author_obj).count()
-        author_data['recipes_count'] = count
-        recipes_qs = _Recipe.objects.filter(author=author_obj)[:limit] if limit else _Recipe.objects.filter(author=author_obj)
-        author_data['recipes'] = [
-            {'id': r.id, 'name': r.name, 'image': request.build_absolute_uri(r.image.url) if request else r.image.url, 'cooking_time': r.cooking_time}
-            for r in recipes_qs
-        ]
+        author = _User.objects.filter(pk=author_obj.pk).annotate(
+            is_subscribed=_Value(True)
+        )
+        author_data = self._authors_with_recipes(author, request)[0]
         return _Resp(author_data, status=_HTTPStatus.CREATED)
 
     @_action(detail=True, methods=['delete'])
@@ -161,27 +179,70 @@ class UserViewSet(_viewsets.ModelViewSet):
         Список подписок с постраничным выводом и ограничением рецептов.
         """
         user_obj = request.user
-        subs = _User.objects.filter(subscribers__user=user_obj).annotate(recipes_count=_Count('recipes'))
+        subs = _User.objects.filter(subscribers__user=user_obj).annotate(
+            is_subscribed=_Value(True),
+        ).order_by('email')
         paginator = _UserPage()
         page = paginator.paginate_queryset(subs, request)
+        return paginator.get_paginated_response(
+            self._authors_with_recipes(page, request)
+        )
 
-        recipes_limit = request.query_params.get('recipes_limit')
+    @staticmethod
+    def _recipes_limit(request):
+        """
+        Значение ?recipes_limit= или None, если параметр не задан
+        или некорректен.
+        """
+        limit = request.query_params.get('recipes_limit')
         try:
-            recipes_limit = int(recipes_limit) if recipes_limit else None
+            return int(limit) if limit else None
         except ValueError:
-            recipes_limit = None
+            return None
+
+    def _authors_with_recipes(self, authors, request):
+        """
+        Данные авторов с их последними рецептами за фиксированное число
+        запросов.
+
+        Рецепты всех авторов выбираются одним запросом: ROW_NUMBER()
+        по автору в порядке -created_at отсекает всё сверх recipes_limit.
+        """
+        authors = list(authors)
+        limit = self._recipes_limit(request)
+        recipes_qs = _Recipe.objects.filter(author__in=authors).only(
+            'id', 'name', 'image', 'cooking_time', 'author_id'
+        )
+        if limit:
+            recipes_qs = recipes_qs.annotate(
+                row_number=_Window(
+                    _RowNumber(),
+                    partition_by=[_F('author_id')],
+                    order_by=[_F('created_at').desc(), _F('id').desc()],
+                )
+            ).filter(row_number__lte=limit)
+
+        # Абсолютный префикс вычисляем один раз, а не на каждый рецепт
+        host = request.build_absolute_uri('/')[:-1]
+        by_author = {}
+        for r in recipes_qs.order_by('author_id', '-created_at', '-id'):
+            by_author.setdefault(r.author_id, []).append(
+                {
+                    'id': r.id,
+                    'name': r.name,
+                    'image': host + r.image.url,
+                    'image_thumbnails': _thumbnail_urls(r.image, request),
+                    'cooking_time': r.cooking_time,
+                }
+            )
 
         result = []
-        for auth in page:
+        for auth in authors:
             data = _UserSer(auth, context={'request': request}).data
             data['recipes_count'] = auth.recipes_count
-            qs = _Recipe.objects.filter(author=auth)[:recipes_limit] if recipes_limit else _Recipe.objects.filter(author=auth)
-            data['recipes'] = [
-                {'id': r.id, 'name': r.name, 'image': request.build_absolute_uri(r.image.url) if request else r.image.url, 'cooking_time': r.cooking_time}
-                for r in qs
-            ]
+            data['recipes'] = by_author.get(auth.id, [])
             result.append(data)
-        return paginator.get_paginated_response(result)
+        return result
 
 
 class LogoutView(_APIView):